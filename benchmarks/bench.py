@@ -0,0 +1,172 @@
+"""Benchmarks - Measuring Tony's hot paths and comparing them to a stored baseline.
+
+Usage, from the repository root:
+
+    python benchmarks/bench.py run                 # measure and print the results
+    python benchmarks/bench.py save                # measure and store them as the baseline
+    python benchmarks/bench.py compare             # measure and report regressions against the baseline
+    python benchmarks/bench.py compare -k register # only benchmarks whose name contains "register"
+
+Baselines depend on the machine they were measured on, so they are not
+committed. Save one before a change and compare after it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+import orjson
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
+    from cases import Benchmark
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+"""Where the baseline is stored by default."""
+
+MIN_RUN_TIME = 0.2
+"""Seconds a single run of a benchmark should take at least, to keep timer resolution out of the result."""
+
+REPEAT = 5
+"""Number of runs per benchmark. The fastest is reported, since slower ones were disturbed by something else."""
+
+REGRESSION_THRESHOLD = 0.15
+"""Fraction a benchmark may be slower than the baseline before it is reported as a regression."""
+
+
+def _time(run: Callable[[int], None], number: int) -> float:
+    """Return the seconds one run of `number` operations took."""
+    start = time.perf_counter()
+    run(number)
+    return time.perf_counter() - start
+
+
+def measure(case: Benchmark) -> float:
+    """Return the seconds one operation of a benchmark takes, as the fastest of `REPEAT` runs."""
+    number = case.number
+    if number is None:
+        number = 1
+        while (elapsed := _time(case.run, number)) < MIN_RUN_TIME:
+            number = max(number * 2, math.ceil(number * MIN_RUN_TIME / max(elapsed, 1e-9)))
+    return min(_time(case.run, number) for _ in range(REPEAT)) / number
+
+
+def format_time(seconds: float) -> str:
+    """Return a duration with a readable unit."""
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def run_benchmarks(keyword: str | None = None) -> dict[str, float]:
+    """Run the benchmarks whose name contains `keyword`, printing each result, and return them by name."""
+    # Imported here, since importing the cases already loads everything they measure
+    from cases import BENCHMARKS
+
+    results: dict[str, float] = {}
+    for case in BENCHMARKS:
+        if keyword is not None and keyword not in case.name:
+            continue
+        results[case.name] = measure(case)
+        print(f"{case.name:<40} {format_time(results[case.name]):>12}", flush=True)
+    return results
+
+
+def save_baseline(results: Mapping[str, float], path: Path) -> None:
+    """Store results as the baseline, keeping the baseline of benchmarks that were not run."""
+    baseline = load_baseline(path) if path.exists() else {}
+    baseline.update(results)
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "results": dict(sorted(baseline.items())),
+    }
+    path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+
+
+def load_baseline(path: Path) -> dict[str, float]:
+    """Return the stored baseline results by name."""
+    results: dict[str, float] = orjson.loads(path.read_bytes())["results"]
+    return results
+
+
+class Comparison(NamedTuple):
+    """A benchmark result compared to its baseline."""
+
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """How much slower the current result is, as a fraction of the baseline. Negative if it is faster."""
+        return self.current / self.baseline - 1
+
+
+def compare(
+    baseline: Mapping[str, float],
+    results: Mapping[str, float],
+    threshold: float = REGRESSION_THRESHOLD,
+) -> tuple[list[Comparison], list[Comparison]]:
+    """Compare results to the baseline and return all comparisons and the regressions among them."""
+    comparisons = [Comparison(name, baseline[name], results[name]) for name in results if name in baseline]
+    return comparisons, [comparison for comparison in comparisons if comparison.change > threshold]
+
+
+def print_comparisons(comparisons: Iterable[Comparison], threshold: float) -> None:
+    """Print a table of comparisons."""
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for comparison in comparisons:
+        marker = "  REGRESSION" if comparison.change > threshold else ""
+        print(
+            f"{comparison.name:<40} {format_time(comparison.baseline):>12}"
+            f" {format_time(comparison.current):>12} {comparison.change:>+8.1%}{marker}",
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark command line. Returns 1 if `compare` found regressions."""
+    parser = argparse.ArgumentParser(prog="python benchmarks/bench.py", description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("run", "save", "compare"), help="what to do with the results")
+    parser.add_argument("-k", "--keyword", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline file (default: %(default)s)")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="fraction a benchmark may be slower than the baseline (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "compare" and not args.baseline.exists():
+        parser.error(f"no baseline at {args.baseline}, create one with the save command first")
+
+    results = run_benchmarks(args.keyword)
+
+    if args.command == "save":
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif args.command == "compare":
+        comparisons, regressions = compare(load_baseline(args.baseline), results, args.threshold)
+        print_comparisons(comparisons, args.threshold)
+        missing = sorted(results.keys() - {comparison.name for comparison in comparisons})
+        if missing:
+            print(f"\nNot in the baseline: {', '.join(missing)}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""Benchmark cases for Tony's hot paths. Run them with `bench.py`.
+
+Each case is a function running the measured operation `n` times,
+registered with the `benchmark` decorator.
+"""
+
+from __future__ import annotations
+
+import contextlib
+from typing import TYPE_CHECKING, Any, NamedTuple
+from unittest.mock import Mock
+
+import orjson
+import trio
+import trio.testing
+from neuro_api.command import context_command
+
+from neuro_api_tony.api import NeuroAPI, NeuroAPIClient
+from neuro_api_tony.loadgen import make_action_schema
+from neuro_api_tony.loopback import connect_loopback
+from neuro_api_tony.model import NeuroAction, TonyModel
+from neuro_api_tony.samples import sample_generators
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class Benchmark(NamedTuple):
+    """A benchmark case."""
+
+    name: str
+    run: Callable[[int], None]
+    """Function running the measured operation the given number of times."""
+    number: int | None
+    """Fixed number of operations per run, for operations whose cost depends on how often they ran, or None."""
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(name: str, number: int | None = None) -> Callable[[Callable[[int], None]], Callable[[int], None]]:
+    """Register a function running an operation `n` times as a benchmark."""
+
+    def decorator(function: Callable[[int], None]) -> Callable[[int], None]:
+        BENCHMARKS.append(Benchmark(name, function, number))
+        return function
+
+    return decorator
+
+
+SMALL_SCHEMA = make_action_schema(4)
+LARGE_SCHEMA = make_action_schema(200)
+
+
+def _register_data(schema: dict[str, Any], actions: int) -> dict[str, Any]:
+    """Return the data of an actions/register command."""
+    return {
+        "actions": [
+            {"name": f"action_{index}", "description": f"Benchmark action {index}.", "schema": schema}
+            for index in range(actions)
+        ],
+    }
+
+
+SMALL_REGISTER = _register_data(SMALL_SCHEMA, 5)
+LARGE_REGISTER = _register_data(LARGE_SCHEMA, 50)
+
+
+class _ConstantConnection:
+    """Connection that receives the same message forever."""
+
+    def __init__(self, message: bytes) -> None:
+        self.message = message
+
+    async def get_message(self) -> bytes:
+        return self.message
+
+
+_servers: list[NeuroAPI] = []
+"""Servers of the benchmark clients, kept alive since clients only hold a weak reference to their server."""
+
+
+def _client(message: bytes = b"") -> NeuroAPIClient:
+    """Return a client of a server whose callbacks do nothing."""
+    api = NeuroAPI(Mock())
+    _servers.append(api)
+    client = NeuroAPIClient(_ConstantConnection(message), api, 0)  # type: ignore[arg-type]
+    client.game_title = "Benchmark"
+    return client
+
+
+def _decode(message: bytes) -> Any:
+    """Return a benchmark reading and raw-logging `message` from a client."""
+    client = _client(message)
+
+    def run(n: int) -> None:
+        async def loop() -> None:
+            for _ in range(n):
+                await client.read_from_websocket()
+
+        trio.run(loop)
+
+    return run
+
+
+benchmark("decode.context")(_decode(context_command("Benchmark", "Something happened in the game.")))
+benchmark("decode.register_large")(
+    _decode(orjson.dumps({"command": "actions/register", "game": "Benchmark", "data": LARGE_REGISTER})),
+)
+
+
+def _register(data: dict[str, Any]) -> Any:
+    """Return a benchmark deserializing and checking registered actions."""
+    client = _client()
+
+    def run(n: int) -> None:
+        async def loop() -> None:
+            for _ in range(n):
+                await client.handle_actions_register("Benchmark", client.deserialize_actions(data))
+
+        trio.run(loop)
+
+    return run
+
+
+benchmark("register.small")(_register(SMALL_REGISTER))
+benchmark("register.large")(_register(LARGE_REGISTER))
+
+
+def _model(actions: int) -> Any:
+    """Return a benchmark adding, looking up and removing an action in a model holding `actions` actions."""
+    model = TonyModel()
+    for index in range(actions):
+        model.add_action(NeuroAction(f"action_{index}", "", None, index % 10, f"Game {index % 10}"))
+    action = NeuroAction("benchmark_action", "", None, 0, "Game 0")
+
+    def run(n: int) -> None:
+        for _ in range(n):
+            model.add_action(action)
+            model.has_action("benchmark_action")
+            model.remove_actions(name="benchmark_action", client_id=0)
+
+    return run
+
+
+benchmark("model.actions_100")(_model(100))
+benchmark("model.actions_10000")(_model(10_000))
+
+
+@benchmark("log.append", number=20_000)
+def log_append(n: int) -> None:
+    """Append messages to the export log and the search index, like the view does for every log message."""
+    model = TonyModel()
+    for index in range(n):
+        message = f"Received context from client {index % 10}: Something happened in the game."
+        model.add_log("Context", f"[12:00:00] [Context] {message}")
+        model.log_index.add("Context", index, message, index % 10, "info")
+
+
+def _generate(schema: dict[str, Any]) -> Any:
+    """Return a benchmark generating samples for a schema with a prepared JSF generator."""
+    generators = sample_generators()
+    generators.get(schema)
+
+    def run(n: int) -> None:
+        for _ in range(n):
+            generators.generate(schema)
+
+    return run
+
+
+benchmark("jsf.small")(_generate(SMALL_SCHEMA))
+benchmark("jsf.large")(_generate(LARGE_SCHEMA))
+
+
+def _broadcast(clients: int) -> Any:
+    """Return a benchmark sending actions/reregister_all to `clients` loopback clients and waiting for all of them."""
+
+    def run(n: int) -> None:
+        async def main() -> None:
+            api = NeuroAPI(Mock())
+            received = 0
+            all_received = trio.Event()
+
+            async def drain(connection: Any) -> None:
+                nonlocal received
+                while True:
+                    await connection.get_message()
+                    received += 1
+                    if received == clients:
+                        all_received.set()
+
+            async with trio.open_nursery() as nursery, contextlib.AsyncExitStack() as stack:
+                for _ in range(clients):
+                    connection = await stack.enter_async_context(connect_loopback(api))
+                    nursery.start_soon(drain, connection)
+                await trio.testing.wait_all_tasks_blocked()
+
+                for _ in range(n):
+                    received = 0
+                    all_received = trio.Event()
+                    api.send_actions_reregister_all(None)
+                    await all_received.wait()
+                    await trio.testing.wait_all_tasks_blocked()
+                nursery.cancel_scope.cancel()
+
+        trio.run(main)
+
+    return run
+
+
+benchmark("broadcast.clients_10")(_broadcast(10))
+benchmark("broadcast.clients_100")(_broadcast(100))
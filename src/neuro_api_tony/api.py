@@ -9,13 +9,17 @@ from __future__ import annotations
 import traceback
 import weakref
 from functools import partial
-from typing import TYPE_CHECKING, Any, NamedTuple, Protocol
+from typing import TYPE_CHECKING, Any, NamedTuple, Protocol, TypeAlias
 
-import jsonschema
-import jsonschema.exceptions
 import orjson
 import trio
-from neuro_api.command import ACTION_NAME_ALLOWED_CHARS, Action, ForcePriority, check_invalid_keys_recursive
+from neuro_api.command import (
+    ACTION_NAME_ALLOWED_CHARS,
+    Action,
+    ForcePriority,
+    action_command,
+    check_invalid_keys_recursive,
+)
 from neuro_api.server import AbstractNeuroServerClient, AbstractTrioNeuroServer, ActionSchema
 from trio_websocket import (
     ConnectionClosed,
@@ -24,7 +28,8 @@ from trio_websocket import (
     serve_websocket,
 )
 
-from neuro_api_tony.config import SendActionsTo, WarningID, config
+from neuro_api_tony.config import SendActionsTo, WarningID, config, config_snapshot
+from neuro_api_tony.inflight import InFlightTable
 from neuro_api_tony.model import NeuroAction
 
 if TYPE_CHECKING:
@@ -32,6 +37,23 @@ if TYPE_CHECKING:
 
     from outcome import Outcome
 
+    from neuro_api_tony.loopback import LoopbackConnection
+    from neuro_api_tony.trace import TraceWriter
+
+    Connection: TypeAlias = WebSocketConnection | LoopbackConnection
+    """A connection to a client, over a websocket or in-process for tests and benchmarks."""
+
+    LogMessage: TypeAlias = str | Callable[[], str]
+    """A log message, or a function returning it that is only called if the message is actually logged."""
+
+ACTION_DEADLINE_POLL_INTERVAL = 1.0
+"""Maximum number of seconds between checks for actions whose result is overdue."""
+
+
+def _format_exception(exc: BaseException) -> str:
+    """Return the formatted traceback of an exception."""
+    return "".join(traceback.format_exception(exc))
+
 
 class LogCommandProtocol(Protocol):
     """Protocol for `log_command`."""
@@ -57,11 +79,11 @@ class LogCommandProtocol(Protocol):
 class NeuroAPIClient(AbstractNeuroServerClient):
     """Neuro API client."""
 
-    __slots__ = ("_client_id", "_server", "game_title", "websocket")
+    __slots__ = ("_client_id", "_server", "game_title", "in_flight_window", "websocket")
 
     def __init__(
         self,
-        websocket: WebSocketConnection,
+        websocket: Connection,
         server: NeuroAPI,
         client_id: int,
     ) -> None:
@@ -76,6 +98,9 @@ class NeuroAPIClient(AbstractNeuroServerClient):
 
         self.game_title: str | None = None
 
+        self.in_flight_window = config_snapshot().max_in_flight_actions
+        """How many actions can wait for their result at once. Fixed when the client connects, since the send buffer is sized by it."""
+
     @property
     def server(self) -> NeuroAPI:
         """Bound NeuroAPI Server."""
@@ -94,6 +119,9 @@ class NeuroAPIClient(AbstractNeuroServerClient):
         self,
     ) -> bytes | bytearray | memoryview | str:
         response = await self.websocket.get_message()
+        trace = self.server.trace
+        if trace is not None:
+            trace.record(self._client_id, True, response)
 
         try:
             self.server.log_raw(
@@ -185,7 +213,23 @@ class NeuroAPIClient(AbstractNeuroServerClient):
     ) -> None:
         self.check_game_title(game_title)
         self.server.log_command(self._client_id, "action/result", True, "success" if success else "failure")
-        self.server.on_action_result(self._client_id, ActionResultCommand(success, message))
+
+        completed = self.server.in_flight.complete(self._client_id, id_)
+        if completed is None:
+            self.server.log_warning(
+                WarningID.ACTION_RESULT_UNKNOWN_ID,
+                f'Received action/result with unknown id "{id_}" from client {self._client_id}.',
+            )
+        else:
+            action, latency = completed
+            self.server.log_debug(
+                lambda: (
+                    f'Result of action "{action.name}" ({id_}) received after {latency:.0f} ms'
+                    + (", after its deadline." if action.timed_out else ".")
+                ),
+            )
+
+        self.server.on_action_result(self._client_id, ActionResultCommand(success, message, id_))
 
     async def handle_actions_force(  # noqa: D102
         self,
@@ -221,6 +265,7 @@ class NeuroAPIClient(AbstractNeuroServerClient):
         )
 
         checked_actions: list[ActionSchema] = []
+        allowed_schema_keys = config_snapshot().allowed_schema_keys
 
         # Check the actions
         for action in actions:
@@ -232,6 +277,8 @@ class NeuroAPIClient(AbstractNeuroServerClient):
                     continue
 
                 # Check if the schema is valid
+                import jsonschema.exceptions
+
                 try:
                     jsonschema.Draft7Validator.check_schema(
                         action.schema,
@@ -242,8 +289,7 @@ class NeuroAPIClient(AbstractNeuroServerClient):
                     )
                     continue
 
-                invalid_keys = set(check_invalid_keys_recursive(action.schema))
-                invalid_keys -= set(config().allowed_schema_keys)
+                invalid_keys = set(check_invalid_keys_recursive(action.schema)) - allowed_schema_keys
 
                 if len(invalid_keys) > 0:
                     self.server.log_warning(
@@ -305,8 +351,15 @@ class NeuroAPIClient(AbstractNeuroServerClient):
         self.server.log_warning(WarningID.UNKNOWN_COMMAND, f"Unknown command: {command}")
         self.server.on_unknown_command(self._client_id, (command, data))
 
+    async def send_action_command_with_id(self, id_: str, name: str, data: str | None) -> None:
+        """Send an action command with the given id, so its result can be matched with it."""
+        await self.send_command_data(action_command(id_, name, data))
+
     async def send_command_data(self, data: bytes) -> None:  # noqa: D102
         await super().send_command_data(data)
+        trace = self.server.trace
+        if trace is not None:
+            trace.record(self._client_id, False, data)
 
         try:
             self.server.log_raw(
@@ -441,6 +494,8 @@ class NeuroAPI(AbstractTrioNeuroServer):
         cmd : ActionResultCommand
             The received command.
         """
+        self.on_action_timeout: Callable[[int, str], None] = lambda client_id, id_: None
+        """Callback that is called with the client and action id when an action/result did not arrive before its deadline."""
         self.on_shutdown_ready: Callable[[int, ShutdownReadyCommand], None] = lambda client_id, cmd: None
         """Callback that is called when a [shutdown/ready](https://github.com/VedalAI/neuro-game-sdk/blob/main/API/PROPOSALS.md#shutdown-ready) command is received.
 
@@ -473,51 +528,53 @@ class NeuroAPI(AbstractTrioNeuroServer):
             An optional additional message. This is used to log additional information about the command, such as the
             game name for the `startup` command.
         """
-        self.log_debug: Callable[[str], None] = lambda message: None
+        self.log_debug: Callable[[LogMessage], None] = lambda message: None
         """Logging callback that is called when a debug message should be logged.
 
         Parameters
         ----------
-        message : str
-            The message to log.
+        message : str | Callable[[], str]
+            The message to log, or a function returning it.
 
         """
-        self.log_info: Callable[[str], None] = lambda message: None  # type: ignore[assignment]
+        self.log_info: Callable[[LogMessage], None] = lambda message: None  # type: ignore[assignment]
         """Logging callback that is called when an info message should be logged.
 
         Parameters
         ----------
-        message : str
-            The message to log.
+        message : str | Callable[[], str]
+            The message to log, or a function returning it.
 
         """
-        self.log_warning: Callable[[WarningID, str], None] = lambda warning_id, message: None  # type: ignore[assignment]
+        self.log_warning: Callable[[WarningID, LogMessage], None] = lambda warning_id, message: None  # type: ignore[assignment]
         """Logging callback that is called when a warning message should be logged.
 
         Parameters
         ----------
-        message : str
-            The message to log.
+        warning_id : WarningID
+            The warning identifier, used to check if the warning is enabled.
+        message : str | Callable[[], str]
+            The message to log, or a function returning it.
 
         """
-        self.log_error: Callable[[str], None] = lambda message: None
+        self.log_error: Callable[[LogMessage], None] = lambda message: None
         """Logging callback that is called when an error message should be logged.
 
         Parameters
         ----------
-        message : str
-            The message to log.
+        message : str | Callable[[], str]
+            The message to log, or a function returning it.
 
         """
-        self.log_critical: Callable[[str], None] = lambda message: None  # type: ignore[assignment]
+        self.log_critical: Callable[[LogMessage], None] = lambda message: None  # type: ignore[assignment]
         """Logging callback that is called when a critical error message should be logged.
 
         If a critical error occurs, the API instance is in an invalid state and should not be used anymore.
 
         Parameters
         ----------
-        message : str
-            The message to log.
+        message : str | Callable[[], str]
+            The message to log, or a function returning it.
 
         """
         self.log_raw: Callable[[str, int, bool], None] = lambda message, client_id, incoming: None
@@ -562,6 +619,15 @@ class NeuroAPI(AbstractTrioNeuroServer):
             tuple[NeuroAPIClient, trio.MemorySendChannel[partial[Awaitable[Any]] | partial[Coroutine[Any, Any, Any]]]],
         ] = {}
 
+        self.in_flight = InFlightTable()
+        """Actions that were sent and are waiting for their action/result."""
+
+        self.trace: TraceWriter | None = None
+        """Records every websocket message if set."""
+
+        self.instruments: list[trio.abc.Instrument] = []
+        """Instruments installed into the Trio run when it is started."""
+
     def get_next_id(self) -> str:
         """Generate and return the next unique command identifier."""
         value = self._next_command_id
@@ -653,7 +719,7 @@ class NeuroAPI(AbstractTrioNeuroServer):
             try:
                 run_outcome.unwrap()
             except Exception as exc:
-                self.log_critical("".join(traceback.format_exception(exc)))
+                self.log_critical(partial(_format_exception, exc))
                 raise
 
         self._async_library_running = True
@@ -662,7 +728,9 @@ class NeuroAPI(AbstractTrioNeuroServer):
         async def root_run() -> None:
             """Root async run, wrapped with async_library_root_cancel so it's able to be stopped remotely."""
             with self._async_library_root_cancel:
-                await self._run(address, port)
+                async with trio.open_nursery() as nursery:
+                    nursery.start_soon(self._watch_action_deadlines)
+                    await self._run(address, port)
 
         try:
             # Start the Trio guest run
@@ -671,6 +739,7 @@ class NeuroAPI(AbstractTrioNeuroServer):
                 done_callback=done_callback,
                 run_sync_soon_threadsafe=self.run_sync_soon_threadsafe,
                 host_uses_signal_set_wakeup_fd=False,
+                instruments=self.instruments,
                 restrict_keyboard_interrupt_to_checkpoints=True,
                 strict_exception_groups=True,
             )
@@ -679,7 +748,7 @@ class NeuroAPI(AbstractTrioNeuroServer):
             # even if trio fails to launch for some reason (shouldn't happen but still)
             self._async_library_running = False
             self.log_critical(f"Failed to start async Trio guest run:\n{exc}")
-            self.log_critical("".join(traceback.format_exception(exc)))
+            self.log_critical(partial(_format_exception, exc))
             raise
 
     def stop(self) -> None:
@@ -740,9 +809,28 @@ class NeuroAPI(AbstractTrioNeuroServer):
             )
         except Exception as exc:
             self.log_critical(f"Failed to start websocket server:\n{exc}")
-            self.log_critical("".join(traceback.format_exception(exc)))
+            self.log_critical(partial(_format_exception, exc))
             raise
 
+    async def _watch_action_deadlines(self) -> None:
+        """Warn about and report actions whose result did not arrive before their deadline."""
+        while True:
+            for action in self.in_flight.expire():
+                timeout = (action.deadline or action.sent_at) - action.sent_at
+                self.log_warning(
+                    WarningID.ACTION_RESULT_TIMEOUT,
+                    f'No action/result received for action "{action.name}" ({action.id_})'
+                    f" from client {action.client_id} within {timeout:g} seconds.",
+                )
+                self.on_action_timeout(action.client_id, action.id_)
+
+            next_deadline = self.in_flight.next_deadline()
+            if next_deadline is None:
+                await trio.sleep(ACTION_DEADLINE_POLL_INTERVAL)
+            else:
+                delay = next_deadline - self.in_flight.clock()
+                await trio.sleep(min(ACTION_DEADLINE_POLL_INTERVAL, max(0, delay)))
+
     @property
     def clients_connected(self) -> int:
         """Number of clients connected."""
@@ -757,9 +845,16 @@ class NeuroAPI(AbstractTrioNeuroServer):
         async with await request.accept() as connection:
             await self._handle_client_connection(connection)
 
+    async def serve_connection(self, connection: Connection) -> None:
+        """Handle a connection that was not opened through the websocket server, e.g. a loopback connection.
+
+        Returns when the connection is closed. Closing the connection is left to the caller.
+        """
+        await self._handle_client_connection(connection)
+
     async def _handle_client_connection(
         self,
-        connection: WebSocketConnection,
+        connection: Connection,
     ) -> None:
         """Handle websocket connection lifetime."""
         # Monotonically increasing client id so there will never be
@@ -771,10 +866,11 @@ class NeuroAPI(AbstractTrioNeuroServer):
 
         # Channel buffer of zero means no buffer, receive_channel has to
         # be actively waiting for something to be sent for async partial
-        # functions to go through
+        # functions to go through. With pipelined actions, the buffer lets
+        # the other actions of the window queue up behind the one being sent.
         send_channel, receive_channel = trio.open_memory_channel[
             "partial[Awaitable[Any]] | partial[Coroutine[Any, Any, Any]]"
-        ](0)
+        ](client.in_flight_window - 1)
 
         self._clients[client_id] = (client, send_channel)
 
@@ -800,6 +896,7 @@ class NeuroAPI(AbstractTrioNeuroServer):
         finally:
             self.on_client_disconnect(client_id, client.game_title)
             del self._clients[client_id]
+            self.in_flight.remove_client(client_id)
 
     async def _handle_consumer(
         self,
@@ -816,12 +913,12 @@ class NeuroAPI(AbstractTrioNeuroServer):
                 break
             except (TypeError, ValueError) as exc:
                 self.log_error(str(exc))
-                self.log_debug("".join(traceback.format_exception(exc)))
+                self.log_debug(partial(_format_exception, exc))
                 traceback.print_exception(exc)
                 self.log_debug("Assuming non-critical exception, keeping websocket open.")
             except Exception as exc:
                 self.log_error(f"Error while reading/handling message: {exc}")
-                self.log_error("".join(traceback.format_exception(exc)))
+                self.log_error(partial(_format_exception, exc))
                 traceback.print_exception(exc)
                 self.log_error("Closing websocket connection due to error.")
                 break
@@ -874,6 +971,39 @@ class NeuroAPI(AbstractTrioNeuroServer):
             return False
         return True
 
+    def _get_action_targets(self, client_id: int) -> list[tuple[int, NeuroAPIClient]] | None:
+        """Return the clients an action registered by a client is sent to, or None if the configuration is invalid."""
+        # Determine which clients to send to based on configuration
+        send_actions_to = config_snapshot().send_actions_to
+        if send_actions_to == SendActionsTo.ALL:
+            return [(cid, client) for cid, (client, _) in self._clients.items()]
+        if send_actions_to == SendActionsTo.REGISTRANT:
+            client = self._get_client(client_id)
+            return [(client_id, client)] if client else []
+        if not self._clients:
+            # No first or last connected client
+            return []
+        if send_actions_to == SendActionsTo.FIRST_CONNECTED:
+            first_client_id = min(self._clients.keys())
+            client = self._get_client(first_client_id)
+            return [(first_client_id, client)] if client else []
+        if send_actions_to == SendActionsTo.LAST_CONNECTED:
+            last_client_id = max(self._clients.keys())
+            client = self._get_client(last_client_id)
+            return [(last_client_id, client)] if client else []
+        self.log_error("Invalid send_actions_to configuration.")  # type: ignore[unreachable]
+        return None
+
+    def is_action_window_full(self, client_id: int) -> bool:
+        """Return whether an action registered by a client cannot be sent without exceeding the in-flight window.
+
+        The window is the `maxInFlightActions` setting at the time each
+        client an action is sent to connected. Actions whose result timed
+        out still count towards the window until their result arrives.
+        """
+        clients = self._get_action_targets(client_id) or []
+        return any(self.in_flight.count(cid) >= client.in_flight_window for cid, client in clients)
+
     def send_action(
         self,
         id_: str,
@@ -889,34 +1019,20 @@ class NeuroAPI(AbstractTrioNeuroServer):
             An arbitrary unique string that identifies the action. This is used to match the action with the result returned by the game.
 
         """
-        # Determine which clients to send to based on configuration
-        clients: list[tuple[int, NeuroAPIClient]]
-        config_obj = config()
-        if config_obj.send_actions_to == SendActionsTo.ALL:
-            clients = [(cid, client) for cid, (client, _) in self._clients.items()]
-        elif config_obj.send_actions_to == SendActionsTo.REGISTRANT:
-            client = self._get_client(client_id)
-            clients = [(client_id, client)] if client else []
-        elif config_obj.send_actions_to == SendActionsTo.FIRST_CONNECTED:
-            first_client_id = min(self._clients.keys())
-            client = self._get_client(first_client_id)
-            clients = [(first_client_id, client)] if client else []
-        elif config_obj.send_actions_to == SendActionsTo.LAST_CONNECTED:
-            last_client_id = max(self._clients.keys())
-            client = self._get_client(last_client_id)
-            clients = [(last_client_id, client)] if client else []
-        else:
-            self.log_error("Invalid send_actions_to configuration.")  # type: ignore[unreachable]
+        clients = self._get_action_targets(client_id)
+        if clients is None:
             return False
 
+        timeout = config_snapshot().action_result_timeout
         sent = False
         for cid, client in clients:
             if not self._submit_async_action(
                 cid,
-                partial(client.send_action_command, name, data),
+                partial(client.send_action_command_with_id, id_, name, data),
             ):
                 continue
             sent = True
+            self.in_flight.add(cid, id_, name, timeout)
 
             self.log_command(client_id, "action", False, name + (" {...}" if data else ""))
 
@@ -1107,6 +1223,7 @@ class ActionResultCommand(NamedTuple):
 
     success: bool
     message: str | None
+    id_: str | None = None
 
 
 class ShutdownReadyCommand:
@@ -7,12 +7,10 @@ from getopt import GetoptError, getopt
 from pathlib import Path
 from typing import Any, Final
 
-import requests
-import semver
 import wx
 
 from neuro_api_tony.config import config, detect_config_file, load_config_from_file
-from neuro_api_tony.constants import APP_NAME, PACKAGE_NAME, PYPI_API_URL, VERSION
+from neuro_api_tony.constants import APP_NAME, VERSION
 from neuro_api_tony.controller import TonyController
 
 HELP_MESSAGE: Final = """
@@ -39,6 +37,9 @@ Options:
         The log level to use. Default is INFO. Must be one of: DEBUG, INFO,
         WARNING, ERROR, CRITICAL.
 
+    --offline:
+        Don't check for updates.
+
     -p, --port <PORT>:
         The port number to start the websocket server on. Default is 8000.
 
@@ -60,6 +61,7 @@ def cli_run() -> None:
                 "host=",
                 "log=",
                 "log-level=",
+                "offline",
                 "port=",
                 "update",
                 "version",
@@ -76,7 +78,7 @@ def cli_run() -> None:
     address: str | None = None
     port: int | None = None
     log_level: str | None = None
-    init_message = ""
+    offline = False
     config_file: Path | None = None
 
     for option, value in options:
@@ -111,6 +113,9 @@ def cli_run() -> None:
                     sys.exit(1)
                 log_level = value.upper()
 
+            case "--offline":
+                offline = True
+
             case "-p" | "--port":
                 port = int(value)
 
@@ -163,28 +168,10 @@ def cli_run() -> None:
     if not port:
         port = config().port
 
-    # Check if there are updates available
-    try:
-        response = requests.get(PYPI_API_URL, timeout=10).json()
-        remote_version = response["info"]["version"]
-
-        if semver.compare(remote_version, VERSION) > 0:
-            init_message = (
-                f"An update is available. ({VERSION} -> {remote_version})\n"
-                f"Depending on your installation method, pull the latest changes from GitHub or "
-                f'run "pip install --upgrade {PACKAGE_NAME}" to update.'
-            )
-
-    except ConnectionError:
-        init_message = "Failed to check for updates. Please check your internet connection."
-
-    except Exception as exc:
-        init_message = f"An error occurred while checking for updates:\n{exc}"
-
     # Start the program
     app = wx.App()
     controller = TonyController(app, log_level)
-    controller.run(address, port, init_message=init_message)
+    controller.run(address, port, check_updates=not offline)
 
 
 def message(*args: Any, **kwargs: Any) -> None:
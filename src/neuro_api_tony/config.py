@@ -3,7 +3,7 @@
 import json
 import os
 import sys
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
 from pathlib import Path
 from typing import Final
@@ -29,6 +29,14 @@ class ConflictPolicy(str, Enum):
     ALLOW_DUPLICATES = "allowDuplicates"
 
 
+class DriverStrategy(str, Enum):
+    """Strategies for selecting the actions sent by the action driver."""
+
+    UNIFORM = "uniform"
+    WEIGHTED = "weighted"
+    ROUND_ROBIN = "roundRobin"
+
+
 class EditorTheme(str, Enum):
     """Editor themes."""
 
@@ -105,15 +113,20 @@ class WarningID(str, Enum):
     ACTION_ADDITIONAL_PROPERTIES = "actionAdditionalProperties"
     ACTION_NAME_CONFLICT = "actionNameConflict"
     ACTION_NAME_INVALID = "actionNameInvalid"
+    ACTION_RESULT_TIMEOUT = "actionResultTimeout"
+    ACTION_RESULT_UNKNOWN_ID = "actionResultUnknownId"
     ACTION_SCHEMA_NULL = "actionSchemaNull"
     ACTION_SCHEMA_UNSUPPORTED = "actionSchemaUnsupported"
     ACTIONS_FORCE_INVALID = "actionsForceInvalid"
     EMPTY_UNREGISTER = "emptyUnregister"
+    FORCE_RETRY_STOPPED = "forceRetryStopped"
     GAME_NAME_MISMATCH = "gameNameMismatch"
     GAME_NAME_NOT_REGISTERED = "gameNameNotRegistered"
     JSF_FAILED = "jsfFailed"
     MULTIPLE_STARTUPS = "multipleStartups"
     NO_ERROR_MESSAGE = "noErrorMessage"
+    SLOW_CALLBACK = "slowCallback"
+    SLOW_SCHEMA = "slowSchema"
     UNKNOWN_COMMAND = "unknownCommand"
 
 
@@ -193,6 +206,26 @@ LOG_THEMES: Final = {
 }
 
 
+WARNING_BITS: Final = {warning_id: 1 << index for index, warning_id in enumerate(WarningID)}
+
+MINIMUM_VALUES: Final = {
+    "action_result_timeout": 0,
+    "circuit_breaker_cooldown": 0,
+    "circuit_breaker_threshold": 1,
+    "driver_rate": 0,
+    "max_concurrent_forced_actions": 1,
+    "max_in_flight_actions": 1,
+    "port": 0,
+    "retry_base_delay": 0,
+    "retry_max_attempts": 0,
+    "retry_max_delay": 0,
+    "slow_callback_threshold": 0,
+}
+"""Smallest allowed value of each numeric setting, matching the minimums in the JSON schema."""
+MAX_PORT: Final = 65535
+"""Bit of each warning in the mask returned by `get_enabled_warnings`."""
+
+
 # endregion
 
 
@@ -201,6 +234,7 @@ LOG_THEMES: Final = {
 
 _editor_theme_colors: dict[EditorThemeColor, str] | None = None
 _log_theme_colors: dict[str, wx.Colour] | None = None
+_log_theme_attrs: dict[LogThemeColor, wx.TextAttr] | None = None
 
 
 # endregion
@@ -210,41 +244,127 @@ _log_theme_colors: dict[str, wx.Colour] | None = None
 class Config(JSONWizard, key_case="AUTO"):
     """Tony configuration."""
 
+    action_result_timeout: float = 10.0
     action_scope: ActionScope = ActionScope.GLOBAL
     address: str = "localhost"
     allowed_schema_keys: list[str] = field(default_factory=list)
     character_id: str = "tony"
+    circuit_breaker_cooldown: float = 30.0
+    circuit_breaker_threshold: int = 10
     conflict_policy: ConflictPolicy = ConflictPolicy.IGNORE
+    coverage_guided_samples: bool = True
     delete_actions_on_disconnect: bool = False
     display_name: str = "Tony"
+    driver_rate: float = 10.0
+    driver_strategy: DriverStrategy = DriverStrategy.UNIFORM
+    driver_weights: dict[str, float] = field(default_factory=dict)
     editor_color_theme: dict[EditorThemeColor, str] | EditorTheme = EditorTheme.AUTO
     fixed_session_id: str | None = None
+    fuzz_corpus_file: str | None = None
     log_action_descriptions: bool = True
     log_color_theme: dict[LogThemeColor, str] | LogTheme = LogTheme.AUTO
     log_level: str = "INFO"
+    max_concurrent_forced_actions: int = 1
+    max_in_flight_actions: int = 1
     port: int = 8000
+    retry_base_delay: float = 0.5
+    retry_max_attempts: int = 5
+    retry_max_delay: float = 10.0
     send_actions_to: SendActionsTo = SendActionsTo.REGISTRANT
     show_origin_as: ShowOriginAs = ShowOriginAs.NONE
+    slow_callback_threshold: float = 0.1
+    trace_file: str | None = None
     warnings: dict[WarningID, bool] = field(
         default_factory=lambda: {
             WarningID.ACTION_ADDITIONAL_PROPERTIES: True,
             WarningID.ACTION_NAME_CONFLICT: True,
             WarningID.ACTION_NAME_INVALID: True,
+            WarningID.ACTION_RESULT_TIMEOUT: True,
+            WarningID.ACTION_RESULT_UNKNOWN_ID: True,
             WarningID.ACTION_SCHEMA_NULL: True,
             WarningID.ACTION_SCHEMA_UNSUPPORTED: True,
             WarningID.ACTIONS_FORCE_INVALID: True,
             WarningID.EMPTY_UNREGISTER: True,
+            WarningID.FORCE_RETRY_STOPPED: True,
             WarningID.GAME_NAME_MISMATCH: True,
             WarningID.GAME_NAME_NOT_REGISTERED: True,
             WarningID.MULTIPLE_STARTUPS: True,
             WarningID.NO_ERROR_MESSAGE: True,
+            WarningID.SLOW_CALLBACK: True,
+            WarningID.SLOW_SCHEMA: True,
             WarningID.UNKNOWN_COMMAND: True,
         },
     )
+    watch_config_file: bool = True
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Immutable configuration with the values used for every message precompiled.
+
+    A new snapshot is created whenever the configuration is loaded. Handlers
+    should get the snapshot once and use it throughout, so they see one
+    consistent configuration even if it is reloaded in the meantime.
+    """
+
+    config: Config
+    """The configuration this snapshot was compiled from. Do not modify it."""
+    enabled_warnings: int
+    """Bitmask of the enabled warnings, see `WARNING_BITS`."""
+    allowed_schema_keys: frozenset[str]
+    action_scope: ActionScope
+    conflict_policy: ConflictPolicy
+    send_actions_to: SendActionsTo
+    show_origin_as: ShowOriginAs
+    log_action_descriptions: bool
+    max_in_flight_actions: int
+    action_result_timeout: float | None
+    """Seconds to wait for an action result, or None to wait forever."""
+
+    @classmethod
+    def compile(cls, config_obj: Config, defaults: Config | None = None) -> "ConfigSnapshot":
+        """Compile a snapshot of a configuration.
+
+        Warnings that are not configured use `defaults`, and are enabled if that does not configure them either.
+        Raises `ValueError` if a value is out of range.
+        """
+        for name, minimum in MINIMUM_VALUES.items():
+            # Written so that NaN is rejected as well
+            if not getattr(config_obj, name) >= minimum:
+                raise ValueError(f"{config_key(name)} must be at least {minimum}")
+        if config_obj.port > MAX_PORT:
+            raise ValueError(f"{config_key('port')} must be at most {MAX_PORT}")
+        for action_name, weight in config_obj.driver_weights.items():
+            if not weight >= 0:
+                raise ValueError(f"{config_key('driver_weights')} of {action_name!r} must be at least 0")
+
+        configured = {**(defaults.warnings if defaults is not None else {}), **config_obj.warnings}
+        enabled_warnings = 0
+        for warning_id, bit in WARNING_BITS.items():
+            if configured.get(warning_id, True):
+                enabled_warnings |= bit
+
+        return cls(
+            config=config_obj,
+            enabled_warnings=enabled_warnings,
+            allowed_schema_keys=frozenset(config_obj.allowed_schema_keys),
+            action_scope=ActionScope(config_obj.action_scope),
+            conflict_policy=ConflictPolicy(config_obj.conflict_policy),
+            send_actions_to=SendActionsTo(config_obj.send_actions_to),
+            show_origin_as=ShowOriginAs(config_obj.show_origin_as),
+            log_action_descriptions=config_obj.log_action_descriptions,
+            max_in_flight_actions=config_obj.max_in_flight_actions,
+            action_result_timeout=config_obj.action_result_timeout or None,
+        )
+
+    def is_warning_enabled(self, warning_id: WarningID) -> bool:
+        """Check if a warning is enabled in this configuration."""
+        return bool(self.enabled_warnings & WARNING_BITS[warning_id])
 
 
 _config = Config()
 _DEFAULT_CONFIG: Final = Config()
+_snapshot = ConfigSnapshot.compile(_config, _DEFAULT_CONFIG)
 _current_config_file: Path | None = None
 
 
@@ -253,30 +373,62 @@ def config() -> Config:
     return _config
 
 
+def config_snapshot() -> ConfigSnapshot:
+    """Get the compiled snapshot of the global configuration."""
+    return _snapshot
+
+
 def default_config() -> Config:
     """Get a default configuration instance."""
     return _DEFAULT_CONFIG
 
 
-def load_config_from_file(file_path: str | os.PathLike[str] | None = None) -> None:
-    """Load configuration from a JSON file."""
-    global _config, _current_config_file
+def config_key(field_name: str) -> str:
+    """Return the key of a `Config` field in the configuration file, e.g. `maxInFlightActions` for `max_in_flight_actions`."""
+    first, *rest = field_name.split("_")
+    return first + "".join(word.capitalize() for word in rest)
+
+
+def changed_config_fields(old: Config, new: Config) -> frozenset[str]:
+    """Return the names of the fields that differ between two configurations."""
+    return frozenset(f.name for f in fields(Config) if getattr(old, f.name) != getattr(new, f.name))
+
+
+def load_config_from_file(file_path: str | os.PathLike[str] | None = None) -> frozenset[str]:
+    """Load configuration from a JSON file.
+
+    Returns
+    -------
+    frozenset[str]
+        The names of the fields that changed, which is empty if there is no file to reload.
+
+    """
+    global _config, _current_config_file, _snapshot
     new_config = Config()
     if file_path is None:
         file_path = _current_config_file
     if file_path is None:
-        return
+        return frozenset()
     file_path = Path(file_path).absolute()
     data = json.loads(file_path.read_text(encoding="utf-8"))
     new_config = Config.from_dict(data)
+    # Compile before swapping so a failing config does not leave a half-updated state
+    new_snapshot = ConfigSnapshot.compile(new_config, default_config())
+    changed = changed_config_fields(_config, new_config)
     _config = new_config
+    _snapshot = new_snapshot
     _current_config_file = file_path
 
-    # Invalidate cache
-    global _editor_theme_colors
-    _editor_theme_colors = None
-    global _log_theme_colors
-    _log_theme_colors = None
+    # Invalidate caches of changed themes only, rebuilding them is not free
+    if "editor_color_theme" in changed:
+        global _editor_theme_colors
+        _editor_theme_colors = None
+    if "log_color_theme" in changed:
+        global _log_theme_colors
+        _log_theme_colors = None
+        global _log_theme_attrs
+        _log_theme_attrs = None
+    return changed
 
 
 def is_dark_mode() -> bool:
@@ -323,6 +475,36 @@ def get_log_theme_color(key: LogThemeColor) -> wx.Colour:
     return _log_theme_colors[key]
 
 
+def get_log_theme_attr(key: LogThemeColor) -> wx.TextAttr:
+    """Get the log text attributes for a log theme color based on the current configuration.
+
+    The attributes are created once per configuration and shared, do not modify them.
+    """
+    global _log_theme_attrs
+    if _log_theme_attrs is None:
+        _log_theme_attrs = {}
+
+    attr = _log_theme_attrs.get(key)
+    if attr is None:
+        # Cache the text attributes
+        attr = _log_theme_attrs[key] = wx.TextAttr(get_log_theme_color(key))
+    return attr
+
+
+def get_enabled_warnings() -> int:
+    """Get a bitmask of the enabled warnings based on the current configuration.
+
+    Use `WARNING_BITS` to get the bit of a warning.
+    Warnings that are not configured use the default configuration, and are enabled if that does not configure them either.
+    """
+    return _snapshot.enabled_warnings
+
+
+def is_warning_enabled(warning_id: WarningID) -> bool:
+    """Check if a warning is enabled in the current configuration."""
+    return _snapshot.is_warning_enabled(warning_id)
+
+
 def get_config_file_path() -> Path | None:
     """Get the absolute path to the configuration file if it exists."""
     return _current_config_file
@@ -0,0 +1,188 @@
+"""Config Watcher - Detecting changes to the loaded configuration file."""
+
+from __future__ import annotations
+
+import ctypes
+import os
+import struct
+import sys
+from typing import TYPE_CHECKING, NamedTuple
+
+from neuro_api_tony.config import get_config_file_path
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+CONFIG_WATCH_INTERVAL = 1000
+"""Milliseconds between checks whether the configuration file changed."""
+
+# From <sys/inotify.h>
+_IN_MODIFY = 0x2
+_IN_ATTRIB = 0x4
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_IN_EVENT = struct.Struct("iIII")
+_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+"""Events that may change a file, including editors replacing it with another one."""
+
+
+class _Inotify:
+    """Watches a directory with Linux inotify, without blocking."""
+
+    __slots__ = ("_fd", "directory")
+
+    def __init__(self, directory: Path) -> None:
+        """Start watching a directory. Raises OSError if inotify is not available."""
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, "inotify_add_watch failed", str(directory))
+        self._fd = fd
+        self.directory = directory
+
+    def __repr__(self) -> str:
+        """Return representation of this watch."""
+        return f"{self.__class__.__name__}({str(self.directory)!r})"
+
+    def changed_names(self) -> set[str] | None:
+        """Return the names of the files that changed since the last call, or None if events were lost."""
+        names: set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _IN_EVENT.unpack_from(data, offset)
+                offset += _IN_EVENT.size
+                if mask & _IN_Q_OVERFLOW:
+                    return None
+                names.add(os.fsdecode(data[offset : offset + length].rstrip(b"\0")))
+                offset += length
+
+    def close(self) -> None:
+        """Stop watching."""
+        os.close(self._fd)
+
+
+class FileStamp(NamedTuple):
+    """What is compared to find out whether a file changed."""
+
+    path: Path
+    mtime_ns: int
+    size: int
+
+
+class ConfigWatcher:
+    """Checks the configuration file for changes.
+
+    On Linux, the directory of the file is watched with inotify, so a check
+    is a single non-blocking read that only looks at the file when it was
+    touched. Elsewhere, or if inotify cannot be used, e.g. because the
+    limit of watches is reached, the file is polled with one `stat` call per
+    check. Polling works on every platform and file system, including
+    network drives that do not report changes. Either way, editors that
+    replace the file instead of writing it are handled.
+    """
+
+    __slots__ = ("_inotify", "_stamp", "path_getter", "use_inotify")
+
+    def __init__(
+        self,
+        path_getter: Callable[[], Path | None] = get_config_file_path,
+        use_inotify: bool = sys.platform.startswith("linux"),
+    ) -> None:
+        """Initialize ConfigWatcher.
+
+        Parameters
+        ----------
+        path_getter : Callable[[], Path | None]
+            Function returning the path of the file to watch, or None if there is none.
+        use_inotify : bool
+            Whether to watch the file with inotify instead of polling it.
+
+        """
+        self.path_getter = path_getter
+        self.use_inotify = use_inotify
+        self._inotify: _Inotify | None = None
+        self._stamp: FileStamp | None = None
+        self.reset()
+
+    def __repr__(self) -> str:
+        """Return representation of this watcher."""
+        return f"{self.__class__.__name__}({self._stamp}, {self._inotify or 'polling'})"
+
+    def _changed_names(self, path: Path) -> set[str] | None:
+        """Return the names of the files that changed in the directory of a file since the last call.
+
+        Returns None if that is not known, i.e. if the file is polled, the
+        watch just started or events were lost.
+        """
+        if not self.use_inotify:
+            return None
+        if self._inotify is not None and self._inotify.directory == path.parent:
+            return self._inotify.changed_names()
+
+        self.close()
+        try:
+            self._inotify = _Inotify(path.parent)
+        except (OSError, AttributeError):
+            # Not supported by the system or file system, poll from now on
+            self.use_inotify = False
+        return None
+
+    def _current_stamp(self) -> FileStamp | None:
+        """Return the stamp of the watched file, or None if there is no file."""
+        path = self.path_getter()
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return FileStamp(path, stat.st_mtime_ns, stat.st_size)
+
+    def poll(self) -> bool:
+        """Return whether the watched file changed since the last call.
+
+        A different file being watched, e.g. because another file was loaded,
+        does not count as a change. A missing file does not count either,
+        since editors briefly remove files while saving them.
+        """
+        path = self.path_getter()
+        names = None if path is None else self._changed_names(path)
+        unchanged = names is not None and path is not None and path.name not in names
+        if unchanged and self._stamp is not None and self._stamp.path == path:
+            # Nothing touched the file, so there is no need to look at it
+            return False
+
+        stamp = self._current_stamp()
+        if stamp is None:
+            return False
+        old_stamp, self._stamp = self._stamp, stamp
+        return old_stamp is not None and old_stamp.path == stamp.path and old_stamp != stamp
+
+    def reset(self) -> None:
+        """Take the current state of the file as unchanged, e.g. after loading it."""
+        path = self.path_getter()
+        if path is not None:
+            self._changed_names(path)
+        self._stamp = self._current_stamp()
+
+    def close(self) -> None:
+        """Stop watching the file."""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
@@ -4,10 +4,11 @@ from __future__ import annotations
 
 import json
 import random
+import threading
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import wx
-from jsf import JSF
 
 from neuro_api_tony.api import (
     ActionResultCommand,
@@ -24,15 +25,42 @@ from neuro_api_tony.config import (
     ConflictPolicy,
     WarningID,
     config,
+    config_key,
+    config_snapshot,
     get_config_file_path,
     load_config_from_file,
 )
+from neuro_api_tony.config_watcher import CONFIG_WATCH_INTERVAL, ConfigWatcher
 from neuro_api_tony.constants import VERSION
 from neuro_api_tony.model import NeuroAction, TonyModel
+from neuro_api_tony.retry import CircuitBreaker, RetryPolicy
+from neuro_api_tony.samples import SamplePool, sample_generator, schema_key
+from neuro_api_tony.scheduler import ForceScheduler
+from neuro_api_tony.stalls import LOOP_LAG_INTERVAL, LoopLagMonitor, SchedulingInstrument, SlowCallback, StallDetector
+from neuro_api_tony.ui_queue import UIUpdateQueue
 from neuro_api_tony.view import TonyView
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Generator, Mapping
+
+    from neuro_api_tony.driver import ActionDriver
+    from neuro_api_tony.fuzz import FuzzCase, Fuzzer
+    from neuro_api_tony.samples import SchemaCost
+    from neuro_api_tony.scheduler import ForceRequest
+    from neuro_api_tony.schema_coverage import SchemaCoverage
+
+
+DRIVER_TICK_INTERVAL = 10
+"""Milliseconds between checks whether the action driver should send actions."""
+
+DRIVER_REPORT_INTERVAL = 60
+"""Seconds between logged summaries of the action driver."""
+
+RESTART_CONFIG_FIELDS = frozenset({"address", "port", "trace_file"})
+"""Config fields that only take effect when Tony is restarted."""
+
+CONNECT_CONFIG_FIELDS = frozenset({"max_in_flight_actions"})
+"""Config fields that are fixed for each client when it connects, so they only apply to clients that connect afterwards."""
 
 
 def action_id_generator() -> Generator[str, None, None]:
@@ -50,16 +78,49 @@ class TonyController:
         """Initialize Tony Controller."""
         self.app = app
         self.model = TonyModel()
-        self.api = NeuroAPI(wx.CallAfter)
+        # All cross-thread and deferred UI updates go through one batched queue
+        self.ui_queue = UIUpdateQueue(wx.CallAfter)
+        self.api = NeuroAPI(self.ui_queue.call_soon_threadsafe)
         self.view = TonyView(app, self.model, log_level, self.api.on_close)
-
-        self.active_actions_force: ActionsForceCommand | None = None
+        self.ui_queue.target = self.view
+
+        # The GUI thread also runs the network I/O, so anything blocking it stalls every client
+        self.stall_detector = StallDetector(config().slow_callback_threshold)
+        self.ui_queue.detector = self.stall_detector
+        self.api.instruments.append(SchedulingInstrument(self.stall_detector))
+        self.loop_lag_monitor = LoopLagMonitor(self.stall_detector)
+        self.loop_lag_timer = wx.PyTimer(self.loop_lag_monitor.tick)
+
+        # Forced actions from all clients, served by priority
+        self.force_scheduler = ForceScheduler(config().max_concurrent_forced_actions)
+        self.retry_policy = RetryPolicy(
+            config().retry_max_attempts,
+            config().retry_base_delay,
+            config().retry_max_delay,
+            CircuitBreaker(config().circuit_breaker_threshold, config().circuit_breaker_cooldown),
+        )
+        # Pre-generated samples so auto-answered forced actions are sent right away
+        self.sample_pool = SamplePool()
+        # Which parts of each action schema the sent data exercised, created when first needed
+        self.schema_coverage: SchemaCoverage | None = None
 
         self.id_generator = action_id_generator()
 
+        self.driver: ActionDriver | None = None
+        self.driver_timer = wx.PyTimer(self.drive)
+        self.driver_reported_at = 0.0
+        # Tracks invalid data sent by the driver while fuzzing, outlives the driver for late results.
+        # Created when fuzzing is first used.
+        self.fuzzer: Fuzzer | None = None
+        # The forced action whose dialog is in use, so the action sent from it can be matched with its result
+        self.forcing: ForceRequest | None = None
+
+        self.config_watcher = ConfigWatcher()
+        self.config_watch_timer = wx.PyTimer(self.check_config_file)
+
         self.inject()
 
-    def run(self, address: str, port: int, init_message: str) -> None:
+    def run(self, address: str, port: int, check_updates: bool = True) -> None:
         """Start websocket server on given address and run GUI main event loop."""
         # Schedule the API start to run after the main loop starts
         wx.CallAfter(self.api.start, address, port)
@@ -67,11 +128,48 @@ class TonyController:
         config_file = get_config_file_path()
         if config_file:
             wx.CallAfter(self.view.log_info, f"Loaded configuration from {config_file}")
-        if init_message:
-            wx.CallAfter(self.view.log_info, init_message)
+
+        # Start the sample worker process early, it takes a moment to start
+        sample_generator().start()
+
+        trace_file = config().trace_file
+        if trace_file:
+            from neuro_api_tony.trace import TraceWriter
+
+            try:
+                self.api.trace = TraceWriter(trace_file)
+            except OSError as exc:
+                # Tony is still useful without a trace, so a bad path must not stop it from starting
+                wx.CallAfter(self.view.log_error, f"Failed to open trace file {Path(trace_file).absolute()}: {exc}")
+            else:
+                self.api.trace.on_error = self.on_trace_error
+                wx.CallAfter(self.view.log_info, f"Recording websocket messages to {Path(trace_file).absolute()}")
 
         self.view.show()
+        self.config_watch_timer.Start(CONFIG_WATCH_INTERVAL)
+        self.loop_lag_timer.Start(LOOP_LAG_INTERVAL)
+        self.stall_detector.start()
+        if check_updates:
+            # Querying PyPI can take a while without internet, so it must not delay the window
+            threading.Thread(target=self.check_for_updates, name="update-check", daemon=True).start()
         self.app.MainLoop()
+        self.config_watch_timer.Stop()
+        self.config_watcher.close()
+        self.loop_lag_timer.Stop()
+        self.stall_detector.close()
+        self.driver_timer.Stop()
+        self.sample_pool.close()
+        sample_generator().close()
+        if self.api.trace is not None:
+            self.api.trace.close()
+
+    def check_for_updates(self) -> None:
+        """Log whether an update is available. Blocks while PyPI is queried, so it runs in a background thread."""
+        from neuro_api_tony.update_check import check_for_updates
+
+        update_message = check_for_updates()
+        if update_message:
+            wx.CallAfter(self.view.log_info, update_message)
 
     def inject(self) -> None:
         """Inject methods into the view and API."""
@@ -82,6 +180,7 @@ class TonyController:
         self.api.on_actions_unregister = self.on_actions_unregister
         self.api.on_actions_force = self.on_actions_force
         self.api.on_action_result = self.on_action_result
+        self.api.on_action_timeout = self.on_action_timeout
         self.api.on_shutdown_ready = self.on_shutdown_ready
         self.api.on_unknown_command = self.on_unknown_command
         self.api.log_command = self.view.log_command
@@ -107,8 +206,15 @@ class TonyController:
         self.view.on_send_shutdown_graceful = self.on_view_send_shutdown_graceful
         self.view.on_send_shutdown_graceful_cancel = self.on_view_send_shutdown_graceful_cancel
         self.view.on_send_shutdown_immediate = self.on_view_send_shutdown_immediate
+        self.view.on_start_driver = self.on_view_start_driver
+        self.view.on_stop_driver = self.on_view_stop_driver
 
         self.view.get_clients = self.api.get_clients
+
+        sample_generator().on_slow_schema = self.on_slow_schema
+        self.sample_pool.on_refill_error = self.on_sample_refill_error
+        self.sample_pool.steer = self.steer_sample
+        self.stall_detector.on_slow_callback = self.on_slow_callback
         # fmt: on
 
     def on_any_command(self, client_id: int, cmd: Any) -> None:
@@ -123,19 +229,27 @@ class TonyController:
         self.view.log_info(f"Closing websocket connection for client id {client_id} ({game}).")
         if config().delete_actions_on_disconnect:
             self.model.remove_actions(client_id=client_id)
-            self.view.remove_actions(client_id=client_id)
+            self.ui_queue.remove_actions(client_id=client_id)
+
+        if self.fuzzer is not None:
+            self.log_fuzz_findings(self.fuzzer.on_disconnect(client_id), "crashed")
+
+        # A disconnected client will not send a result for its forced action
+        self.force_scheduler.remove_client(client_id)
+        self.retry_policy.breaker.remove_client(client_id)
+        self.start_actions_force()
 
     def on_startup(self, client_id: int, cmd: StartupCommand) -> None:
         """Handle the startup command."""
         self.view.log_info(f'Client {client_id} started game "{cmd.game}"')
 
         # Unregister all actions for this game if set to global
-        if config().action_scope == ActionScope.GLOBAL:
-            actions_to_remove = [action for action in self.view.get_actions() if action.game == cmd.game]
+        if config_snapshot().action_scope == ActionScope.GLOBAL:
+            actions_to_remove = [action for action in self.model.actions if action.game == cmd.game]
             if actions_to_remove:
                 for action in actions_to_remove:
                     self.model.remove_actions(name=action.name)
-                    self.view.remove_actions(name=action.name)
+                    self.ui_queue.remove_actions(name=action.name)
                 self.view.log_info(
                     f'Removed {len(actions_to_remove)} action(s) previously registered for "{cmd.game}".',
                 )
@@ -146,55 +260,66 @@ class TonyController:
 
     def on_actions_register(self, client_id: int, cmd: ActionsRegisterCommand) -> None:
         """Handle the actions/register command."""
+        snapshot = config_snapshot()
+        # Determine whether to check globally or per-client
+        check_id = client_id if snapshot.action_scope == ActionScope.CLIENT else None
+        conflict_policy = snapshot.conflict_policy
+
         # Check for actions with the same name
         for action in cmd.actions:
-            # Determine whether to check globally or per-client
-            check_id = client_id if config().action_scope == ActionScope.CLIENT else None
-            if self.view.has_action(name=action.name, client_id=check_id):
-                if config().conflict_policy == ConflictPolicy.IGNORE:
+            if self.model.get_actions(name=action.name, client_id=check_id):
+                if conflict_policy == ConflictPolicy.IGNORE:
                     self.view.log_warning(
                         WarningID.ACTION_NAME_CONFLICT,
                         f'Action "{action.name}" already exists. Ignoring.',
                     )
                     continue
-                if config().conflict_policy == ConflictPolicy.OVERWRITE:
+                if conflict_policy == ConflictPolicy.OVERWRITE:
                     self.view.log_warning(
                         WarningID.ACTION_NAME_CONFLICT,
                         f'Action "{action.name}" already exists. Overwriting.',
                     )
                     self.model.remove_actions(name=action.name, client_id=check_id)
-                    wx.CallAfter(self.view.remove_actions, name=action.name, client_id=check_id)
-                elif config().conflict_policy == ConflictPolicy.ALLOW_DUPLICATES:
+                    self.ui_queue.remove_actions(name=action.name, client_id=check_id)
+                elif conflict_policy == ConflictPolicy.ALLOW_DUPLICATES:
                     self.view.log_warning(
                         WarningID.ACTION_NAME_CONFLICT,
                         f'Action "{action.name}" already exists. Allowing duplicate.',
                     )
                 else:
-                    self.view.log_error(
-                        f'Unknown conflict policy: {config().conflict_policy}. Cannot register action "{action.name}".',
+                    self.view.log_error(  # type: ignore[unreachable]
+                        f'Unknown conflict policy: {conflict_policy}. Cannot register action "{action.name}".',
                     )
                     continue
 
             self.model.add_action(action)
-            wx.CallAfter(self.view.add_action, action)
+            self.ui_queue.add_action(action)
+            if action.schema:
+                cost = sample_generator().cost(action.schema)
+                if cost is not None and cost.slow:
+                    self.log_slow_schema(action.name, cost)
+                if config().coverage_guided_samples:
+                    # Created before the samples are generated, so they are steered from the start
+                    self.get_schema_coverage().get(action.name, action.schema)
+                self.sample_pool.prepare(action.schema)
             self.view.log_description(f"{action.name}: {action.description}", client_id)
         s = "s" if len(cmd.actions) != 1 else ""
-        self.view.log_info(f"Action{s} registered: {', '.join(action.name for action in cmd.actions)}")
+        self.view.log_info(lambda: f"Action{s} registered: {', '.join(action.name for action in cmd.actions)}")
 
     def on_actions_unregister(self, client_id: int, cmd: ActionsUnregisterCommand) -> None:
         """Handle the actions/unregister command."""
         known_actions = [name for name in cmd.action_names if self.model.has_action(name)]
         unknown_actions = [name for name in cmd.action_names if not self.model.has_action(name)]
-        check_id = client_id if config().action_scope == ActionScope.CLIENT else None
+        check_id = client_id if config_snapshot().action_scope == ActionScope.CLIENT else None
         for name in known_actions:
             self.model.remove_actions(name=name, client_id=check_id)
-            self.view.remove_actions(name=name, client_id=check_id)
+            self.ui_queue.remove_actions(name=name, client_id=check_id)
         s1 = "s" if len(cmd.action_names) != 1 else ""
         s2 = "s" if len(unknown_actions) != 1 else ""
         if known_actions:
-            self.view.log_info(f"Action{s1} unregistered: {', '.join(known_actions)}")
+            self.view.log_info(lambda: f"Action{s1} unregistered: {', '.join(known_actions)}")
         if unknown_actions:
-            self.view.log_info(f"Ignoring unregistration of unknown action{s2}: {', '.join(unknown_actions)}")
+            self.view.log_info(lambda: f"Ignoring unregistration of unknown action{s2}: {', '.join(unknown_actions)}")
         if not known_actions and not unknown_actions:
             self.view.log_warning(WarningID.EMPTY_UNREGISTER, "No actions to unregister specified.")
 
@@ -209,34 +334,45 @@ class TonyController:
 
         if self.view.controls.ignore_actions_force:
             self.view.log_info("Forced action ignored.")  # TODO: Make this configurable as warning?
-            self.active_actions_force = None
             return
 
         # Check if all actions exist
-        check_id = client_id if config().action_scope == ActionScope.GLOBAL else None
+        check_id = client_id if config_snapshot().action_scope == ActionScope.GLOBAL else None
         if not all(self.model.has_action(name) for name in cmd.action_names):
             self.view.log_warning(
                 WarningID.ACTIONS_FORCE_INVALID,
-                "actions/force with invalid actions received. Discarding.\nInvalid actions: "
-                + ", ".join(
-                    name for name in cmd.action_names if not self.view.has_action(name=name, client_id=check_id)
+                lambda: (
+                    "actions/force with invalid actions received. Discarding.\nInvalid actions: "
+                    + ", ".join(name for name in cmd.action_names if not self.model.has_action(name, check_id))
                 ),
             )
-            self.active_actions_force = None
             return
 
-        self.execute_actions_force(client_id, cmd)
+        if self.force_scheduler.active(client_id) is not None:
+            self.view.log_info("Client already has an active forced action, queueing the new one.")
+        self.force_scheduler.submit(client_id, cmd)
+        self.start_actions_force()
 
     def on_action_result(self, client_id: int, cmd: ActionResultCommand) -> None:
         """Handle the action/result command."""
         self.view.log_info("Action result indicates " + ("success" if cmd.success else "failure"))
 
-        self.view.log_debug(f"cmd.success: {cmd.success}, active_actions_force: {self.active_actions_force}")
-
-        if not cmd.success and self.active_actions_force is not None:
-            self.retry_actions_force(client_id, self.active_actions_force)
-        else:
-            self.active_actions_force = None
+        driven = self.driver is not None and self.driver.record_result(cmd.id_, cmd.success)
+        case = None if self.fuzzer is None else self.fuzzer.record_result(cmd.id_, cmd.success)
+        if case is not None and cmd.success:
+            self.view.log_info(f"Game accepted invalid data for action {case.action} ({case.mutation}).")
+        # Only the result of the action sent for the forced action finishes it
+        request = self.force_scheduler.active(client_id)
+        if request is not None and request.action_id != cmd.id_:
+            request = None
+        self.view.log_debug(lambda: f"cmd.success: {cmd.success}, active forced action: {request}")
+
+        if request is not None:
+            if cmd.success:
+                self.retry_policy.on_success(client_id, request.attempts)
+                self.finish_actions_force(client_id)
+            else:
+                self.schedule_retry_actions_force(client_id, request)
 
         if cmd.message is not None:
             self.view.log_action_result(cmd.success, cmd.message, client_id)
@@ -245,7 +381,90 @@ class TonyController:
         else:
             self.view.log_warning(WarningID.NO_ERROR_MESSAGE, "Failed action result contains no message.")
 
-        wx.CallAfter(self.view.on_action_result, cmd.success, cmd.message)
+        self.ui_queue.action_result(cmd.success, cmd.message)
+
+        if driven and self.driver is not None and self.driver.rate <= 0:
+            self.drive()
+
+    def on_action_timeout(self, client_id: int, id_: str) -> None:
+        """Handle an action whose result did not arrive in time."""
+        case = None if self.fuzzer is None else self.fuzzer.record_timeout(id_)
+        if case is not None:
+            self.log_fuzz_findings([case], "hung")
+        request = self.force_scheduler.active(client_id)
+        if request is not None and request.action_id == id_:
+            self.view.log_info(f"Giving up on the forced action of client {client_id}, serving the next one.")
+            self.finish_actions_force(client_id)
+
+    def on_fuzz_corpus_error(self, exc: OSError) -> None:
+        """Handle invalid data that could not be recorded to the fuzz corpus."""
+        self.view.log_error(f"Failed to record to fuzz corpus {self.get_fuzzer().corpus_file}: {exc}")
+
+    def on_slow_schema(self, schema: Mapping[str, object], cost: SchemaCost) -> None:
+        """Handle a schema found to be slow while generating a sample. May be called from any thread."""
+        key = schema_key(schema)
+
+        def log() -> None:
+            names = [
+                action.name for action in self.model.actions if action.schema and schema_key(action.schema) == key
+            ]
+            self.log_slow_schema(", ".join(names) or "an unregistered action", cost)
+
+        self.ui_queue.call_soon_threadsafe(log)
+
+    def on_trace_error(self, exc: Exception) -> None:
+        """Handle websocket messages that could not be written to the trace file. Called from the trace thread."""
+        trace = self.api.trace
+        message = f"Failed to write to trace file {trace.path.absolute() if trace else None}: {exc}"
+        self.ui_queue.call_soon_threadsafe(lambda: self.view.log_error(f"{message}. No longer recording messages."))
+
+    def on_sample_refill_error(self, schema: Mapping[str, object], exc: Exception) -> None:
+        """Handle a sample that could not be pre-generated. Called from the sample pool thread."""
+        key = schema_key(schema)
+
+        def log() -> None:
+            names = [
+                action.name for action in self.model.actions if action.schema and schema_key(action.schema) == key
+            ]
+            self.view.log_error(
+                f"Failed to pre-generate samples for {', '.join(names) or 'an unregistered action'},"
+                f" generating them when needed instead: {type(exc).__name__}: {exc}",
+            )
+
+        self.ui_queue.call_soon_threadsafe(log)
+
+    def log_slow_schema(self, names: str, cost: SchemaCost) -> None:
+        """Log a warning about a slow schema."""
+        if cost.error is not None:
+            self.view.log_warning(
+                WarningID.JSF_FAILED,
+                f"JSF failed for {names}, using fallback generator: {cost.error}",
+            )
+        elif cost.timeouts:
+            self.view.log_warning(
+                WarningID.SLOW_SCHEMA,
+                f"Generating a sample for {names} took longer than {sample_generator().budget:g} s,"
+                " using fallback generator.",
+            )
+        else:
+            self.view.log_warning(
+                WarningID.SLOW_SCHEMA,
+                f"Generating a sample for {names} is slow ({cost.max_time * 1000:.0f} ms).",
+            )
+
+    def on_slow_callback(self, slow_callback: SlowCallback) -> None:
+        """Handle a callback that blocked the GUI thread. Logging is deferred, since the detector may be inside a Trio task step."""
+
+        def log() -> None:
+            self.view.log_warning(
+                WarningID.SLOW_CALLBACK,
+                f"{slow_callback.name} blocked the GUI thread for {slow_callback.duration * 1000:.0f} ms,"
+                " delaying all clients.",
+            )
+            if slow_callback.stack is not None:
+                self.view.log_debug(f"Stack of {slow_callback.name} while it was blocking:\n{slow_callback.stack}")
+
+        self.ui_queue.call_soon_threadsafe(log)
 
     def on_shutdown_ready(self, client_id: int, cmd: ShutdownReadyCommand) -> None:
         """Handle the shutdown/ready command."""
@@ -260,12 +479,58 @@ class TonyController:
         """Send an action command to the API. Returns True if sent successfully."""
         self.view.log_info(f"Sending action: {name}")
         sent = self.api.send_action(id_, name, data, client_id)
-
-        # Disable the actions until the result is received
         if sent:
+            self.record_coverage(client_id, name, data)
+
+        # Disable the actions until a result is received, unless more actions can be in flight
+        if sent and self.api.is_action_window_full(client_id):
             self.view.disable_actions()
         return sent
 
+    def sample_action_data(self, action: NeuroAction) -> str | None:
+        """Return pre-generated data for an action."""
+        if not action.schema:
+            return None
+        return self.sample_pool.take(action.schema)
+
+    def steer_sample(self, schema: Mapping[str, object], sample: object) -> object:
+        """Steer a pre-generated sample towards parts of its schema no data exercised yet. Called from the sample pool thread."""
+        coverage = self.schema_coverage
+        if coverage is None or not config().coverage_guided_samples:
+            return sample
+        return coverage.steer(schema, sample)
+
+    def record_coverage(self, client_id: int, name: str, data: str | None) -> None:
+        """Record which parts of the schema of an action the sent data exercised."""
+        action = next(
+            (action for action in self.model.actions if action.name == name and action.client_id == client_id),
+            None,
+        )
+        if action is None or not action.schema or data is None:
+            return
+        try:
+            value = json.loads(data)
+        except ValueError:
+            return  # Invalid data sent on purpose
+        self.get_schema_coverage().get(name, action.schema).record(value)
+
+    def get_schema_coverage(self) -> SchemaCoverage:
+        """Return the schema coverage of the sent data, creating it on first use."""
+        if self.schema_coverage is None:
+            from neuro_api_tony.schema_coverage import SchemaCoverage
+
+            self.schema_coverage = SchemaCoverage()
+        return self.schema_coverage
+
+    def get_fuzzer(self) -> Fuzzer:
+        """Return the fuzzer, creating it when fuzzing is first used."""
+        if self.fuzzer is None:
+            from neuro_api_tony.fuzz import Fuzzer
+
+            self.fuzzer = Fuzzer(config().fuzz_corpus_file)
+            self.fuzzer.on_corpus_error = self.on_fuzz_corpus_error
+        return self.fuzzer
+
     def send_actions_reregister_all(self, client_id: int | None) -> None:
         """Send an actions/reregister_all command to the API."""
         self.api.send_actions_reregister_all(client_id)
@@ -275,34 +540,34 @@ class TonyController:
 
         Returns True if an action was sent, False if the action was cancelled.
         """
+        id_ = next(self.id_generator)
         if not action.schema:
             # No schema, so send the action immediately
-            return self.send_action(
-                action.client_id,
-                next(self.id_generator),
-                action.name,
-                None,
-            )
+            sent = self.send_action(action.client_id, id_, action.name, None)
+        else:
+            # If there is a schema, open a dialog to get the data
+            result = self.view.show_action_dialog(action)
+            if result is None:
+                return False  # User cancelled the dialog
 
-        # If there is a schema, open a dialog to get the data
-        result = self.view.show_action_dialog(action)
-        if result is None:
-            return False  # User cancelled the dialog
+            self.model.last_action_data[action.name] = result  # Store the last data in the action object
+            sent = self.send_action(action.client_id, id_, action.name, result)
 
-        self.model.last_action_data[action.name] = result  # Store the last data in the action object
-        return self.send_action(action.client_id, next(self.id_generator), action.name, result)
+        if sent and self.forcing is not None:
+            self.forcing.action_id = id_
+        return sent
 
     def on_view_delete_action(self, client_id: int, name: str) -> None:
         """Handle a request to delete an action from the view."""
         self.model.remove_actions(name=name, client_id=client_id)
-        self.view.remove_actions(name=name, client_id=client_id)
+        self.ui_queue.remove_actions(name=name, client_id=client_id)
 
         self.view.log_info(f"Action deleted: {name}")
 
     def on_view_delete_all_actions(self, client_id: int | None) -> None:
         """Handle a request to delete all actions from the view."""
         self.model.remove_actions(client_id=client_id)
-        self.view.remove_actions(client_id=client_id)
+        self.ui_queue.remove_actions(client_id=client_id)
         if client_id is not None:
             game = self.api.get_game_from_client_id(client_id) or f"provisional_name_{client_id}"
             self.view.log_info(f'All actions deleted for "{game}" (ID: {client_id}).')
@@ -313,6 +578,10 @@ class TonyController:
         """Handle a request to unlock the view."""
         self.view.log_info("Stopped waiting for action result.")  # TODO: Make this configurable as warning?
         self.view.enable_actions()
+        # Forced actions waiting for a result would otherwise hold up the queue
+        for request in self.force_scheduler.active_requests():
+            if request.action_id is not None:
+                self.finish_actions_force(request.client_id)
 
     def on_view_clear_logs(self) -> None:
         """Handle a request to clear the logs from the view."""
@@ -322,7 +591,7 @@ class TonyController:
     def on_view_send_actions_reregister_all(self, client_id: int | None) -> None:
         """Handle a request to send an actions/reregister_all command from the view."""
         self.model.remove_actions(client_id=client_id)
-        wx.CallAfter(self.view.remove_actions, client_id=client_id)
+        self.ui_queue.remove_actions(client_id=client_id)
         self.send_actions_reregister_all(client_id)
 
     def on_view_send_shutdown_graceful(self, client_id: int | None) -> None:
@@ -337,6 +606,103 @@ class TonyController:
         """Handle a request to send a shutdown/immediate command from the view."""
         self.api.send_shutdown_immediate(client_id)
 
+    def on_view_start_driver(self, client_id: int | None) -> None:
+        """Handle a request to start the action driver from the view."""
+        from neuro_api_tony.driver import ActionDriver
+
+        config_obj = config()
+        self.driver = ActionDriver(
+            config_obj.driver_strategy,
+            config_obj.driver_rate,
+            config_obj.driver_weights,
+            client_id,
+        )
+        if self.fuzzer is not None:
+            corpus_file = config_obj.fuzz_corpus_file
+            self.fuzzer.corpus_file = None if corpus_file is None else Path(corpus_file)
+        self.driver_reported_at = self.driver.started_at
+        rate = (
+            f"{config_obj.driver_rate:g} actions/s" if config_obj.driver_rate > 0 else "as fast as results come back"
+        )
+        target = "all clients" if client_id is None else f"client {client_id}"
+        fuzzing = ", fuzzing" if self.view.controls.fuzz else ""
+        self.view.log_info(
+            f"Driver started for {target}, sending {rate} ({config_obj.driver_strategy.value}{fuzzing}).",
+        )
+        self.view.set_driver_running(True)
+        self.driver_timer.Start(DRIVER_TICK_INTERVAL)
+        self.drive()
+
+    def on_view_stop_driver(self) -> None:
+        """Handle a request to stop the action driver from the view."""
+        if self.driver is None:
+            return
+        self.driver_timer.Stop()
+        self.view.log_info(f"Driver stopped. {self.driver.summary()}.")
+        report = {} if self.schema_coverage is None else self.schema_coverage.report()
+        if report:
+            self.view.log_info(
+                "Schema coverage: " + ", ".join(f"{name} {coverage}" for name, coverage in report.items()),
+            )
+        self.driver = None
+        self.view.set_driver_running(False)
+
+    def drive(self) -> None:
+        """Send the actions the driver is due to send."""
+        driver = self.driver
+        if driver is None:
+            return
+
+        if driver.rate > 0:
+            count = driver.due()
+        else:
+            # Fill the in-flight window of every client, the rest is sent as results come back
+            count = config().max_in_flight_actions * max(1, self.api.clients_connected)
+
+        sent = 0
+        # Clients whose window is full are skipped, the others may still have room
+        full: set[int] = set()
+        while sent < count:
+            action = driver.select([action for action in self.model.actions if action.client_id not in full])
+            if action is None:
+                break
+            if self.api.is_action_window_full(action.client_id):
+                full.add(action.client_id)
+                continue
+            id_ = next(self.id_generator)
+            data = self.sample_action_data(action)
+            if self.view.controls.fuzz:
+                fuzzer = self.get_fuzzer()
+                mutation, data = fuzzer.mutate(action.schema, data)
+                if not self.api.send_action(id_, action.name, data, action.client_id):
+                    full.add(action.client_id)
+                    continue
+                fuzzer.record_sent(id_, action.client_id, action.name, mutation, data)
+            elif self.api.send_action(id_, action.name, data, action.client_id):
+                self.record_coverage(action.client_id, action.name, data)
+            else:
+                full.add(action.client_id)
+                continue
+            driver.record_sent(id_)
+            sent += 1
+        driver.give_back(count - sent)
+
+        now = driver.clock()
+        if now - self.driver_reported_at >= DRIVER_REPORT_INTERVAL:
+            self.driver_reported_at = now
+            self.view.log_info(f"Driver: {driver.summary()}.")
+
+    def log_fuzz_findings(self, cases: list[FuzzCase], outcome: str) -> None:
+        """Log invalid data that crashed or hung a game."""
+        if not cases:
+            return
+        corpus_file = self.get_fuzzer().corpus_file
+        corpus = "" if corpus_file is None else f", recorded to {corpus_file}"
+        for case in cases:
+            self.view.log_error(
+                f"Game {outcome} after invalid data for action {case.action} ({case.mutation}){corpus}.",
+            )
+
     def on_view_load_config(self, file_path: str | None = None) -> None:
         """Handle a request to load a configuration file from the view.
 
@@ -350,7 +716,57 @@ class TonyController:
                 self.view.log_info(f"Reloading configuration from {current_file_path}.")
         else:
             self.view.log_info(f"Loading configuration from {file_path}.")
-        load_config_from_file(file_path)
+        self.apply_config_changes(load_config_from_file(file_path))
+        self.config_watcher.reset()
+
+    def check_config_file(self) -> None:
+        """Reload the configuration if its file changed."""
+        if not self.config_watcher.poll() or not config().watch_config_file:
+            return
+
+        self.view.log_info(f"Configuration file {get_config_file_path()} changed, reloading.")
+        try:
+            changed = load_config_from_file()
+        except Exception as exc:
+            # Probably saved halfway, the file will change again
+            self.view.log_error(f"Failed to reload configuration, keeping the previous one: {exc}")
+            return
+        self.apply_config_changes(changed)
+
+    def apply_config_changes(self, changed: frozenset[str]) -> None:
+        """Apply the changed fields of a reloaded configuration to the running components."""
+        if not changed:
+            self.view.log_info("Configuration unchanged.")
+            return
+        self.view.log_info(f"Changed settings: {', '.join(sorted(config_key(name) for name in changed))}.")
+
+        config_obj = config()
+        if "max_concurrent_forced_actions" in changed:
+            self.force_scheduler.concurrency = config_obj.max_concurrent_forced_actions
+            self.start_actions_force()
+        if changed & {"retry_max_attempts", "retry_base_delay", "retry_max_delay"}:
+            self.retry_policy.max_attempts = config_obj.retry_max_attempts
+            self.retry_policy.base_delay = config_obj.retry_base_delay
+            self.retry_policy.max_delay = config_obj.retry_max_delay
+        if changed & {"circuit_breaker_threshold", "circuit_breaker_cooldown"}:
+            self.retry_policy.breaker.threshold = config_obj.circuit_breaker_threshold
+            self.retry_policy.breaker.cooldown = config_obj.circuit_breaker_cooldown
+        if "slow_callback_threshold" in changed:
+            self.stall_detector.threshold = config_obj.slow_callback_threshold
+        if "log_color_theme" in changed:
+            self.view.restyle_logs()
+
+        reconnect = changed & CONNECT_CONFIG_FIELDS
+        if reconnect:
+            self.view.log_info(
+                f"Changes to {', '.join(sorted(config_key(name) for name in reconnect))} apply to clients that connect"
+                " afterwards.",
+            )
+        restart = changed & RESTART_CONFIG_FIELDS
+        if restart:
+            self.view.log_info(
+                f"Changes to {', '.join(sorted(config_key(name) for name in restart))} take effect after restarting Tony.",
+            )
 
     def execute_actions_force(
         self,
@@ -359,12 +775,22 @@ class TonyController:
         retry: bool = False,
     ) -> None:
         """Handle a request from the game to execute a forced action."""
-        self.active_actions_force = cmd
+        request = self.force_scheduler.active(client_id)
+        if request is not None:
+            request.attempts += 1
+            request.action_id = None
 
-        check_id = client_id if config().action_scope == ActionScope.CLIENT else None
+        check_id = client_id if config_snapshot().action_scope == ActionScope.CLIENT else None
         actions: list[NeuroAction] = []
         for name in cmd.action_names:
-            actions.extend(self.view.get_actions(name=name, client_id=check_id))
+            actions.extend(self.model.get_actions(name=name, client_id=check_id))
+        if not actions:
+            self.view.log_warning(
+                WarningID.ACTIONS_FORCE_INVALID,
+                "None of the forced actions are registered anymore. Serving the next forced action.",
+            )
+            self.finish_actions_force(client_id)
+            return
 
         if self.view.controls.auto_send:
             self.view.log_info("Automatically sending random action.")
@@ -372,44 +798,110 @@ class TonyController:
             # Not using for cryptographic purposes so we should be fine
             action = random.choice(tuple(actions))  # noqa: S311
 
-            if not action.schema:
-                self.send_action(client_id, next(self.id_generator), action.name, None)
-            else:
-                faker = JSF(action.schema)  # pyright: ignore[reportArgumentType]
-                sample = faker.generate()
-                self.send_action(
-                    client_id,
-                    next(self.id_generator),
-                    action.name,
-                    json.dumps(sample),
-                )
+            id_ = next(self.id_generator)
+            if not self.send_action(client_id, id_, action.name, self.sample_action_data(action)):
+                self.view.log_info("Could not send the forced action, serving the next one.")
+                self.finish_actions_force(client_id)
+            elif request is not None:
+                request.action_id = id_
 
         else:
-            wx.CallAfter(
-                self.view.force_actions,
+            # Not batched with the UI queue, the modal dialog would hold up the rest of the batch
+            wx.CallAfter(self.show_actions_force_dialog, client_id, cmd, list(actions), retry)
+
+    def show_actions_force_dialog(
+        self,
+        client_id: int,
+        cmd: ActionsForceCommand,
+        actions: list[NeuroAction],
+        retry: bool,
+    ) -> None:
+        """Show the dialog for a forced action, and serve the next one if it is ignored."""
+        request = self.force_scheduler.active(client_id)
+        if request is None:
+            return  # Client disconnected in the meantime
+
+        # Dialogs of several clients can be stacked, the innermost one is the one in use
+        previous, self.forcing = self.forcing, request
+        try:
+            sent = self.view.force_actions(
                 cmd.state or "",
                 cmd.query,
                 cmd.ephemeral_context,
-                list(actions),
+                actions,
                 cmd.priority,
                 retry,
             )
+        finally:
+            self.forcing = previous
+        if self.force_scheduler.active(client_id) is request and (not sent or request.action_id is None):
+            self.finish_actions_force(client_id)
+
+    def start_actions_force(self) -> None:
+        """Execute the waiting forced actions that can be served now."""
+        for request in self.force_scheduler.start_ready():
+            # The actions may have been unregistered while the request was waiting
+            missing = [name for name in request.cmd.action_names if not self.model.has_action(name)]
+            if missing:
+                self.view.log_warning(
+                    WarningID.ACTIONS_FORCE_INVALID,
+                    "Actions have been unregistered while the forced action was waiting. Discarding.\n"
+                    f"Invalid actions: {', '.join(missing)}",
+                )
+                self.finish_actions_force(request.client_id)
+                continue
+            self.view.log_debug(
+                f"Serving forced action of client {request.client_id}, {len(self.force_scheduler)} waiting.",
+            )
+            self.execute_actions_force(request.client_id, request.cmd)
+
+    def finish_actions_force(self, client_id: int) -> None:
+        """Mark the forced action of a client as done and serve the next one."""
+        self.force_scheduler.finish(client_id)
+        self.start_actions_force()
+
+    def schedule_retry_actions_force(self, client_id: int, request: ForceRequest) -> None:
+        """Retry a failed forced action after a backoff delay, or give up on it."""
+        delay = self.retry_policy.on_failure(client_id, request.attempts)
+        if delay is None:
+            breaker = self.retry_policy.breaker
+            if breaker.allow(client_id):
+                reason = f"after {request.attempts} attempts"
+            else:
+                reason = (
+                    f"since client {client_id} failed {breaker.threshold} times in a row."
+                    f" Retries for this client are paused for {breaker.cooldown:g} seconds"
+                )
+            self.view.log_warning(WarningID.FORCE_RETRY_STOPPED, f"Not retrying forced action {reason}.")
+            self.finish_actions_force(client_id)
+            return
+
+        self.view.log_debug(f"Retrying forced action in {delay * 1000:.0f} ms.")
+
+        def retry() -> None:
+            # The client may have disconnected in the meantime
+            if self.force_scheduler.active(client_id) is request:
+                self.retry_actions_force(client_id, request.cmd)
+
+        wx.CallLater(max(1, round(delay * 1000)), retry)
 
     def retry_actions_force(self, client_id: int, cmd: ActionsForceCommand) -> None:
         """Retry the actions/force command."""
         if self.view.controls.ignore_actions_force:
             self.view.log_info("Forced action ignored.")
-            self.active_actions_force = None
+            self.finish_actions_force(client_id)
             return
 
         # Check if all actions exist
         if not all(self.model.has_action(name) for name in cmd.action_names):
             self.view.log_warning(
                 WarningID.ACTIONS_FORCE_INVALID,
-                "Actions have been unregistered before retrying the forced action. Retry aborted.\nInvalid actions: "
-                + ", ".join(name for name in cmd.action_names if not self.model.has_action(name)),
+                lambda: (
+                    "Actions have been unregistered before retrying the forced action. Retry aborted.\nInvalid actions: "
+                    + ", ".join(name for name in cmd.action_names if not self.model.has_action(name))
+                ),
             )
-            self.active_actions_force = None
+            self.finish_actions_force(client_id)
             return
 
         self.view.log_info("Retrying forced action.")
@@ -0,0 +1,189 @@
+"""Driver - Sending registered actions continuously to load-test games."""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import TYPE_CHECKING
+
+from neuro_api_tony.config import DriverStrategy
+from neuro_api_tony.metrics import metrics
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping, Sequence
+
+    from neuro_api_tony.model import NeuroAction
+
+DRIVER_MAX_PENDING = 10_000
+"""Maximum number of actions waiting for their result that are remembered. Older ones are forgotten."""
+
+DRIVER_MAX_BURST = 1.0
+"""Seconds worth of actions that can be sent at once after the driver fell behind, e.g. because the window was full."""
+
+
+class ActionDriver:
+    """Selects actions to send and paces them, for soak-testing a game's action handling.
+
+    With a `rate` of 0, no pacing is done and the caller sends a new action
+    whenever a result comes back, so the game is kept as busy as the in-flight
+    window allows.
+    """
+
+    __slots__ = (
+        "_credit",
+        "_last_tick",
+        "_next_index",
+        "_pending",
+        "actions",
+        "client_id",
+        "clock",
+        "failed",
+        "latency",
+        "rate",
+        "results",
+        "rng",
+        "sent",
+        "started_at",
+        "strategy",
+        "succeeded",
+        "weights",
+    )
+
+    def __init__(
+        self,
+        strategy: DriverStrategy,
+        rate: float,
+        weights: Mapping[str, float] | None = None,
+        client_id: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Initialize ActionDriver.
+
+        Parameters
+        ----------
+        strategy : DriverStrategy
+            How to select the next action.
+        rate : float
+            Actions to send per second, or 0 to send as fast as results come back.
+        weights : Mapping[str, float] | None
+            Weights of actions by name for the weighted strategy. Actions that
+            are not listed have a weight of 1.
+        client_id : int | None
+            Only send actions registered by this client, or None for all clients.
+        clock : Callable[[], float]
+            Function returning the current monotonic time in seconds.
+        rng : random.Random | None
+            The random number generator used for selecting actions.
+
+        """
+        self.strategy = strategy
+        self.rate = rate
+        self.weights = dict(weights or {})
+        self.client_id = client_id
+        self.clock = clock
+        self.rng = rng or random.Random()  # noqa: S311
+
+        self.started_at = clock()
+        self._last_tick = self.started_at
+        self._credit = 0.0
+        self._next_index = 0
+        # Action id -> time it was sent, for actions waiting for their result
+        self._pending: dict[str, float] = {}
+        self.sent = 0
+        self.succeeded = 0
+        self.failed = 0
+
+        # Every run starts with fresh metrics, so they only cover this run
+        for name in ("driver.actions", "driver.success", "driver.latency"):
+            metrics().remove(name)
+        self.actions = metrics().meter("driver.actions")
+        self.results = metrics().ratio("driver.success")
+        self.latency = metrics().histogram("driver.latency", "ms")
+
+    def __repr__(self) -> str:
+        """Return representation of this driver."""
+        return f"{self.__class__.__name__}({self.strategy.value!r}, rate={self.rate:g}, client_id={self.client_id})"
+
+    def candidates(self, actions: Sequence[NeuroAction]) -> list[NeuroAction]:
+        """Return the actions that can be sent."""
+        return [action for action in actions if self.client_id is None or action.client_id == self.client_id]
+
+    def select(self, actions: Sequence[NeuroAction]) -> NeuroAction | None:
+        """Select the next action to send, or None if there is no action to send."""
+        candidates = self.candidates(actions)
+        if not candidates:
+            return None
+
+        if self.strategy == DriverStrategy.ROUND_ROBIN:
+            action = candidates[self._next_index % len(candidates)]
+            self._next_index += 1
+            return action
+        if self.strategy == DriverStrategy.WEIGHTED:
+            weights = [max(0.0, self.weights.get(action.name, 1.0)) for action in candidates]
+            if not any(weights):
+                return None
+            return self.rng.choices(candidates, weights)[0]
+        return self.rng.choice(candidates)
+
+    @property
+    def _burst(self) -> float:
+        """The most actions that can be due at once."""
+        return max(1.0, self.rate * DRIVER_MAX_BURST)
+
+    def due(self) -> int:
+        """Return how many actions should be sent now to keep up the rate. Always 0 without a rate."""
+        now = self.clock()
+        if self.rate <= 0:
+            self._last_tick = now
+            return 0
+
+        self._credit = min(self._burst, self._credit + (now - self._last_tick) * self.rate)
+        self._last_tick = now
+        count = int(self._credit)
+        self._credit -= count
+        return count
+
+    def give_back(self, count: int) -> None:
+        """Return actions that were due but could not be sent, e.g. because every window was full, so they are sent later."""
+        if self.rate > 0 and count > 0:
+            self._credit = min(self._burst, self._credit + count)
+
+    def record_sent(self, id_: str) -> None:
+        """Record that the driver sent an action."""
+        self._pending[id_] = self.clock()
+        if len(self._pending) > DRIVER_MAX_PENDING:
+            # The game does not answer, forget the oldest action
+            del self._pending[next(iter(self._pending))]
+        self.sent += 1
+        self.actions.mark()
+
+    def record_result(self, id_: str | None, success: bool) -> bool:
+        """Record the result of an action. Returns False if the action was not sent by the driver."""
+        sent_at = self._pending.pop(id_, None) if id_ is not None else None
+        if sent_at is None:
+            return False
+
+        self.latency.observe((self.clock() - sent_at) * 1000)
+        if success:
+            self.succeeded += 1
+            self.results.hit()
+        else:
+            self.failed += 1
+            self.results.miss()
+        return True
+
+    @property
+    def pending(self) -> int:
+        """The number of actions sent by the driver that are waiting for their result."""
+        return len(self._pending)
+
+    def summary(self) -> str:
+        """Return a human-readable summary of the achieved rate, error rate and latency."""
+        elapsed = max(self.clock() - self.started_at, 1e-9)
+        results = self.succeeded + self.failed
+        error_rate = self.failed / results if results else 0.0
+        return (
+            f"{self.sent} actions sent ({self.sent / elapsed:.2f}/s), {self.pending} waiting for their result,"
+            f" {error_rate:.1%} failed, latency {self.latency.format()}"
+        )
@@ -0,0 +1,284 @@
+"""Fuzz - Mutating valid action data into invalid data, and recording data that crashes or hangs games."""
+
+from __future__ import annotations
+
+import json
+import random
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from neuro_api_tony.metrics import metrics
+from neuro_api_tony.samples import schema_key
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Callable, Iterator, Mapping
+
+FUZZ_OVERSIZE_LENGTH = 100_000
+"""Length of the strings sent by the oversize string mutation."""
+
+FUZZ_NESTING_DEPTH = 10_000
+"""Depth of the arrays sent by the deep nesting mutation."""
+
+FUZZ_MAX_ATTEMPTS = 10
+"""How often a mutation is tried until it makes the data invalid."""
+
+FUZZ_MAX_PENDING = 10_000
+"""Maximum number of sent cases waiting for their result that are remembered. Older ones are forgotten."""
+
+MUTATIONS = ("typeViolation", "missingRequired", "oversizeString", "deepNesting", "malformedJson")
+"""Names of the mutations that are picked from for actions with a schema."""
+
+_NESTING_MARKER = "\0tony-fuzz-nesting\0"
+"""Placeholder for the deeply nested arrays, which are too deep to serialize with `json.dumps`."""
+
+_OTHER_TYPES: list[object] = [None, True, 0, 1.5, "fuzz", [], {}]
+"""Values of every JSON type, to replace values with a value of another type."""
+
+
+class FuzzCase(NamedTuple):
+    """Invalid data sent for an action."""
+
+    client_id: int
+    action: str
+    mutation: str
+    data: str
+    sent_at: float
+
+
+def _json_type(value: object) -> str:
+    """Return the JSON type of a value."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def _locations(value: object) -> Iterator[tuple[object, Any]]:
+    """Yield the container and key of every value nested in a value."""
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, child in node.items():
+                yield node, key
+                stack.append(child)
+        elif isinstance(node, list):
+            for index, child in enumerate(node):
+                yield node, index
+                stack.append(child)
+
+
+class Fuzzer:
+    """Mutates valid data into invalid data and tracks how the game responds to it.
+
+    Data whose result timed out is recorded as a hang, and data that was
+    waiting for its result when the game disconnected is recorded as a
+    crash. Both are appended to the corpus file as JSON lines.
+    """
+
+    __slots__ = (
+        "_pending",
+        "_validators",
+        "accepted",
+        "clock",
+        "corpus_file",
+        "crashes",
+        "hangs",
+        "on_corpus_error",
+        "rejected",
+        "rng",
+        "sent",
+    )
+
+    def __init__(
+        self,
+        corpus_file: str | os.PathLike[str] | None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Initialize Fuzzer.
+
+        Parameters
+        ----------
+        corpus_file : str | os.PathLike[str] | None
+            The file to append crashing and hanging cases to, or None to not record them.
+        clock : Callable[[], float]
+            Function returning the current monotonic time in seconds.
+        rng : random.Random | None
+            The random number generator used for picking mutations.
+
+        """
+        self.corpus_file = None if corpus_file is None else Path(corpus_file)
+        self.clock = clock
+        self.rng = rng or random.Random()  # noqa: S311
+        self._validators: dict[bytes, Any] = {}
+        # Action id -> sent case, for cases waiting for their result
+        self._pending: dict[str, FuzzCase] = {}
+
+        self.on_corpus_error: Callable[[OSError], None] = lambda exc: None
+        """Called when cases could not be appended to the corpus file."""
+
+        self.sent = metrics().meter("fuzz.sent")
+        self.rejected = metrics().counter("fuzz.rejected")
+        self.accepted = metrics().counter("fuzz.accepted_invalid")
+        self.hangs = metrics().counter("fuzz.hangs")
+        self.crashes = metrics().counter("fuzz.crashes")
+
+    def __repr__(self) -> str:
+        """Return representation of this fuzzer."""
+        return f"{self.__class__.__name__}(pending={len(self._pending)}, corpus_file={self.corpus_file})"
+
+    def _is_valid(self, schema: Mapping[str, Any], value: object) -> bool:
+        """Return whether a value is valid against a schema."""
+        key = schema_key(schema)
+        validator = self._validators.get(key)
+        if validator is None:
+            import jsonschema.validators
+
+            validator = jsonschema.validators.validator_for(schema)(schema)
+            self._validators[key] = validator
+        return bool(validator.is_valid(value))
+
+    def mutate(self, schema: Mapping[str, Any] | None, data: str | None) -> tuple[str, str]:
+        """Turn valid data for an action into invalid data.
+
+        Parameters
+        ----------
+        schema : Mapping[str, Any] | None
+            The schema of the action, or None if it has none.
+        data : str | None
+            Valid data for the action as a JSON string, or None if it has no schema.
+
+        Returns
+        -------
+        tuple[str, str]
+            The name of the mutation and the invalid data.
+
+        """
+        if schema is None or data is None:
+            # Any data is unexpected for an action without a schema
+            return "unexpectedData", json.dumps({"fuzz": "x" * self.rng.randrange(1, 100)})
+
+        value = json.loads(data)
+        required = [key for key in schema.get("required", []) if isinstance(value, dict) and key in value]
+        # Leaving out a property that is not required does not make the data invalid
+        mutation = self.rng.choice([mutation for mutation in MUTATIONS if required or mutation != "missingRequired"])
+        if mutation != "malformedJson":
+            for _ in range(FUZZ_MAX_ATTEMPTS):
+                mutated = self._mutate(mutation, value, required)
+                # Deeply nested arrays are too much for the validator, and any depth limit of the game is the point
+                if mutated is not None and (mutation == "deepNesting" or not self._is_valid(schema, mutated)):
+                    return mutation, self._serialize(mutated)
+
+        # Could not make the data invalid with that mutation, but broken JSON is always invalid.
+        # No JSON text ends with a comma, so the truncated data cannot accidentally be valid.
+        return "malformedJson", data[: len(data) // 2] + ","
+
+    def _mutate(self, mutation: str, value: object, required: list[str]) -> object | None:
+        """Return a mutated copy of a value, or None if the mutation cannot be applied to it.
+
+        `required` are the required properties of the schema that the value has.
+        """
+        value = json.loads(json.dumps(value))
+        locations = list(_locations(value))
+
+        if mutation == "typeViolation":
+            if not locations:
+                return self.rng.choice([other for other in _OTHER_TYPES if _json_type(other) != _json_type(value)])
+            container, key = self.rng.choice(locations)
+            current = _json_type(container[key])  # type: ignore[index]
+            container[key] = self.rng.choice([other for other in _OTHER_TYPES if _json_type(other) != current])  # type: ignore[index]
+            return value
+        if mutation == "missingRequired":
+            if not required or not isinstance(value, dict):
+                return None
+            del value[self.rng.choice(required)]
+            return value
+        if mutation == "oversizeString":
+            strings = [(container, key) for container, key in locations if isinstance(container[key], str)]  # type: ignore[index]
+            if not strings:
+                strings = locations
+            if not strings:
+                return "A" * FUZZ_OVERSIZE_LENGTH
+            container, key = self.rng.choice(strings)
+            container[key] = "A" * FUZZ_OVERSIZE_LENGTH  # type: ignore[index]
+            return value
+        if mutation == "deepNesting":
+            if not locations:
+                return _NESTING_MARKER
+            container, key = self.rng.choice(locations)
+            container[key] = _NESTING_MARKER  # type: ignore[index]
+            return value
+        return None
+
+    def _serialize(self, value: object) -> str:
+        """Serialize mutated data, expanding the nesting marker."""
+        text = json.dumps(value)
+        marker = json.dumps(_NESTING_MARKER)
+        if marker in text:
+            text = text.replace(marker, "[" * FUZZ_NESTING_DEPTH + "]" * FUZZ_NESTING_DEPTH, 1)
+        return text
+
+    def record_sent(self, id_: str, client_id: int, action: str, mutation: str, data: str) -> None:
+        """Record that invalid data was sent."""
+        self._pending[id_] = FuzzCase(client_id, action, mutation, data, self.clock())
+        if len(self._pending) > FUZZ_MAX_PENDING:
+            del self._pending[next(iter(self._pending))]
+        self.sent.mark()
+
+    def record_result(self, id_: str | None, success: bool) -> FuzzCase | None:
+        """Record the result of an action. Returns the case, or None if the action was not sent by the fuzzer."""
+        case = self._pending.pop(id_, None) if id_ is not None else None
+        if case is None:
+            return None
+        if success:
+            self.accepted.inc()
+        else:
+            self.rejected.inc()
+        return case
+
+    def record_timeout(self, id_: str) -> FuzzCase | None:
+        """Record a case whose result timed out as a hang. Returns the case, or None if the action was not sent by the fuzzer."""
+        case = self._pending.pop(id_, None)
+        if case is None:
+            return None
+        self.hangs.inc()
+        self._write([case], "hang")
+        return case
+
+    def on_disconnect(self, client_id: int) -> list[FuzzCase]:
+        """Record the cases a disconnected client did not answer as crashes, and return them."""
+        lost = [(id_, case) for id_, case in self._pending.items() if case.client_id == client_id]
+        for id_, _ in lost:
+            del self._pending[id_]
+        cases = [case for _, case in lost]
+        self.crashes.inc(len(cases))
+        self._write(cases, "crash")
+        return cases
+
+    def _write(self, cases: list[FuzzCase], outcome: str) -> None:
+        """Append cases to the corpus file. Errors are reported to `on_corpus_error`, so the caller can carry on."""
+        if not cases or self.corpus_file is None:
+            return
+        try:
+            with self.corpus_file.open("a", encoding="utf-8") as file:
+                for case in cases:
+                    entry = {"action": case.action, "mutation": case.mutation, "outcome": outcome, "data": case.data}
+                    file.write(json.dumps(entry) + "\n")
+        except OSError as exc:
+            self.on_corpus_error(exc)
+
+
+def load_corpus(corpus_file: str | os.PathLike[str]) -> list[dict[str, str]]:
+    """Load the cases recorded in a corpus file, oldest first."""
+    with Path(corpus_file).open(encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
@@ -0,0 +1,141 @@
+"""In-flight - Tracking actions that are waiting for their action/result."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from neuro_api_tony.metrics import metrics
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class InFlightAction:
+    """An action that was sent and is waiting for its result."""
+
+    __slots__ = ("client_id", "deadline", "id_", "name", "sent_at", "timed_out")
+
+    def __init__(self, client_id: int, id_: str, name: str, sent_at: float, deadline: float | None) -> None:
+        """Initialize InFlightAction."""
+        self.client_id = client_id
+        self.id_ = id_
+        self.name = name
+        self.sent_at = sent_at
+        """Monotonic time the action was sent at, in seconds."""
+        self.deadline = deadline
+        """Monotonic time the result should have arrived by, or None for no deadline."""
+        self.timed_out = False
+        """Whether the deadline passed. The action stays in flight so a late result can still be matched."""
+
+    def __repr__(self) -> str:
+        """Return representation of this action."""
+        return f"{self.__class__.__name__}({self.client_id}, {self.id_!r}, {self.name!r})"
+
+
+class InFlightTable:
+    """Table of sent actions by client and action id, used to match results and measure round-trip latency.
+
+    Latencies are recorded in milliseconds in the histograms `action_latency`,
+    `action_latency.action.<name>` and `action_latency.client.<client_id>`.
+    """
+
+    __slots__ = ("_actions", "clock", "timeouts")
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize InFlightTable.
+
+        Parameters
+        ----------
+        clock : Callable[[], float]
+            Function returning the current monotonic time in seconds.
+
+        """
+        self.clock = clock
+        # In order of sending, so the oldest action is first
+        self._actions: dict[tuple[int, str], InFlightAction] = {}
+
+        self.timeouts = metrics().counter("action_result.timeouts")
+
+    def __repr__(self) -> str:
+        """Return representation of this table."""
+        return f"{self.__class__.__name__}(in_flight={len(self)})"
+
+    def __len__(self) -> int:
+        """Return the number of actions in flight."""
+        return len(self._actions)
+
+    def count(self, client_id: int) -> int:
+        """Return the number of actions in flight for a client."""
+        return sum(action.client_id == client_id for action in self._actions.values())
+
+    def add(self, client_id: int, id_: str, name: str, timeout: float | None = None) -> InFlightAction:
+        """Record that an action was sent.
+
+        Parameters
+        ----------
+        client_id : int
+            The client the action was sent to.
+        id_ : str
+            The id of the action.
+        name : str
+            The name of the action.
+        timeout : float | None
+            Seconds until the result is overdue, or None for no deadline.
+
+        """
+        now = self.clock()
+        action = InFlightAction(client_id, id_, name, now, None if timeout is None else now + timeout)
+        self._actions[client_id, id_] = action
+        return action
+
+    def complete(self, client_id: int, id_: str) -> tuple[InFlightAction, float] | None:
+        """Record that the result of an action arrived.
+
+        Returns
+        -------
+        tuple[InFlightAction, float] | None
+            The action and its round-trip latency in milliseconds, or None
+            if no action with this id is in flight for the client.
+
+        """
+        action = self._actions.pop((client_id, id_), None)
+        if action is None:
+            return None
+
+        latency = (self.clock() - action.sent_at) * 1000
+        metrics().histogram("action_latency", "ms").observe(latency)
+        metrics().histogram(f"action_latency.action.{action.name}", "ms").observe(latency)
+        metrics().histogram(f"action_latency.client.{client_id}", "ms").observe(latency)
+        return action, latency
+
+    def expire(self) -> list[InFlightAction]:
+        """Return actions whose deadline passed since the last call, and mark them as timed out."""
+        now = self.clock()
+        expired = [
+            action
+            for action in self._actions.values()
+            if not action.timed_out and action.deadline is not None and action.deadline <= now
+        ]
+        for action in expired:
+            action.timed_out = True
+        self.timeouts.inc(len(expired))
+        return expired
+
+    def next_deadline(self) -> float | None:
+        """Return the earliest deadline of an action that has not timed out yet, or None if there is none."""
+        return min(
+            (
+                action.deadline
+                for action in self._actions.values()
+                if not action.timed_out and action.deadline is not None
+            ),
+            default=None,
+        )
+
+    def remove_client(self, client_id: int) -> None:
+        """Forget all actions sent to a client and its latency metric, e.g. when it disconnects."""
+        for key in [key for key, action in self._actions.items() if action.client_id == client_id]:
+            del self._actions[key]
+        # Client ids are not reused, the metric would stay in the statistics forever
+        metrics().remove(f"action_latency.client.{client_id}")
@@ -0,0 +1,338 @@
+"""Load Generator - Simulating many game clients to measure Tony's throughput and latency.
+
+Run `python -m neuro_api_tony.loadgen --help` for usage.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import random
+import sys
+import time
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import orjson
+import trio
+from neuro_api.command import (
+    Action,
+    actions_force_command,
+    actions_register_command,
+    actions_result_command,
+    context_command,
+    startup_command,
+)
+from trio_websocket import ConnectionClosed, HandshakeError, open_websocket_url
+
+from neuro_api_tony.metrics import Histogram
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+
+LOADGEN_CLIENT_STEPS = (1, 10, 100, 1000)
+"""Numbers of clients measured one after another by default."""
+
+LOADGEN_CONNECT_LIMIT = 50
+"""Maximum number of connections opened at the same time, so the listen backlog does not overflow."""
+
+LOADGEN_HISTOGRAM_SIZE = 100_000
+"""Number of latencies kept per step for the percentiles."""
+
+
+class LoadProfile(NamedTuple):
+    """What every simulated game does."""
+
+    actions: int = 5
+    """Number of actions registered."""
+    schema_properties: int = 4
+    """Number of properties in the schema of each action."""
+    context_rate: float = 1.0
+    """Context messages sent per second, or 0 to send none."""
+    force_interval: float = 5.0
+    """Seconds between forced actions, or 0 to force none."""
+    duration: float = 10.0
+    """Seconds to keep the clients running."""
+
+
+def make_action_schema(properties: int) -> dict[str, Any]:
+    """Return an object schema with `properties` required properties of varying types."""
+    kinds: list[dict[str, Any]] = [
+        {"type": "string"},
+        {"type": "integer", "minimum": 0, "maximum": 100},
+        {"type": "boolean"},
+        {"enum": ["north", "east", "south", "west"]},
+        {"type": "array", "items": {"type": "string"}, "maxItems": 5},
+    ]
+    return {
+        "type": "object",
+        "properties": {f"property_{index}": kinds[index % len(kinds)] for index in range(properties)},
+        "required": [f"property_{index}" for index in range(properties)],
+    }
+
+
+class LoadStats:
+    """Statistics shared by the simulated games of one step."""
+
+    __slots__ = ("actions_answered", "connected", "errors", "force_latency", "received", "sent", "startup_latency")
+
+    def __init__(self) -> None:
+        """Initialize LoadStats."""
+        self.connected = 0
+        self.errors = 0
+        self.sent = 0
+        self.received = 0
+        self.actions_answered = 0
+        self.startup_latency = Histogram("loadgen.startup_latency", LOADGEN_HISTOGRAM_SIZE, "ms")
+        self.force_latency = Histogram("loadgen.force_latency", LOADGEN_HISTOGRAM_SIZE, "ms")
+
+    def __repr__(self) -> str:
+        """Return representation of these statistics."""
+        return f"{self.__class__.__name__}(connected={self.connected}, sent={self.sent}, received={self.received})"
+
+
+class SimulatedGame:
+    """A game that starts up, registers actions, sends context, forces actions and answers every action.
+
+    The latency of the startup acknowledgement and the time from forcing an
+    action until Tony sends it are recorded in the shared `LoadStats`.
+    Forced actions are only answered by Tony if auto-answer is turned on.
+    """
+
+    __slots__ = ("_force_sent_at", "_startup_sent_at", "actions", "clock", "game", "profile", "rng", "stats")
+
+    def __init__(
+        self,
+        game: str,
+        profile: LoadProfile,
+        stats: LoadStats,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Initialize SimulatedGame.
+
+        Parameters
+        ----------
+        game : str
+            The game title, which has to be unique among connected games.
+        profile : LoadProfile
+            What the game does.
+        stats : LoadStats
+            Where the statistics are recorded.
+        clock : Callable[[], float]
+            Function returning the current monotonic time in seconds.
+        rng : random.Random | None
+            Random number generator used to spread out the messages of different games.
+
+        """
+        self.game = game
+        self.profile = profile
+        self.stats = stats
+        self.clock = clock
+        self.rng = rng or random.Random()  # noqa: S311
+        schema = make_action_schema(profile.schema_properties)
+        self.actions = [
+            Action(f"action_{index}", f"Load test action {index}.", schema)  # type: ignore[arg-type]
+            for index in range(profile.actions)
+        ]
+        self._startup_sent_at: float | None = None
+        self._force_sent_at: float | None = None
+
+    def __repr__(self) -> str:
+        """Return representation of this game."""
+        return f"{self.__class__.__name__}({self.game!r})"
+
+    async def run(
+        self,
+        send: Callable[[str], Awaitable[object]],
+        receive: Callable[[], Awaitable[str | bytes]],
+    ) -> None:
+        """Play the game over a connection until cancelled.
+
+        Parameters
+        ----------
+        send : Callable[[str], Awaitable[object]]
+            Function sending a message to Tony.
+        receive : Callable[[], Awaitable[str | bytes]]
+            Function receiving the next message from Tony.
+
+        """
+
+        async def send_command(data: bytes) -> None:
+            await send(data.decode("utf-8"))
+            self.stats.sent += 1
+
+        self._startup_sent_at = self.clock()
+        await send_command(startup_command(self.game))
+        if self.actions:
+            await send_command(actions_register_command(self.game, self.actions))
+
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(self._receive_loop, send_command, receive)
+            if self.profile.context_rate > 0:
+                nursery.start_soon(self._context_loop, send_command)
+            if self.profile.force_interval > 0 and self.actions:
+                nursery.start_soon(self._force_loop, send_command)
+
+    async def _receive_loop(
+        self,
+        send_command: Callable[[bytes], Awaitable[None]],
+        receive: Callable[[], Awaitable[str | bytes]],
+    ) -> None:
+        """Answer messages from Tony."""
+        while True:
+            message = orjson.loads(await receive())
+            self.stats.received += 1
+            command = message.get("command")
+            data = message.get("data") or {}
+
+            if command == "startup" and self._startup_sent_at is not None:
+                self.stats.startup_latency.observe((self.clock() - self._startup_sent_at) * 1000)
+                self._startup_sent_at = None
+            elif command == "action":
+                if self._force_sent_at is not None:
+                    self.stats.force_latency.observe((self.clock() - self._force_sent_at) * 1000)
+                    self._force_sent_at = None
+                await send_command(actions_result_command(self.game, data["id"], True))
+                self.stats.actions_answered += 1
+            elif command == "actions/reregister_all" and self.actions:
+                await send_command(actions_register_command(self.game, self.actions))
+
+    async def _context_loop(self, send_command: Callable[[bytes], Awaitable[None]]) -> None:
+        """Send context messages at the configured rate."""
+        interval = 1 / self.profile.context_rate
+        await trio.sleep(self.rng.uniform(0, interval))
+        index = 0
+        while True:
+            await send_command(context_command(self.game, f"Load test context message {index}."))
+            index += 1
+            await trio.sleep(interval)
+
+    async def _force_loop(self, send_command: Callable[[bytes], Awaitable[None]]) -> None:
+        """Force actions at the configured interval, skipping while the previous one is unanswered."""
+        interval = self.profile.force_interval
+        await trio.sleep(self.rng.uniform(0, interval))
+        names = [action.name for action in self.actions]
+        while True:
+            if self._force_sent_at is None:
+                self._force_sent_at = self.clock()
+                await send_command(actions_force_command(self.game, "", "Load test.", names))
+            await trio.sleep(interval)
+
+
+class LoadReport(NamedTuple):
+    """Result of one step."""
+
+    clients: int
+    stats: LoadStats
+    duration: float
+
+    @staticmethod
+    def header() -> str:
+        """Return the header of the table the reports are printed as."""
+        return (
+            f"{'clients':>7} {'connected':>9} {'errors':>6} {'sent/s':>9} {'recv/s':>9}"
+            f"  {'startup p50/p95/p99 ms':>24}  {'force p50/p95/p99 ms':>24}"
+        )
+
+    def format(self) -> str:
+        """Return the report as a row of the table."""
+
+        def percentiles(histogram: Histogram) -> str:
+            values = [histogram.percentile(percent) for percent in (50, 95, 99)]
+            return "-" if values[0] is None else "/".join(f"{value:.1f}" for value in values if value is not None)
+
+        stats = self.stats
+        return (
+            f"{self.clients:>7} {stats.connected:>9} {stats.errors:>6}"
+            f" {stats.sent / self.duration:>9.0f} {stats.received / self.duration:>9.0f}"
+            f"  {percentiles(stats.startup_latency):>24}  {percentiles(stats.force_latency):>24}"
+        )
+
+
+async def run_step(url: str, clients: int, profile: LoadProfile, seed: int | None = None) -> LoadReport:
+    """Connect `clients` simulated games to Tony at `url` and run them for the duration of the profile."""
+    stats = LoadStats()
+    rng = random.Random(seed)  # noqa: S311
+    limiter = trio.CapacityLimiter(LOADGEN_CONNECT_LIMIT)
+
+    async def run_client(index: int) -> None:
+        game = SimulatedGame(f"Load Test {index}", profile, stats, rng=random.Random(rng.random()))  # noqa: S311
+        try:
+            async with contextlib.AsyncExitStack() as stack:
+                async with limiter:
+                    websocket = await stack.enter_async_context(open_websocket_url(url))
+                stats.connected += 1
+                await game.run(websocket.send_message, websocket.get_message)
+        except (ConnectionClosed, HandshakeError, OSError):
+            stats.errors += 1
+
+    started_at = time.monotonic()
+    with trio.move_on_after(profile.duration):
+        async with trio.open_nursery() as nursery:
+            for index in range(clients):
+                nursery.start_soon(run_client, index)
+    return LoadReport(clients, stats, time.monotonic() - started_at)
+
+
+async def run_steps(url: str, steps: Sequence[int], profile: LoadProfile, seed: int | None = None) -> None:
+    """Run one step for each number of clients, printing a row of the table after each."""
+    print(LoadReport.header())
+    for clients in steps:
+        report = await run_step(url, clients, profile, seed)
+        print(report.format(), flush=True)
+        # Give Tony a moment to clean up the disconnected clients
+        await trio.sleep(1)
+
+
+def _parse_steps(value: str) -> list[int]:
+    """Parse a comma separated list of client counts."""
+    try:
+        steps = [int(step) for step in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a comma separated list of numbers: {value!r}") from None
+    if any(step < 1 for step in steps):
+        raise argparse.ArgumentTypeError("client counts must be positive")
+    return steps
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the load generator from the command line."""
+    defaults = LoadProfile()
+    parser = argparse.ArgumentParser(prog="python -m neuro_api_tony.loadgen", description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="ws://localhost:8000", help="Tony to connect to")
+    parser.add_argument(
+        "--clients",
+        type=_parse_steps,
+        default=list(LOADGEN_CLIENT_STEPS),
+        help="comma separated numbers of clients to measure one after another (default: %(default)s)",
+    )
+    parser.add_argument("--duration", type=float, default=defaults.duration, help="seconds per step")
+    parser.add_argument("--actions", type=int, default=defaults.actions, help="actions registered per client")
+    parser.add_argument(
+        "--schema-properties",
+        type=int,
+        default=defaults.schema_properties,
+        help="properties in the schema of each action",
+    )
+    parser.add_argument(
+        "--context-rate",
+        type=float,
+        default=defaults.context_rate,
+        help="context messages per second per client, 0 for none",
+    )
+    parser.add_argument(
+        "--force-interval",
+        type=float,
+        default=defaults.force_interval,
+        help="seconds between forced actions per client, 0 for none; turn on auto-answer in Tony to measure them",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="seed for spreading out the messages of the clients")
+    args = parser.parse_args(argv)
+
+    profile = LoadProfile(args.actions, args.schema_properties, args.context_rate, args.force_interval, args.duration)
+    trio.run(run_steps, args.url, args.clients, profile, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Loopback - In-process connections to a `NeuroAPI` server without sockets, for tests and benchmarks."""
+
+from __future__ import annotations
+
+import itertools
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+import trio
+from trio_websocket import CloseReason, ConnectionClosed
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+    from neuro_api_tony.api import NeuroAPI
+
+LOOPBACK_BUFFER_SIZE = 64
+"""Number of messages that can be sent before the receiving side has to catch up, like a socket buffer."""
+
+LOOPBACK_REMOTE = "loopback"
+"""Remote address reported by loopback connections."""
+
+_connection_ids = itertools.count()
+
+
+class LoopbackConnection:
+    """One end of an in-process connection, with the message interface of `trio_websocket.WebSocketConnection`.
+
+    Messages are passed through memory channels as they are, without
+    framing or copying, so only the protocol handling is measured.
+    Closing either end makes both ends raise `ConnectionClosed`.
+    """
+
+    __slots__ = ("CONNECTION_ID", "_receive_channel", "_send_channel", "closed", "remote")
+
+    def __init__(
+        self,
+        send_channel: trio.MemorySendChannel[str | bytes],
+        receive_channel: trio.MemoryReceiveChannel[str | bytes],
+    ) -> None:
+        """Initialize LoopbackConnection. Use `open_loopback` to create a connected pair."""
+        self.CONNECTION_ID = next(_connection_ids)
+        self.remote = LOOPBACK_REMOTE
+        self.closed: CloseReason | None = None
+        self._send_channel = send_channel
+        self._receive_channel = receive_channel
+
+    def __repr__(self) -> str:
+        """Return representation of this connection."""
+        state = "open" if self.closed is None else "closed"
+        return f"{self.__class__.__name__}({self.CONNECTION_ID}, {state})"
+
+    async def __aenter__(self) -> Self:
+        """Return this connection."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close this connection."""
+        await self.aclose()
+
+    def _closed_error(self) -> ConnectionClosed:
+        """Return the exception raised when using a closed connection."""
+        return ConnectionClosed(self.closed or CloseReason(1006, "Connection lost"))
+
+    async def send_message(self, message: str | bytes) -> None:
+        """Send a message to the other end."""
+        if self.closed is not None:
+            raise self._closed_error()
+        try:
+            await self._send_channel.send(message)
+        except (trio.BrokenResourceError, trio.ClosedResourceError):
+            raise self._closed_error() from None
+
+    async def get_message(self) -> str | bytes:
+        """Receive the next message from the other end."""
+        if self.closed is not None:
+            raise self._closed_error()
+        try:
+            return await self._receive_channel.receive()
+        except (trio.EndOfChannel, trio.ClosedResourceError):
+            self.closed = CloseReason(1000, None)
+            raise self._closed_error() from None
+
+    async def aclose(self, code: int = 1000, reason: str | None = None) -> None:
+        """Close the connection. The other end raises `ConnectionClosed` once it has received the remaining messages."""
+        if self.closed is None:
+            self.closed = CloseReason(code, reason)
+        await self._send_channel.aclose()
+        await self._receive_channel.aclose()
+
+
+def open_loopback(
+    buffer_size: int = LOOPBACK_BUFFER_SIZE,
+) -> tuple[LoopbackConnection, LoopbackConnection]:
+    """Return the two ends of a new loopback connection."""
+    send_a, receive_a = trio.open_memory_channel[str | bytes](buffer_size)
+    send_b, receive_b = trio.open_memory_channel[str | bytes](buffer_size)
+    return LoopbackConnection(send_a, receive_b), LoopbackConnection(send_b, receive_a)
+
+
+@asynccontextmanager
+async def connect_loopback(
+    api: NeuroAPI,
+    buffer_size: int = LOOPBACK_BUFFER_SIZE,
+) -> AsyncIterator[LoopbackConnection]:
+    """Attach a new client to `api` over a loopback connection and yield the client end.
+
+    The client is disconnected when the context is left.
+    """
+    server_end, client_end = open_loopback(buffer_size)
+
+    async def serve() -> None:
+        async with server_end:
+            await api.serve_connection(server_end)
+
+    async with trio.open_nursery() as nursery:
+        nursery.start_soon(serve)
+        try:
+            yield client_end
+        finally:
+            await client_end.aclose()
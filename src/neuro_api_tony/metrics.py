@@ -0,0 +1,285 @@
+"""Metrics - Lightweight runtime statistics."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+
+
+class Counter:
+    """A monotonically increasing counter."""
+
+    __slots__ = ("name", "value")
+
+    def __init__(self, name: str) -> None:
+        """Initialize Counter."""
+        self.name = name
+        self.value = 0
+
+    def __repr__(self) -> str:
+        """Return representation of this counter."""
+        return f"{self.__class__.__name__}({self.name!r}, value={self.value})"
+
+    def inc(self, amount: int = 1) -> None:
+        """Increase the counter by `amount`."""
+        self.value += amount
+
+    def format(self) -> str:
+        """Return the counter value as a human-readable string."""
+        return str(self.value)
+
+
+class Gauge:
+    """A value that can go up and down, remembering its peak."""
+
+    __slots__ = ("name", "peak", "value")
+
+    def __init__(self, name: str) -> None:
+        """Initialize Gauge."""
+        self.name = name
+        self.value = 0
+        self.peak = 0
+
+    def __repr__(self) -> str:
+        """Return representation of this gauge."""
+        return f"{self.__class__.__name__}({self.name!r}, value={self.value}, peak={self.peak})"
+
+    def set(self, value: int) -> None:
+        """Set the current value."""
+        self.value = value
+        if value > self.peak:
+            self.peak = value
+
+    def format(self) -> str:
+        """Return the gauge value as a human-readable string."""
+        return f"{self.value} (peak {self.peak})"
+
+
+class Meter:
+    """Counts events and their rate per second over a sliding window."""
+
+    __slots__ = ("_buckets", "count", "name", "window")
+
+    def __init__(self, name: str, window: int = 60) -> None:
+        """Initialize Meter.
+
+        Parameters
+        ----------
+        name : str
+            The name of the meter.
+        window : int
+            The length of the window the rate is calculated over, in seconds.
+
+        """
+        self.name = name
+        self.window = window
+        self.count = 0
+        # (second, events in that second), oldest first
+        self._buckets: deque[list[int]] = deque()
+
+    def __repr__(self) -> str:
+        """Return representation of this meter."""
+        return f"{self.__class__.__name__}({self.name!r}, count={self.count})"
+
+    def _prune(self, now: int) -> None:
+        """Drop buckets that are outside of the window."""
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+
+    def mark(self, amount: int = 1) -> None:
+        """Record `amount` events."""
+        now = int(time.monotonic())
+        self.count += amount
+        if self._buckets and self._buckets[-1][0] == now:
+            self._buckets[-1][1] += amount
+        else:
+            self._buckets.append([now, amount])
+            self._prune(now)
+
+    def rate(self) -> float:
+        """Return the average number of events per second within the window."""
+        self._prune(int(time.monotonic()))
+        return sum(amount for _, amount in self._buckets) / self.window
+
+    def format(self) -> str:
+        """Return the meter value as a human-readable string."""
+        return f"{self.count} ({self.rate():.2f}/s)"
+
+
+class Ratio:
+    """Hits and misses, e.g. of a cache."""
+
+    __slots__ = ("hits", "misses", "name")
+
+    def __init__(self, name: str) -> None:
+        """Initialize Ratio."""
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        """Return representation of this ratio."""
+        return f"{self.__class__.__name__}({self.name!r}, hits={self.hits}, misses={self.misses})"
+
+    def hit(self) -> None:
+        """Record a hit."""
+        self.hits += 1
+
+    def miss(self) -> None:
+        """Record a miss."""
+        self.misses += 1
+
+    @property
+    def ratio(self) -> float:
+        """The fraction of hits, or 0 if nothing was recorded yet."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def format(self) -> str:
+        """Return the ratio as a human-readable string."""
+        return f"{self.ratio:.1%} ({self.hits}/{self.hits + self.misses})"
+
+
+def _nearest_rank(values: list[float], percent: float) -> float:
+    """Return the percentile of sorted values using the nearest-rank method."""
+    index = min(len(values) - 1, max(0, math.ceil(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+class Histogram:
+    """Distribution of recent values, e.g. latencies, reported as percentiles.
+
+    Only the most recent `size` values are kept, so percentiles reflect
+    current behavior and memory use is bounded.
+    """
+
+    __slots__ = ("_values", "count", "name", "unit")
+
+    def __init__(self, name: str, size: int = 1024, unit: str = "") -> None:
+        """Initialize Histogram.
+
+        Parameters
+        ----------
+        name : str
+            The name of the histogram.
+        size : int
+            The number of most recent values to keep.
+        unit : str
+            The unit of the values, used when formatting.
+
+        """
+        self.name = name
+        self.unit = unit
+        self.count = 0
+        self._values: deque[float] = deque(maxlen=size)
+
+    def __repr__(self) -> str:
+        """Return representation of this histogram."""
+        return f"{self.__class__.__name__}({self.name!r}, count={self.count})"
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        self.count += 1
+        self._values.append(value)
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the value below which `percent` percent of the recent values fall, or None if there are none."""
+        if not self._values:
+            return None
+        return _nearest_rank(sorted(self._values), percent)
+
+    def format(self) -> str:
+        """Return the p50, p95 and p99 as a human-readable string."""
+        if not self._values:
+            return "no data"
+        values = sorted(self._values)
+        percentiles = ", ".join(
+            f"p{percent} {_nearest_rank(values, percent):.1f}{self.unit}" for percent in (50, 95, 99)
+        )
+        return f"{percentiles} (n={self.count})"
+
+
+Metric = Counter | Gauge | Histogram | Meter | Ratio
+
+
+class Metrics:
+    """Registry of named metrics."""
+
+    __slots__ = ("_lock", "_metrics")
+
+    def __init__(self) -> None:
+        """Initialize Metrics."""
+        self._lock = threading.Lock()
+        self._metrics: dict[str, Metric] = {}
+
+    def __repr__(self) -> str:
+        """Return representation of this registry."""
+        return f"{self.__class__.__name__}()"
+
+    def _get_or_create(self, name: str, type_: type[Metric]) -> Metric:
+        """Return the metric called `name`, creating it if it does not exist yet."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = type_(name)
+                self._metrics[name] = metric
+            elif not isinstance(metric, type_):
+                raise TypeError(f"Metric {name!r} is a {type(metric).__name__}, not a {type_.__name__}.")
+            return metric
+
+    def counter(self, name: str) -> Counter:
+        """Return the counter called `name`."""
+        metric = self._get_or_create(name, Counter)
+        assert isinstance(metric, Counter)
+        return metric
+
+    def gauge(self, name: str) -> Gauge:
+        """Return the gauge called `name`."""
+        metric = self._get_or_create(name, Gauge)
+        assert isinstance(metric, Gauge)
+        return metric
+
+    def histogram(self, name: str, unit: str = "") -> Histogram:
+        """Return the histogram called `name`."""
+        metric = self._get_or_create(name, Histogram)
+        assert isinstance(metric, Histogram)
+        if unit:
+            metric.unit = unit
+        return metric
+
+    def meter(self, name: str) -> Meter:
+        """Return the meter called `name`."""
+        metric = self._get_or_create(name, Meter)
+        assert isinstance(metric, Meter)
+        return metric
+
+    def ratio(self, name: str) -> Ratio:
+        """Return the ratio called `name`."""
+        metric = self._get_or_create(name, Ratio)
+        assert isinstance(metric, Ratio)
+        return metric
+
+    def remove(self, name: str) -> None:
+        """Remove the metric called `name`, so it starts over when it is used next."""
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def snapshot(self) -> dict[str, str]:
+        """Return all metrics formatted as strings, sorted by name."""
+        with self._lock:
+            return {name: self._metrics[name].format() for name in sorted(self._metrics)}
+
+    def clear(self) -> None:
+        """Remove all metrics."""
+        with self._lock:
+            self._metrics.clear()
+
+
+_metrics = Metrics()
+
+
+def metrics() -> Metrics:
+    """Get the global metrics registry."""
+    return _metrics
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, NamedTuple
 
+from neuro_api_tony.search import LogSearchIndex
+
 if TYPE_CHECKING:
     from neuro_api.json_schema_types import SchemaObject
 
@@ -21,12 +23,13 @@ class NeuroAction(NamedTuple):
 class TonyModel:
     """Tony Model."""
 
-    __slots__ = ("actions", "last_action_data", "logs")
+    __slots__ = ("actions", "last_action_data", "log_index", "logs")
 
     def __init__(self) -> None:
         """Initialize Tony Model."""
         self.actions: list[NeuroAction] = []
         self.logs: dict[str, str] = {}
+        self.log_index = LogSearchIndex()
         self.last_action_data: dict[str, str] = {}
 
     def __repr__(self) -> str:
@@ -54,9 +57,19 @@ class TonyModel:
         """Clear all actions from the list."""
         self.actions.clear()
 
-    def has_action(self, name: str) -> bool:
-        """Check if an action exists in the list."""
-        return any(action.name == name for action in self.actions)
+    def has_action(self, name: str, client_id: int | None = None) -> bool:
+        """Check if an action exists in the list, optionally only for one client."""
+        return any(
+            action.name == name and (client_id is None or action.client_id == client_id) for action in self.actions
+        )
+
+    def get_actions(self, name: str | None = None, client_id: int | None = None) -> list[NeuroAction]:
+        """Return the actions matching a name and/or client_id."""
+        return [
+            action
+            for action in self.actions
+            if (name is None or action.name == name) and (client_id is None or action.client_id == client_id)
+        ]
 
     def get_action_by_name(self, name: str) -> NeuroAction | None:
         """Return an action by name."""
@@ -75,6 +88,7 @@ class TonyModel:
     def clear_logs(self) -> None:
         """Clear all logs."""
         self.logs.clear()
+        self.log_index.clear()
 
     def get_logs_formatted(self) -> str:
         """Return formatted log messages."""
@@ -0,0 +1,431 @@
+"""Replay - Replaying recorded sessions against Tony or a game and checking the responses.
+
+Run `python -m neuro_api_tony.replay --help` for usage.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import math
+import sys
+import time
+from enum import Enum
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import orjson
+import trio
+from trio_websocket import ConnectionClosed, WebSocketRequest, open_websocket_url, serve_websocket
+
+from neuro_api_tony.fuzz import load_corpus
+from neuro_api_tony.trace import read_trace
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Awaitable, Callable, Sequence
+
+REPLAY_RESPONSE_TIMEOUT = 10.0
+"""Seconds to wait for each expected message."""
+
+
+class ReplaySide(str, Enum):
+    """Which side of a recorded session is replayed."""
+
+    GAME = "game"
+    """Send the messages the game sent, and expect the messages Tony sent. Used against a running Tony."""
+    TONY = "tony"
+    """Send the messages Tony sent, and expect the messages the game sent. Used against a real game."""
+
+
+class TraceMessage(NamedTuple):
+    """A recorded websocket message."""
+
+    t: float
+    """Seconds since the recording started."""
+    inbound: bool
+    """Whether Tony received the message, i.e. the game sent it."""
+    data: str | bytes
+
+
+class Mismatch(NamedTuple):
+    """An expected message that did not arrive as recorded."""
+
+    position: int
+    """Position of the expected message in the recording."""
+    expected: str | bytes
+    actual: str | bytes | None
+    """The message that arrived instead, or None if none arrived in time."""
+
+
+class ReplayReport(NamedTuple):
+    """Result of a replay."""
+
+    sent: int
+    received: int
+    mismatches: list[Mismatch]
+    duration: float
+    """Seconds the replay took."""
+
+    @property
+    def ok(self) -> bool:
+        """Whether every expected message arrived as recorded."""
+        return not self.mismatches
+
+    def summary(self) -> str:
+        """Return a human-readable summary."""
+        rate = (self.sent + self.received) / self.duration if self.duration > 0 else 0.0
+        return (
+            f"{self.sent} messages sent, {self.received} received, {len(self.mismatches)} mismatches"
+            f" in {self.duration:.2f} s ({rate:.0f} messages/s)"
+        )
+
+
+def load_session(
+    path: str | os.PathLike[str],
+    client_id: int | None = None,
+    session: int | None = None,
+) -> list[TraceMessage]:
+    """Load the messages of one client in one run of Tony from a trace file.
+
+    Parameters
+    ----------
+    path : str | os.PathLike[str]
+        The trace file, as written with the `traceFile` setting.
+    client_id : int | None
+        The client whose session to load, or None for the first client in the run.
+    session : int | None
+        The run of Tony to load, counting from 0, or None for the last run in the trace.
+        Client ids restart in every run.
+
+    """
+    entries = list(read_trace(path))
+    if session is None:
+        session = entries[-1]["session"] if entries else 0
+    messages: list[TraceMessage] = []
+    for entry in entries:
+        if entry["session"] != session:
+            continue
+        if client_id is None:
+            client_id = entry["client"]
+        if entry["client"] == client_id:
+            messages.append(TraceMessage(entry["t"], entry["dir"] == "in", entry["data"]))
+    return messages
+
+
+def _parse(data: str | bytes) -> Any:
+    """Parse a message, or return it unchanged if it is not JSON."""
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return data
+
+
+def normalize(message: Any) -> Any:
+    """Remove the parts of a parsed message that differ between sessions.
+
+    These are action ids, session ids and the data of actions, which Tony generates randomly.
+    """
+    if not isinstance(message, dict) or not isinstance(message.get("data"), dict):
+        return message
+    data = dict(message["data"])
+    if message.get("command") == "action":
+        data.pop("id", None)
+        data.pop("data", None)
+    if isinstance(data.get("session"), dict):
+        data["session"] = {key: value for key, value in data["session"].items() if key != "sessionId"}
+    return {**message, "data": data}
+
+
+class Replayer:
+    """Replays one side of a recorded session over a connection.
+
+    Messages of the replayed side are sent at their recorded times, scaled
+    by `speed`. Messages of the other side are expected in the recorded
+    order, and compared after `normalize`. Action ids Tony assigns in a game
+    side replay are mapped to the recorded ones, so the recorded action
+    results are sent with the ids Tony expects.
+    """
+
+    __slots__ = ("clock", "messages", "side", "speed", "timeout")
+
+    def __init__(
+        self,
+        messages: Sequence[TraceMessage],
+        side: ReplaySide,
+        speed: float = 1.0,
+        timeout: float = REPLAY_RESPONSE_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize Replayer.
+
+        Parameters
+        ----------
+        messages : Sequence[TraceMessage]
+            The recorded session.
+        side : ReplaySide
+            Which side of the session to replay.
+        speed : float
+            How much faster than recorded to send messages, or 0 to send them as fast as possible.
+        timeout : float
+            Seconds to wait for each expected message.
+        clock : Callable[[], float]
+            Function returning the current monotonic time in seconds.
+
+        """
+        self.messages = messages
+        self.side = side
+        self.speed = speed
+        self.timeout = timeout
+        self.clock = clock
+
+    def __repr__(self) -> str:
+        """Return representation of this replayer."""
+        return f"{self.__class__.__name__}({len(self.messages)} messages, {self.side.value!r}, speed={self.speed:g})"
+
+    def _sends(self, message: TraceMessage) -> bool:
+        """Return whether a message is sent by the replayed side."""
+        return message.inbound == (self.side == ReplaySide.GAME)
+
+    async def run(
+        self,
+        send: Callable[[str | bytes], Awaitable[object]],
+        receive: Callable[[], Awaitable[str | bytes]],
+    ) -> ReplayReport:
+        """Replay the session.
+
+        Parameters
+        ----------
+        send : Callable[[str | bytes], Awaitable[object]]
+            Function sending a message to the other side.
+        receive : Callable[[], Awaitable[str | bytes]]
+            Function receiving the next message from the other side.
+
+        """
+        started_at = self.clock()
+        recorded_start = self.messages[0].t if self.messages else 0.0
+        # Recorded action id -> action id of this session
+        action_ids: dict[str, str] = {}
+        sent = received = 0
+        mismatches: list[Mismatch] = []
+
+        for index, message in enumerate(self.messages):
+            if self._sends(message):
+                if self.speed > 0:
+                    due = started_at + (message.t - recorded_start) / self.speed
+                    await trio.sleep(max(0.0, due - self.clock()))
+                await send(self._map_ids(message.data, action_ids))
+                sent += 1
+                continue
+
+            actual: str | bytes | None = None
+            with trio.move_on_after(self.timeout), contextlib.suppress(ConnectionClosed):
+                actual = await receive()
+            if actual is None:
+                mismatches.append(Mismatch(index, message.data, None))
+                break
+            received += 1
+
+            expected_value, actual_value = _parse(message.data), _parse(actual)
+            self._learn_ids(expected_value, actual_value, action_ids)
+            if normalize(expected_value) != normalize(actual_value):
+                mismatches.append(Mismatch(index, message.data, actual))
+
+        return ReplayReport(sent, received, mismatches, self.clock() - started_at)
+
+    @staticmethod
+    def _learn_ids(expected: Any, actual: Any, action_ids: dict[str, str]) -> None:
+        """Remember the id Tony assigned to an action that was recorded with another id."""
+        if not (isinstance(expected, dict) and isinstance(actual, dict)) or expected.get("command") != "action":
+            return
+        expected_id = (expected.get("data") or {}).get("id")
+        actual_id = (actual.get("data") or {}).get("id") if isinstance(actual.get("data"), dict) else None
+        if isinstance(expected_id, str) and isinstance(actual_id, str):
+            action_ids[expected_id] = actual_id
+
+    @staticmethod
+    def _map_ids(data: str | bytes, action_ids: dict[str, str]) -> str | bytes:
+        """Replace a recorded action id in an action result with the id of this session."""
+        if not action_ids:
+            return data
+        message = _parse(data)
+        if not isinstance(message, dict) or message.get("command") != "action/result":
+            return data
+        result = message.get("data")
+        if not isinstance(result, dict) or result.get("id") not in action_ids:
+            return data
+        mapped = {**message, "data": {**result, "id": action_ids[result["id"]]}}
+        return orjson.dumps(mapped).decode("utf-8")
+
+
+class CorpusResult(NamedTuple):
+    """How a game responded to an entry of a fuzz corpus that was sent again."""
+
+    entry: dict[str, str]
+    """The corpus entry, as loaded with `load_corpus`."""
+    outcome: str
+    """'accepted' or 'rejected' if a result arrived, 'hang' if none arrived within `result_timeout`,
+    'crash' if the game disconnected, or 'skipped' if it disconnected earlier."""
+
+
+async def replay_corpus(
+    entries: Sequence[dict[str, str]],
+    send: Callable[[str | bytes], Awaitable[object]],
+    receive: Callable[[], Awaitable[str | bytes]],
+    result_timeout: float = REPLAY_RESPONSE_TIMEOUT,
+) -> list[CorpusResult]:
+    """Send the entries of a fuzz corpus to a game as actions, one at a time, and record how it responds.
+
+    Waits up to `result_timeout` seconds for the game to register the actions of
+    the corpus first, since games may ignore actions they did not register.
+    Other messages of the game are ignored.
+    """
+    results: list[CorpusResult] = []
+    missing = {entry["action"] for entry in entries}
+    with trio.move_on_after(result_timeout), contextlib.suppress(ConnectionClosed):
+        while missing:
+            message = _parse(await receive())
+            if isinstance(message, dict) and message.get("command") == "actions/register":
+                actions = (message.get("data") or {}).get("actions") or []
+                missing -= {action.get("name") for action in actions if isinstance(action, dict)}
+
+    for index, entry in enumerate(entries):
+        if results and results[-1].outcome in ("crash", "skipped"):
+            results.append(CorpusResult(entry, "skipped"))
+            continue
+        id_ = f"corpus_{index}"
+        action = {"command": "action", "data": {"id": id_, "name": entry["action"], "data": entry["data"]}}
+        outcome = "hang"
+        try:
+            await send(orjson.dumps(action).decode("utf-8"))
+            with trio.move_on_after(result_timeout):
+                while outcome == "hang":
+                    message = _parse(await receive())
+                    if not isinstance(message, dict) or message.get("command") != "action/result":
+                        continue
+                    data = message.get("data") or {}
+                    if data.get("id") == id_:
+                        outcome = "accepted" if data.get("success") else "rejected"
+        except ConnectionClosed:
+            outcome = "crash"
+        results.append(CorpusResult(entry, outcome))
+    return results
+
+
+async def replay_game_side(url: str, replayer: Replayer) -> ReplayReport:
+    """Connect to a running Tony as the game and replay the game side of a session."""
+    async with open_websocket_url(url) as websocket:
+        return await replayer.run(websocket.send_message, websocket.get_message)
+
+
+async def _serve_one(
+    host: str,
+    port: int,
+    run: Callable[[Callable[[str | bytes], Awaitable[object]], Callable[[], Awaitable[str | bytes]]], Awaitable[Any]],
+) -> Any:
+    """Wait for a game to connect, run `run` with the functions sending to and receiving from it, and return its result."""
+    result: Any = None
+
+    async with trio.open_nursery() as nursery:
+
+        async def handle(request: WebSocketRequest) -> None:
+            nonlocal result
+            websocket = await request.accept()
+            result = await run(websocket.send_message, websocket.get_message)
+            nursery.cancel_scope.cancel()
+
+        await nursery.start(serve_websocket, handle, host, port, None)
+
+    return result
+
+
+async def replay_tony_side(host: str, port: int, replayer: Replayer) -> ReplayReport:
+    """Wait for a game to connect and replay the Tony side of a session against it."""
+    report: ReplayReport = await _serve_one(host, port, replayer.run)
+    return report
+
+
+async def replay_corpus_to_game(
+    host: str,
+    port: int,
+    entries: Sequence[dict[str, str]],
+    result_timeout: float = REPLAY_RESPONSE_TIMEOUT,
+) -> list[CorpusResult]:
+    """Wait for a game to connect and send it the entries of a fuzz corpus with `replay_corpus`."""
+
+    async def run(
+        send: Callable[[str | bytes], Awaitable[object]],
+        receive: Callable[[], Awaitable[str | bytes]],
+    ) -> list[CorpusResult]:
+        return await replay_corpus(entries, send, receive, result_timeout)
+
+    results: list[CorpusResult] = await _serve_one(host, port, run)
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Replay a trace from the command line. Returns the exit code, 1 if responses did not match the recording."""
+    parser = argparse.ArgumentParser(prog="python -m neuro_api_tony.replay", description=__doc__.splitlines()[0])
+    parser.add_argument("trace", help="trace file recorded with the traceFile setting, or fuzz corpus with --corpus")
+    parser.add_argument(
+        "--corpus",
+        action="store_true",
+        help="send the entries of a fuzz corpus recorded with the fuzzCorpusFile setting to a game as actions",
+    )
+    parser.add_argument(
+        "--side",
+        choices=[side.value for side in ReplaySide],
+        default=ReplaySide.GAME.value,
+        help="'game' to act as the game against a running Tony, 'tony' to act as Tony against a game",
+    )
+    parser.add_argument("--client", type=int, default=None, help="client whose session to replay, default the first")
+    parser.add_argument(
+        "--session",
+        type=int,
+        default=None,
+        help="run of Tony in the trace to replay, counting from 0, default the last",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="1 for real time, 10 for ten times as fast, 0 for as fast as possible",
+    )
+    parser.add_argument("--url", default="ws://localhost:8000", help="Tony to connect to with --side game")
+    parser.add_argument("--address", default="localhost", help="address to listen on with --side tony")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on with --side tony")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=REPLAY_RESPONSE_TIMEOUT,
+        help="seconds to wait for a response",
+    )
+    args = parser.parse_args(argv)
+
+    if not math.isfinite(args.speed) or args.speed < 0:
+        parser.error("--speed must be 0 or positive")
+
+    if args.corpus:
+        results = trio.run(replay_corpus_to_game, args.address, args.port, load_corpus(args.trace), args.timeout)
+        for result in results:
+            print(f"{result.entry['action']} ({result.entry['mutation']}): {result.outcome}")
+        failures = sum(result.outcome in ("hang", "crash") for result in results)
+        print(f"{len(results)} entries sent, {failures} crashed or hung the game")
+        return 1 if failures else 0
+
+    messages = load_session(args.trace, args.client, args.session)
+    side = ReplaySide(args.side)
+    replayer = Replayer(messages, side, args.speed, args.timeout)
+    if side == ReplaySide.GAME:
+        report = trio.run(replay_game_side, args.url, replayer)
+    else:
+        report = trio.run(replay_tony_side, args.address, args.port, replayer)
+
+    for mismatch in report.mismatches:
+        actual = "nothing" if mismatch.actual is None else repr(mismatch.actual)
+        print(f"Message {mismatch.position}: expected {mismatch.expected!r}, got {actual}", file=sys.stderr)
+    print(report.summary())
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Retry - Backoff and circuit breaking for retrying failed forced actions."""
+
+from __future__ import annotations
+
+import random
+import time
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from neuro_api_tony.metrics import metrics
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float, rng: random.Random) -> float:
+    """Return the delay before a retry, with exponential backoff and jitter.
+
+    The delay doubles with each attempt up to `max_delay`, and is then
+    randomized between half and all of that, so that retries of several
+    clients do not line up.
+
+    Parameters
+    ----------
+    attempt : int
+        The number of the retry, starting at 1.
+    base_delay : float
+        The delay before the first retry, in seconds.
+    max_delay : float
+        The maximum delay, in seconds.
+    rng : random.Random
+        The random number generator used for jitter.
+
+    """
+    delay = min(max_delay, base_delay * 2 ** max(0, attempt - 1))
+    return rng.uniform(delay / 2, delay)
+
+
+class CircuitState(str, Enum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    """Retries are allowed."""
+    OPEN = "open"
+    """Too many consecutive failures, retries are not allowed until the cooldown has passed."""
+    HALF_OPEN = "half-open"
+    """The cooldown has passed, one retry is allowed to test whether the client recovered."""
+
+
+class CircuitBreaker:
+    """Per-client circuit breaker that stops retrying clients that keep failing."""
+
+    __slots__ = ("_failures", "_opened_at", "clock", "cooldown", "threshold")
+
+    def __init__(self, threshold: int, cooldown: float, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize CircuitBreaker.
+
+        Parameters
+        ----------
+        threshold : int
+            The number of consecutive failures after which the circuit opens.
+        cooldown : float
+            Seconds the circuit stays open before allowing another attempt.
+        clock : Callable[[], float]
+            Function returning the current monotonic time in seconds.
+
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self._failures: dict[int, int] = {}
+        self._opened_at: dict[int, float] = {}
+
+    def __repr__(self) -> str:
+        """Return representation of this circuit breaker."""
+        return f"{self.__class__.__name__}(open={sorted(self._opened_at)})"
+
+    def state(self, client_id: int) -> CircuitState:
+        """Return the state of the circuit of a client."""
+        opened_at = self._opened_at.get(client_id)
+        if opened_at is None:
+            return CircuitState.CLOSED
+        if self.clock() - opened_at < self.cooldown:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    def allow(self, client_id: int) -> bool:
+        """Return whether a retry to a client is allowed."""
+        return self.state(client_id) != CircuitState.OPEN
+
+    def record_success(self, client_id: int) -> None:
+        """Record a successful result, which closes the circuit."""
+        self._failures.pop(client_id, None)
+        self._opened_at.pop(client_id, None)
+
+    def record_failure(self, client_id: int) -> bool:
+        """Record a failed result. Returns True if this opened the circuit."""
+        failures = self._failures.get(client_id, 0) + 1
+        self._failures[client_id] = failures
+        if self.state(client_id) == CircuitState.HALF_OPEN or (
+            client_id not in self._opened_at and failures >= self.threshold
+        ):
+            self._opened_at[client_id] = self.clock()
+            return True
+        return False
+
+    def remove_client(self, client_id: int) -> None:
+        """Forget the state of a client, e.g. when it disconnects."""
+        self.record_success(client_id)
+
+
+class RetryPolicy:
+    """Decides whether and when a failed forced action is retried."""
+
+    __slots__ = (
+        "base_delay",
+        "breaker",
+        "circuit_opened",
+        "exhausted",
+        "max_attempts",
+        "max_delay",
+        "rejected",
+        "retried",
+        "rng",
+        "succeeded",
+    )
+
+    def __init__(
+        self,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        breaker: CircuitBreaker,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Initialize RetryPolicy.
+
+        Parameters
+        ----------
+        max_attempts : int
+            The maximum number of attempts of a forced action, including the
+            first one. 0 means no limit.
+        base_delay : float
+            The delay before the first retry, in seconds.
+        max_delay : float
+            The maximum delay between retries, in seconds.
+        breaker : CircuitBreaker
+            The circuit breaker that stops retrying clients that keep failing.
+        rng : random.Random | None
+            The random number generator used for jitter.
+
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker
+        self.rng = rng or random.Random()  # noqa: S311
+
+        self.retried = metrics().counter("retry.retried")
+        self.succeeded = metrics().counter("retry.succeeded_after_retry")
+        self.exhausted = metrics().counter("retry.exhausted")
+        self.rejected = metrics().counter("retry.circuit_rejected")
+        self.circuit_opened = metrics().counter("retry.circuit_opened")
+
+    def __repr__(self) -> str:
+        """Return representation of this policy."""
+        return f"{self.__class__.__name__}(max_attempts={self.max_attempts}, {self.breaker!r})"
+
+    def on_success(self, client_id: int, attempts: int) -> None:
+        """Record that a forced action succeeded after `attempts` attempts."""
+        self.breaker.record_success(client_id)
+        if attempts > 1:
+            self.succeeded.inc()
+
+    def on_failure(self, client_id: int, attempts: int) -> float | None:
+        """Record that a forced action failed after `attempts` attempts.
+
+        Returns
+        -------
+        float | None
+            Seconds to wait before retrying, or None if the forced action
+            should not be retried.
+
+        """
+        if self.breaker.record_failure(client_id):
+            self.circuit_opened.inc()
+        if self.max_attempts and attempts >= self.max_attempts:
+            self.exhausted.inc()
+            return None
+        if not self.breaker.allow(client_id):
+            self.rejected.inc()
+            return None
+        self.retried.inc()
+        return backoff_delay(attempts, self.base_delay, self.max_delay, self.rng)
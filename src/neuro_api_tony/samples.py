@@ -0,0 +1,632 @@
+"""Samples - Generating sample data for action schemas."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import multiprocessing.pool
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Any, Final
+
+import orjson
+
+from neuro_api_tony.metrics import metrics
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+    from jsf import JSF
+
+SAMPLE_GENERATOR_CACHE_SIZE: Final = 64
+"""The maximum number of prepared sample generators kept in the cache."""
+SAMPLE_POOL_SIZE: Final = 4
+"""The number of samples kept ready for each schema."""
+SAMPLE_TIME_BUDGET: Final = 1.0
+"""Seconds a sample may take in the worker process before the fallback generator is used instead."""
+SAMPLE_STARTUP_TIME: Final = 10.0
+"""Additional seconds allowed while the worker process is still starting."""
+SLOW_SAMPLE_TIME: Final = 0.1
+"""Schemas whose samples take longer than this many seconds are considered slow."""
+FALLBACK_MAX_DEPTH: Final = 16
+"""Nesting depth at which the fallback generator stops adding optional content."""
+FALLBACK_MAX_ITEMS: Final = 100
+"""The maximum number of array items the fallback generator creates."""
+
+_FALLBACK_STRING_FORMATS: Final[dict[str, str]] = {
+    "date": "2000-01-01",
+    "date-time": "2000-01-01T00:00:00Z",
+    "email": "tony@example.com",
+    "hostname": "example.com",
+    "ipv4": "127.0.0.1",
+    "ipv6": "::1",
+    "time": "00:00:00Z",
+    "uri": "https://example.com",
+    "uuid": "00000000-0000-0000-0000-000000000000",
+}
+
+
+def schema_key(schema: Mapping[str, object]) -> bytes:
+    """Return a key identifying the content of a schema, independent of key order."""
+    return hashlib.blake2b(orjson.dumps(schema, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+
+
+class SampleGeneratorCache:
+    """Least recently used cache of prepared JSF sample generators, keyed by schema content.
+
+    Creating a `JSF` parses the schema and sets up the Faker providers, which
+    is about as expensive as generating a sample. Actions are usually forced
+    many times with the same schema, so the prepared generators are reused.
+    """
+
+    __slots__ = ("_generators", "_lock", "hits", "maxsize", "misses")
+
+    def __init__(self, maxsize: int = SAMPLE_GENERATOR_CACHE_SIZE) -> None:
+        """Initialize SampleGeneratorCache.
+
+        Parameters
+        ----------
+        maxsize : int
+            The maximum number of generators to keep. The least recently
+            used generator is dropped when the cache is full.
+
+        """
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._generators: OrderedDict[bytes, JSF] = OrderedDict()
+
+        self.hits = metrics().counter("samples.generator_cache_hits")
+        self.misses = metrics().counter("samples.generator_cache_misses")
+
+    def __repr__(self) -> str:
+        """Return representation of this cache."""
+        return f"{self.__class__.__name__}(size={len(self)}, maxsize={self.maxsize})"
+
+    def __len__(self) -> int:
+        """Return the number of cached generators."""
+        with self._lock:
+            return len(self._generators)
+
+    def get(self, schema: Mapping[str, object]) -> JSF:
+        """Return the generator for a schema, creating it if it is not cached."""
+        key = schema_key(schema)
+        with self._lock:
+            generator = self._generators.get(key)
+            if generator is not None:
+                self._generators.move_to_end(key)
+                self.hits.inc()
+                return generator
+
+        # Imported on first use since JSF pulls in Faker, which is slow to import
+        from jsf import JSF
+
+        # Create outside of the lock, parsing the schema may take a while
+        self.misses.inc()
+        generator = JSF(dict(schema))
+        with self._lock:
+            self._generators[key] = generator
+            self._generators.move_to_end(key)
+            while len(self._generators) > self.maxsize:
+                self._generators.popitem(last=False)
+        return generator
+
+    def generate(self, schema: Mapping[str, object]) -> object:
+        """Generate a sample for a schema."""
+        return self.get(schema).generate()
+
+    def clear(self) -> None:
+        """Remove all cached generators."""
+        with self._lock:
+            self._generators.clear()
+
+
+_sample_generators = SampleGeneratorCache()
+
+
+def sample_generators() -> SampleGeneratorCache:
+    """Get the global sample generator cache."""
+    return _sample_generators
+
+
+def resolve_ref(root: Mapping[str, object], ref: str) -> object:
+    """Resolve a local `$ref` such as `#/$defs/item`. Returns `True` (anything) if it cannot be resolved."""
+    if not ref.startswith("#"):
+        return True
+    node: object = root
+    for part in filter(None, ref[1:].split("/")):
+        part = part.replace("~1", "/").replace("~0", "~")
+        if isinstance(node, dict) and part in node:
+            node = node[part]
+        elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        else:
+            return True
+    return node
+
+
+def _fallback_string(schema: Mapping[str, object]) -> str:
+    """Return a string matching the length and format of a string schema."""
+    value = _FALLBACK_STRING_FORMATS.get(str(schema.get("format")), "sample")
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+    if isinstance(min_length, int) and len(value) < min_length:
+        value = value.ljust(min_length, "x")
+    if isinstance(max_length, int):
+        value = value[:max_length]
+    return value
+
+
+def _fallback_number(schema: Mapping[str, object], integer: bool) -> int | float:
+    """Return a number within the bounds of a number schema."""
+    value: int | float = 0
+    minimum = schema.get("minimum")
+    exclusive_minimum = schema.get("exclusiveMinimum")
+    maximum = schema.get("maximum")
+    exclusive_maximum = schema.get("exclusiveMaximum")
+    if isinstance(minimum, int | float):
+        value = minimum
+    elif isinstance(exclusive_minimum, int | float):
+        value = exclusive_minimum + 1
+    elif isinstance(maximum, int | float):
+        value = maximum
+    elif isinstance(exclusive_maximum, int | float):
+        value = exclusive_maximum - 1
+    return int(value) if integer else value
+
+
+def generate_fallback(schema: Mapping[str, object]) -> object:
+    """Generate a simple sample for a schema without JSF.
+
+    The schema is walked iteratively, and optional content is left out below
+    `FALLBACK_MAX_DEPTH`, so deeply nested or self-referencing schemas
+    cannot hang or overflow the stack. Values are predictable rather than
+    random: the first enum value, the minimum of a number, and so on.
+    """
+    root: list[object] = [None]
+    # (schema, container, key in container, depth)
+    stack: list[tuple[object, list[object] | dict[str, object], Any, int]] = [(schema, root, 0, 0)]
+
+    while stack:
+        node, container, key, depth = stack.pop()
+
+        # Resolve references and combinators to a single schema
+        for _ in range(FALLBACK_MAX_DEPTH):
+            if not isinstance(node, dict):
+                break
+            if isinstance(node.get("$ref"), str):
+                node = resolve_ref(schema, node["$ref"])
+            elif isinstance(node.get("anyOf"), list) and node["anyOf"]:
+                node = node["anyOf"][0]
+            elif isinstance(node.get("oneOf"), list) and node["oneOf"]:
+                node = node["oneOf"][0]
+            elif isinstance(node.get("allOf"), list) and node["allOf"]:
+                merged = {k: v for k, v in node.items() if k != "allOf"}
+                for part in node["allOf"]:
+                    if isinstance(part, dict):
+                        merged.update(part)
+                node = merged
+            else:
+                break
+
+        if not isinstance(node, dict):
+            container[key] = None
+            continue
+
+        if "const" in node:
+            container[key] = node["const"]
+            continue
+        if "enum" in node:
+            enum = node["enum"]
+            container[key] = enum[0] if isinstance(enum, list) and enum else None
+            continue
+
+        type_ = node.get("type")
+        if isinstance(type_, list):
+            type_ = next((t for t in type_ if t != "null"), "null")
+        if type_ is None:
+            type_ = "object" if "properties" in node else "array" if "items" in node else None
+
+        value: object
+        if type_ == "object":
+            obj: dict[str, object] = {}
+            properties = node.get("properties")
+            properties = properties if isinstance(properties, dict) else {}
+            required = node.get("required")
+            required = [name for name in required if isinstance(name, str)] if isinstance(required, list) else []
+            names = (
+                list(properties) if depth < FALLBACK_MAX_DEPTH else [name for name in properties if name in required]
+            )
+            for name in names:
+                if properties[name] is not False:
+                    stack.append((properties[name], obj, name, depth + 1))
+            for name in required:
+                if name not in properties:
+                    obj[name] = None
+            value = obj
+        elif type_ == "array":
+            min_items = node.get("minItems")
+            count = min(min_items, FALLBACK_MAX_ITEMS) if isinstance(min_items, int) else 0
+            array: list[object] = [None] * count
+            items = node.get("items", True)
+            for i in range(count):
+                stack.append((items, array, i, depth + 1))
+            value = array
+        elif type_ == "string":
+            value = _fallback_string(node)
+        elif type_ in ("integer", "number"):
+            value = _fallback_number(node, type_ == "integer")
+        elif type_ == "boolean":
+            value = False
+        else:
+            value = None
+        container[key] = value
+
+    return root[0]
+
+
+class SchemaCost:
+    """Cost of generating samples for one schema."""
+
+    __slots__ = ("error", "failures", "max_time", "samples", "timeouts", "total_time")
+
+    def __init__(self) -> None:
+        """Initialize SchemaCost."""
+        self.samples = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.timeouts = 0
+        self.failures = 0
+        self.error: str | None = None
+        """The last error JSF raised for this schema."""
+
+    def __repr__(self) -> str:
+        """Return representation of this cost record."""
+        return (
+            f"{self.__class__.__name__}(samples={self.samples}, mean_time={self.mean_time:.4f},"
+            f" max_time={self.max_time:.4f}, timeouts={self.timeouts}, failures={self.failures})"
+        )
+
+    @property
+    def mean_time(self) -> float:
+        """The mean time in seconds it took to generate a sample."""
+        return self.total_time / self.samples if self.samples else 0.0
+
+    @property
+    def use_fallback(self) -> bool:
+        """Whether JSF timed out or failed for this schema, so the fallback generator is used."""
+        return self.timeouts > 0 or self.failures > 0
+
+    @property
+    def slow(self) -> bool:
+        """Whether generating samples for this schema is slow or does not work with JSF."""
+        return self.use_fallback or self.max_time > SLOW_SAMPLE_TIME
+
+
+def _warm_up() -> None:
+    """Do nothing. Used to find out when the worker process is ready."""
+
+
+def _generate_in_process(schema: dict[str, object]) -> tuple[object, float]:
+    """Generate a sample with JSF and return it with the seconds it took. Runs in the worker process."""
+    start = time.perf_counter()
+    sample = sample_generators().generate(schema)
+    return sample, time.perf_counter() - start
+
+
+class _Worker:
+    """A worker process serving the samples requested by one thread."""
+
+    __slots__ = ("pool", "ready")
+
+    def __init__(self, pool: multiprocessing.pool.Pool) -> None:
+        self.pool = pool
+        self.ready = threading.Event()
+        """Set once the worker process has started."""
+
+
+class SampleGenerator:
+    """Generates samples with JSF in worker processes, with a time budget per sample.
+
+    Every thread gets its own worker process, so a sample is never queued
+    behind one requested by another thread, e.g. the GUI thread behind the
+    sample pool, and a worker that is replaced only takes its own thread's
+    sample with it.
+
+    If JSF takes longer than the budget or fails, the worker process is
+    replaced and the sample comes from `generate_fallback` instead. The cost
+    of every schema is recorded, and schemas that timed out or failed use the
+    fallback generator right away from then on.
+
+    If no worker process can be started, JSF runs in the calling process.
+    """
+
+    __slots__ = (
+        "_costs",
+        "_lock",
+        "_pool_failed",
+        "_workers",
+        "budget",
+        "fallbacks",
+        "on_slow_schema",
+        "timeouts",
+    )
+
+    def __init__(self, budget: float = SAMPLE_TIME_BUDGET) -> None:
+        """Initialize SampleGenerator.
+
+        Parameters
+        ----------
+        budget : float
+            Seconds a sample may take before the fallback generator is used.
+
+        """
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._costs: dict[bytes, SchemaCost] = {}
+        self._workers: dict[int, _Worker] = {}
+        self._pool_failed = False
+
+        self.on_slow_schema: Callable[[Mapping[str, object], SchemaCost], None] = lambda schema, cost: None
+        """Called once when a schema is found to be slow. May be called from any thread."""
+
+        self.fallbacks = metrics().counter("samples.fallbacks")
+        self.timeouts = metrics().counter("samples.timeouts")
+
+    def __repr__(self) -> str:
+        """Return representation of this generator."""
+        return f"{self.__class__.__name__}(budget={self.budget}, workers={len(self._workers)})"
+
+    def _start(self) -> _Worker | None:
+        """Return the worker of the calling thread, starting it if needed. Must hold the lock."""
+        thread_id = threading.get_ident()
+        worker = self._workers.get(thread_id)
+        if worker is None and not self._pool_failed:
+            try:
+                pool = multiprocessing.get_context("spawn").Pool(1)
+            except OSError:
+                self._pool_failed = True
+                return None
+            worker = self._workers[thread_id] = _Worker(pool)
+            pool.apply_async(_warm_up, callback=lambda _: worker.ready.set())
+        return worker
+
+    def start(self) -> None:
+        """Start the worker process of the calling thread in the background, so it is ready when the first sample is needed."""
+        with self._lock:
+            self._start()
+
+    def close(self) -> None:
+        """Stop all worker processes."""
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.pool.terminate()
+
+    def cost(self, schema: Mapping[str, object]) -> SchemaCost | None:
+        """Return the recorded cost of a schema, or None if no sample was generated for it yet."""
+        with self._lock:
+            return self._costs.get(schema_key(schema))
+
+    def generate(self, schema: Mapping[str, object]) -> object:
+        """Generate a sample for a schema."""
+        key = schema_key(schema)
+        with self._lock:
+            cost = self._costs.setdefault(key, SchemaCost())
+            use_fallback = cost.use_fallback
+            worker = None if use_fallback else self._start()
+
+        if use_fallback:
+            self.fallbacks.inc()
+            return generate_fallback(schema)
+
+        try:
+            if worker is None:
+                start = time.perf_counter()
+                sample = sample_generators().generate(schema)
+                elapsed = time.perf_counter() - start
+            else:
+                # The worker only serves this thread, so the sample starts right away once the worker is ready
+                timeout = self.budget if worker.ready.is_set() else self.budget + SAMPLE_STARTUP_TIME
+                sample, elapsed = worker.pool.apply_async(_generate_in_process, (dict(schema),)).get(timeout)
+        except multiprocessing.TimeoutError:
+            assert worker is not None
+            with self._lock:
+                # The worker may have been stopped by `close` instead of this sample timing out
+                own = self._workers.get(threading.get_ident()) is worker
+                if own:
+                    # The worker may be stuck, replace it
+                    del self._workers[threading.get_ident()]
+                    self._start()
+            worker.pool.terminate()
+            if own:
+                self.timeouts.inc()
+                self._record(schema, cost, timeout=True)
+            return self._fallback(schema)
+        except Exception as exc:
+            self._record(schema, cost, error=f"{type(exc).__name__}: {exc}")
+            return self._fallback(schema)
+
+        self._record(schema, cost, elapsed)
+        return sample
+
+    def _fallback(self, schema: Mapping[str, object]) -> object:
+        """Generate a sample with the fallback generator."""
+        self.fallbacks.inc()
+        return generate_fallback(schema)
+
+    def _record(
+        self,
+        schema: Mapping[str, object],
+        cost: SchemaCost,
+        elapsed: float = 0.0,
+        timeout: bool = False,
+        error: str | None = None,
+    ) -> None:
+        """Record the cost of a sample and report the schema if it just became slow."""
+        with self._lock:
+            was_slow = cost.slow
+            if timeout:
+                cost.timeouts += 1
+            elif error is not None:
+                cost.failures += 1
+                cost.error = error
+            else:
+                cost.samples += 1
+                cost.total_time += elapsed
+                cost.max_time = max(cost.max_time, elapsed)
+            became_slow = cost.slow and not was_slow
+        if became_slow:
+            self.on_slow_schema(schema, cost)
+
+
+_sample_generator = SampleGenerator()
+
+
+def sample_generator() -> SampleGenerator:
+    """Get the global sample generator."""
+    return _sample_generator
+
+
+class _SchemaPool:
+    """Pre-generated samples for one schema."""
+
+    __slots__ = ("failed", "samples", "schema")
+
+    def __init__(self, schema: Mapping[str, object]) -> None:
+        self.schema = schema
+        self.samples: deque[str] = deque()
+        self.failed = False
+        """Whether refilling failed. Samples for the schema are then only generated when taken."""
+
+
+class SamplePool:
+    """Pools of pre-generated samples for action schemas, refilled by a background thread.
+
+    Taking a sample from the pool is instant, so forced actions can be
+    answered without waiting for `JSF.generate`. Samples are JSON strings
+    generated with `sample_generator()` on the refill thread only.
+    """
+
+    __slots__ = (
+        "_closed",
+        "_condition",
+        "_pools",
+        "_thread",
+        "hits",
+        "max_schemas",
+        "on_refill_error",
+        "refills",
+        "size",
+        "steer",
+    )
+
+    def __init__(self, size: int = SAMPLE_POOL_SIZE, max_schemas: int = SAMPLE_GENERATOR_CACHE_SIZE) -> None:
+        """Initialize SamplePool.
+
+        Parameters
+        ----------
+        size : int
+            The number of samples to keep ready for each schema.
+        max_schemas : int
+            The maximum number of schemas to keep samples for. The least
+            recently used schema is dropped when the limit is reached.
+
+        """
+        self.size = size
+        self.max_schemas = max_schemas
+        self._condition = threading.Condition()
+        self._pools: OrderedDict[bytes, _SchemaPool] = OrderedDict()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+        self.on_refill_error: Callable[[Mapping[str, object], Exception], None] = lambda schema, exc: None
+        """Called on the worker thread when a sample for a schema could not be generated."""
+        self.steer: Callable[[Mapping[str, object], object], object] = lambda schema, sample: sample
+        """Called on the worker thread to change each generated sample for a schema before it is kept ready."""
+
+        self.hits = metrics().ratio("samples.pool_hits")
+        self.refills = metrics().meter("samples.pool_refills")
+
+    def __repr__(self) -> str:
+        """Return representation of this pool."""
+        return f"{self.__class__.__name__}(schemas={len(self._pools)}, size={self.size})"
+
+    def prepare(self, schema: Mapping[str, object]) -> None:
+        """Start keeping samples ready for a schema."""
+        key = schema_key(schema)
+        with self._condition:
+            if self._closed:
+                return
+            if key in self._pools:
+                self._pools.move_to_end(key)
+            else:
+                self._pools[key] = _SchemaPool(schema)
+                while len(self._pools) > self.max_schemas:
+                    self._pools.popitem(last=False)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="SamplePool", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def take(self, schema: Mapping[str, object]) -> str:
+        """Return a sample for a schema as a JSON string.
+
+        If no sample is ready, a sample of the fallback generator is returned
+        right away, since the calling thread is usually the GUI thread, and
+        the schema is queued for refilling.
+        """
+        key = schema_key(schema)
+        with self._condition:
+            pool = self._pools.get(key)
+            if pool is not None and pool.samples:
+                self.hits.hit()
+                self._pools.move_to_end(key)
+                self._condition.notify()
+                return pool.samples.popleft()
+
+        self.hits.miss()
+        self.prepare(schema)
+        return json.dumps(generate_fallback(schema))
+
+    def close(self) -> None:
+        """Stop the worker thread and drop all samples."""
+        with self._condition:
+            self._closed = True
+            self._pools.clear()
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _next_pool(self) -> _SchemaPool | None:
+        """Return a pool that needs refilling, most recently used first. Must hold the lock."""
+        for pool in reversed(self._pools.values()):
+            if not pool.failed and len(pool.samples) < self.size:
+                return pool
+        return None
+
+    def _run(self) -> None:
+        """Refill pools until closed. Runs on the worker thread."""
+        while True:
+            with self._condition:
+                pool = self._next_pool()
+                while not self._closed and pool is None:
+                    self._condition.wait()
+                    pool = self._next_pool()
+                if self._closed or pool is None:
+                    return
+
+            try:
+                sample = json.dumps(self.steer(pool.schema, sample_generator().generate(pool.schema)))
+            except Exception as exc:
+                # Keep refilling the other schemas, this one would most likely fail again
+                with self._condition:
+                    pool.failed = True
+                self.on_refill_error(pool.schema, exc)
+                continue
+            with self._condition:
+                pool.samples.append(sample)
+            self.refills.mark()
@@ -0,0 +1,143 @@
+"""Scheduler - Queue of forced actions from all clients, served by priority."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from typing import TYPE_CHECKING
+
+from neuro_api.command import ForcePriority
+
+from neuro_api_tony.metrics import metrics
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from neuro_api_tony.api import ActionsForceCommand
+
+PRIORITY_RANK = {
+    ForcePriority.CRITICAL: 0,
+    ForcePriority.HIGH: 1,
+    ForcePriority.MEDIUM: 2,
+    ForcePriority.LOW: 3,
+}
+"""Order in which forced actions are served, lower first."""
+
+
+class ForceRequest:
+    """An actions/force command waiting to be served or being served."""
+
+    __slots__ = ("action_id", "attempts", "client_id", "cmd", "enqueued_at", "seq", "started_at")
+
+    def __init__(self, client_id: int, cmd: ActionsForceCommand, seq: int, enqueued_at: float) -> None:
+        """Initialize ForceRequest."""
+        self.client_id = client_id
+        self.cmd = cmd
+        self.seq = seq
+        """Arrival order, used to serve requests of equal priority first come, first served."""
+        self.enqueued_at = enqueued_at
+        self.started_at: float | None = None
+        self.attempts = 0
+        """How often the forced action has been executed, including retries."""
+        self.action_id: str | None = None
+        """Id of the action sent for the current attempt, used to match its action/result, or None if none was sent."""
+
+    def __repr__(self) -> str:
+        """Return representation of this request."""
+        return f"{self.__class__.__name__}({self.client_id}, {self.cmd.priority.value!r}, attempts={self.attempts})"
+
+    def sort_key(self) -> tuple[int, int]:
+        """Return the key requests are served in order of."""
+        return PRIORITY_RANK.get(self.cmd.priority, len(PRIORITY_RANK)), self.seq
+
+
+class ForceScheduler:
+    """Queue of actions/force commands from all clients.
+
+    Each client has at most one forced action active at a time, since its
+    action/result can only be matched with one. Waiting requests are served by
+    priority and then by arrival, and at most `concurrency` forced actions are
+    active across all clients.
+    """
+
+    __slots__ = ("_active", "_queue", "_seq", "clock", "concurrency", "depth", "wait_time")
+
+    def __init__(self, concurrency: int = 1, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize ForceScheduler.
+
+        Parameters
+        ----------
+        concurrency : int
+            The maximum number of forced actions active at once.
+        clock : Callable[[], float]
+            Function returning the current monotonic time in seconds.
+
+        """
+        self.concurrency = concurrency
+        self.clock = clock
+        self._seq = itertools.count()
+        self._queue: list[tuple[tuple[int, int], ForceRequest]] = []
+        self._active: dict[int, ForceRequest] = {}
+
+        self.depth = metrics().gauge("actions_force.queue_depth")
+        self.wait_time = metrics().histogram("actions_force.wait_time", "ms")
+
+    def __repr__(self) -> str:
+        """Return representation of this scheduler."""
+        return f"{self.__class__.__name__}(queued={len(self._queue)}, active={len(self._active)})"
+
+    def __len__(self) -> int:
+        """Return the number of waiting requests."""
+        return len(self._queue)
+
+    def submit(self, client_id: int, cmd: ActionsForceCommand) -> ForceRequest:
+        """Queue an actions/force command. Call `start_ready` afterwards to serve it."""
+        request = ForceRequest(client_id, cmd, next(self._seq), self.clock())
+        heapq.heappush(self._queue, (request.sort_key(), request))
+        self.depth.set(len(self._queue))
+        return request
+
+    def start_ready(self) -> list[ForceRequest]:
+        """Activate as many waiting requests as the concurrency allows and return them in order."""
+        started: list[ForceRequest] = []
+        skipped: list[tuple[tuple[int, int], ForceRequest]] = []
+        while self._queue and len(self._active) < self.concurrency:
+            entry = heapq.heappop(self._queue)
+            request = entry[1]
+            if request.client_id in self._active:
+                # Wait until the client's current forced action is done
+                skipped.append(entry)
+                continue
+            request.started_at = self.clock()
+            self._active[request.client_id] = request
+            self.wait_time.observe((request.started_at - request.enqueued_at) * 1000)
+            started.append(request)
+
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+        self.depth.set(len(self._queue))
+        return started
+
+    def active(self, client_id: int) -> ForceRequest | None:
+        """Return the active request of a client, if any."""
+        return self._active.get(client_id)
+
+    def active_requests(self) -> list[ForceRequest]:
+        """Return the active requests of all clients."""
+        return list(self._active.values())
+
+    def finish(self, client_id: int) -> ForceRequest | None:
+        """Mark the active request of a client as done and return it. Call `start_ready` afterwards."""
+        return self._active.pop(client_id, None)
+
+    def remove_client(self, client_id: int) -> None:
+        """Drop the active and waiting requests of a client, e.g. when it disconnects."""
+        self._active.pop(client_id, None)
+        self._queue = [entry for entry in self._queue if entry[1].client_id != client_id]
+        heapq.heapify(self._queue)
+        self.depth.set(len(self._queue))
+
+    def waiting(self) -> list[ForceRequest]:
+        """Return the waiting requests in the order they will be served."""
+        return [request for _, request in sorted(self._queue)]
@@ -0,0 +1,422 @@
+"""Schema Coverage - Tracking which parts of action schemas were exercised, and steering samples to the rest."""
+
+from __future__ import annotations
+
+import copy
+import itertools
+import json
+import math
+import random
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from neuro_api_tony.metrics import metrics
+from neuro_api_tony.samples import generate_fallback, resolve_ref, schema_key
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+
+COVERAGE_MAX_TARGETS = 1000
+"""Maximum number of coverage targets of a schema. Targets beyond this are not tracked."""
+
+STEER_MUTATIONS = 4
+"""Maximum number of uncovered targets a sample is changed towards."""
+
+Path = tuple[str | None, ...]
+"""Location of a value in a sample. Property names, or None for every item of an array."""
+
+
+class CoverageTarget(NamedTuple):
+    """Something a sample can exercise, e.g. an enum value or an optional property being left out."""
+
+    path: Path
+    kind: str
+    """One of enum, oneOf, anyOf, boolean, minimum, maximum, minLength, maxLength, minItems, maxItems, present or absent."""
+    payload: Any
+    """The value, length or subschema that exercises the target."""
+    label: str
+    """Unique human-readable description, e.g. `$.items[].color enum "red"`."""
+
+
+def _format_path(path: Path) -> str:
+    """Return a path as a string like `$.items[].color`."""
+    return "$" + "".join("[]" if part is None else f".{part}" for part in path)
+
+
+def _same(a: object, b: object) -> bool:
+    """Return whether two JSON values are equal, not considering `True == 1` equal."""
+    return a == b and isinstance(a, bool) == isinstance(b, bool)
+
+
+def _types(schema: Mapping[str, Any]) -> set[str]:
+    """Return the types a schema allows, inferring them from keywords if `type` is missing."""
+    type_ = schema.get("type")
+    if isinstance(type_, str):
+        return {type_}
+    if isinstance(type_, list):
+        return {t for t in type_ if isinstance(t, str)}
+
+    types = set()
+    if "properties" in schema:
+        types.add("object")
+    if "items" in schema or "minItems" in schema or "maxItems" in schema:
+        types.add("array")
+    if "minimum" in schema or "maximum" in schema:
+        types.add("number")
+    if "minLength" in schema or "maxLength" in schema:
+        types.add("string")
+    return types
+
+
+def _with_definitions(schema: object, root: Mapping[str, Any]) -> object:
+    """Return a subschema with the definitions of the root schema, so its references can be resolved."""
+    if not isinstance(schema, dict):
+        return schema
+    return {**{key: root[key] for key in ("$defs", "definitions") if key in root}, **schema}
+
+
+def _boundaries(schema: Mapping[str, Any], types: set[str]) -> Iterator[tuple[str, int | float]]:
+    """Yield the boundary values of a number schema."""
+    integer = "integer" in types and "number" not in types
+    for kind, round_ in (("minimum", math.ceil), ("maximum", math.floor)):
+        value = schema.get(kind)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield kind, round_(value) if integer else value
+
+    # Exclusive boundaries only have a closest value for integers
+    if integer:
+        value = schema.get("exclusiveMinimum")
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield "exclusiveMinimum", math.floor(value) + 1
+        value = schema.get("exclusiveMaximum")
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield "exclusiveMaximum", math.ceil(value) - 1
+
+
+def _walk(schema: Mapping[str, Any]) -> Iterator[tuple[dict[str, Any], Path]]:
+    """Yield the subschemas of a schema with the path of the values they describe, outer ones first.
+
+    References are followed, but a reference is not expanded again inside
+    itself, so self-referencing schemas have a finite number of subschemas.
+    """
+    # (schema, path, references being expanded)
+    queue: deque[tuple[object, Path, frozenset[str]]] = deque([(schema, (), frozenset())])
+    while queue:
+        node, path, refs = queue.popleft()
+        if not isinstance(node, dict):
+            continue
+
+        ref = node.get("$ref")
+        if isinstance(ref, str):
+            if ref not in refs:
+                queue.append((resolve_ref(schema, ref), path, refs | {ref}))
+            continue
+
+        yield node, path
+
+        for keyword in ("oneOf", "anyOf", "allOf"):
+            if isinstance(node.get(keyword), list):
+                queue.extend((part, path, refs) for part in node[keyword])
+        if "array" in _types(node):
+            queue.append((node.get("items"), (*path, None), refs))
+        if "object" in _types(node) and isinstance(node.get("properties"), dict):
+            queue.extend((subschema, (*path, name), refs) for name, subschema in node["properties"].items())
+
+
+def coverage_targets(schema: Mapping[str, Any]) -> list[CoverageTarget]:
+    """Return the coverage targets of a schema, at most `COVERAGE_MAX_TARGETS`."""
+    targets: dict[str, CoverageTarget] = {}
+
+    def add(path: Path, kind: str, payload: Any, detail: str) -> None:
+        label = f"{_format_path(path)} {detail}"
+        targets.setdefault(label, CoverageTarget(path, kind, payload, label))
+
+    for node, path in _walk(schema):
+        if len(targets) >= COVERAGE_MAX_TARGETS:
+            break
+
+        if isinstance(node.get("enum"), list):
+            for value in node["enum"]:
+                add(path, "enum", value, f"enum {json.dumps(value)}")
+        for keyword in ("oneOf", "anyOf"):
+            if isinstance(node.get(keyword), list):
+                for i, branch in enumerate(node[keyword]):
+                    add(path, keyword, branch, f"{keyword}[{i}]")
+        if "const" in node or "enum" in node:
+            continue
+
+        types = _types(node)
+        if "boolean" in types:
+            add(path, "boolean", True, "true")
+            add(path, "boolean", False, "false")
+        if types & {"integer", "number"}:
+            for kind, value in _boundaries(node, types):
+                add(path, kind, value, f"{kind} {value}")
+        if "string" in types:
+            for kind in ("minLength", "maxLength"):
+                if isinstance(node.get(kind), int):
+                    add(path, kind, node[kind], f"{kind} {node[kind]}")
+        if "array" in types:
+            min_items = node.get("minItems", 0)
+            if isinstance(min_items, int):
+                add(path, "minItems", min_items, f"minItems {min_items}")
+            if isinstance(node.get("maxItems"), int):
+                add(path, "maxItems", node["maxItems"], f"maxItems {node['maxItems']}")
+        if "object" in types and isinstance(node.get("properties"), dict):
+            required = node.get("required", [])
+            for name, subschema in node["properties"].items():
+                if name not in required:
+                    add(path, "present", (name, subschema), f"has {name}")
+                    add(path, "absent", name, f"lacks {name}")
+
+    return list(itertools.islice(targets.values(), COVERAGE_MAX_TARGETS))
+
+
+class ActionCoverage:
+    """Coverage of the schema of one action by the samples sent for it."""
+
+    __slots__ = (
+        "_branch_validators",
+        "_subschemas",
+        "_validator",
+        "_validator_class",
+        "covered",
+        "metric",
+        "name",
+        "rng",
+        "schema",
+        "targets",
+    )
+
+    def __init__(self, name: str, schema: Mapping[str, Any], rng: random.Random | None = None) -> None:
+        """Initialize ActionCoverage.
+
+        Parameters
+        ----------
+        name : str
+            The name of the action.
+        schema : Mapping[str, Any]
+            The schema of the action.
+        rng : random.Random | None
+            The random number generator used to pick targets to steer towards.
+
+        """
+        self.name = name
+        self.schema = schema
+        self.rng = rng or random.Random()  # noqa: S311
+        self.targets = {target.label: target for target in coverage_targets(schema)}
+        # The outermost subschema describing the values at each path, used to add missing values
+        self._subschemas: dict[Path, dict[str, Any]] = {}
+        for subschema, path in _walk(schema):
+            self._subschemas.setdefault(path, subschema)
+        self.covered: set[str] = set()
+        # Imported on first use to keep it out of startup
+        import jsonschema.validators
+
+        self._validator_class = jsonschema.validators.validator_for(schema)
+        self._validator = self._validator_class(schema)
+        self._branch_validators: dict[str, Any] = {}
+
+        self.metric = metrics().ratio(f"schema_coverage.{name}")
+        self._update_metric()
+
+    def __repr__(self) -> str:
+        """Return representation of this coverage."""
+        return f"{self.__class__.__name__}({self.name!r}, {self.format()})"
+
+    def _update_metric(self) -> None:
+        """Show the coverage in the statistics."""
+        self.metric.hits = len(self.covered)
+        self.metric.misses = len(self.targets) - len(self.covered)
+
+    @property
+    def ratio(self) -> float:
+        """The fraction of targets covered, or 1 if the schema has no targets."""
+        return len(self.covered) / len(self.targets) if self.targets else 1.0
+
+    def format(self) -> str:
+        """Return the coverage as a human-readable string."""
+        return f"{self.ratio:.1%} ({len(self.covered)}/{len(self.targets)})"
+
+    def uncovered(self) -> list[CoverageTarget]:
+        """Return the targets no sample exercised yet."""
+        return [target for label, target in self.targets.items() if label not in self.covered]
+
+    def record(self, value: object) -> int:
+        """Record that a sample was sent. Returns the number of newly covered targets."""
+        new = self.covers(value) - self.covered
+        self.covered |= new
+        self._update_metric()
+        return len(new)
+
+    def covers(self, value: object) -> set[str]:
+        """Return the labels of the targets a sample exercises."""
+        covered: set[str] = set()
+        for target in self.targets.values():
+            if target.label in covered:
+                continue
+            for node in self._find(value, target.path):
+                if self._exercises(target, node):
+                    covered.add(target.label)
+                    break
+        return covered
+
+    def _find(self, value: object, path: Path) -> Iterator[object]:
+        """Yield the values at a path of a sample. Values that do not exist are not yielded."""
+        nodes = [value]
+        for part in path:
+            if part is None:
+                nodes = [item for node in nodes if isinstance(node, list) for item in node]
+            else:
+                nodes = [node[part] for node in nodes if isinstance(node, dict) and part in node]
+        yield from nodes
+
+    def _exercises(self, target: CoverageTarget, node: object) -> bool:
+        """Return whether a value at the path of a target exercises it."""
+        kind = target.kind
+        if kind in {"enum", "boolean", "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum"}:
+            return _same(node, target.payload)
+        if kind in {"oneOf", "anyOf"}:
+            validator = self._branch_validators.get(target.label)
+            if validator is None:
+                branch = _with_definitions(target.payload, self.schema)
+                validator = self._validator_class(branch)
+                self._branch_validators[target.label] = validator
+            return bool(validator.is_valid(node))
+        if kind in {"minLength", "maxLength"}:
+            return isinstance(node, str) and len(node) == target.payload
+        if kind in {"minItems", "maxItems"}:
+            return isinstance(node, list) and len(node) == target.payload
+        if kind == "present":
+            return isinstance(node, dict) and target.payload[0] in node
+        if kind == "absent":
+            return isinstance(node, dict) and target.payload not in node
+        return False
+
+    def steer(self, value: object) -> object:
+        """Return a sample changed towards uncovered targets, keeping it valid.
+
+        Uncovered targets are tried in random order, outer ones first so that
+        a property added for one target can be changed for the next. Each
+        change is only kept if the sample still validates against the schema,
+        so the result is as valid as the input. At most `STEER_MUTATIONS`
+        changes are made, to keep the sample varied.
+        """
+        uncovered = self.uncovered()
+        self.rng.shuffle(uncovered)
+        uncovered.sort(key=lambda target: len(target.path))
+
+        changes = 0
+        for target in uncovered[: STEER_MUTATIONS * 4]:
+            candidate = self._apply(copy.deepcopy(value), target)
+            if candidate is not None and candidate != value and self._validator.is_valid(candidate):
+                value = candidate
+                changes += 1
+                if changes >= STEER_MUTATIONS:
+                    break
+        return value
+
+    def _apply(self, value: object, target: CoverageTarget) -> object | None:
+        """Change a sample so it exercises a target. Returns None if the target cannot be reached."""
+        # Walk to the parent of the value to change, taking the first item of
+        # arrays and adding values that are missing on the way
+        parent: object = None
+        key: str | int | None = None
+        node = value
+        for i, part in enumerate(target.path):
+            parent = node
+            if part is None:
+                if not isinstance(node, list):
+                    return None
+                if not node:
+                    node.append(self._generate(target.path[: i + 1]))
+                key = 0
+            else:
+                if not isinstance(node, dict):
+                    return None
+                if part not in node:
+                    node[part] = self._generate(target.path[: i + 1])
+                key = part
+            node = node[key]  # type: ignore[index]
+
+        replacement = self._exercising_value(target, node)
+        if replacement is None:
+            return None
+        if parent is None:
+            return replacement
+        parent[key] = replacement  # type: ignore[index]
+        return value
+
+    def _generate(self, path: Path) -> object:
+        """Generate a simple value for a path."""
+        return generate_fallback(_with_definitions(self._subschemas.get(path, {}), self.schema))  # type: ignore[arg-type]
+
+    def _exercising_value(self, target: CoverageTarget, node: object) -> object | None:
+        """Return a value that exercises a target, based on the current value. None if there is none."""
+        kind = target.kind
+        if kind in {"enum", "boolean", "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum"}:
+            value: object = copy.deepcopy(target.payload)
+            return value
+        if kind in {"oneOf", "anyOf"}:
+            return generate_fallback(_with_definitions(target.payload, self.schema))  # type: ignore[arg-type]
+        if kind in {"minLength", "maxLength"}:
+            length: int = target.payload
+            base = node if isinstance(node, str) and node else "a"
+            return (base * (length // len(base) + 1))[:length]
+        if kind in {"minItems", "maxItems"} and isinstance(node, list):
+            length = target.payload
+            if len(node) >= length:
+                return node[:length]
+            items = node or [self._generate((*target.path, None))]
+            return node + [copy.deepcopy(items[i % len(items)]) for i in range(length - len(node))]
+        if kind == "present" and isinstance(node, dict):
+            name, subschema = target.payload
+            return {**node, name: generate_fallback(_with_definitions(subschema, self.schema))}  # type: ignore[arg-type]
+        if kind == "absent" and isinstance(node, dict):
+            return {k: v for k, v in node.items() if k != target.payload}
+        return None
+
+
+class SchemaCoverage:
+    """Coverage of all registered actions, by action name.
+
+    Samples are steered on the sample pool thread, so the registry can be used from any thread.
+    """
+
+    __slots__ = ("_actions", "_lock")
+
+    def __init__(self) -> None:
+        """Initialize SchemaCoverage."""
+        self._lock = threading.Lock()
+        self._actions: dict[str, tuple[bytes, ActionCoverage]] = {}
+
+    def __repr__(self) -> str:
+        """Return representation of this registry."""
+        return f"{self.__class__.__name__}(actions={len(self._actions)})"
+
+    def get(self, name: str, schema: Mapping[str, Any]) -> ActionCoverage:
+        """Return the coverage of an action. Coverage starts over if the schema of the action changed."""
+        key = schema_key(schema)
+        with self._lock:
+            entry = self._actions.get(name)
+            if entry is None or entry[0] != key:
+                entry = key, ActionCoverage(name, schema)
+                self._actions[name] = entry
+            return entry[1]
+
+    def steer(self, schema: Mapping[str, Any], value: object) -> object:
+        """Return a sample for a schema changed towards targets not covered yet, see `ActionCoverage.steer`.
+
+        The coverage of an action with the same schema is used. The sample is
+        returned unchanged if no action has this schema.
+        """
+        key = schema_key(schema)
+        with self._lock:
+            coverage = next((coverage for entry_key, coverage in self._actions.values() if entry_key == key), None)
+        return value if coverage is None else coverage.steer(value)
+
+    def report(self) -> dict[str, str]:
+        """Return the coverage of all actions as human-readable strings, sorted by action name."""
+        with self._lock:
+            return {name: self._actions[name][1].format() for name in sorted(self._actions)}
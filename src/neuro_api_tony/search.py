@@ -0,0 +1,213 @@
+"""Search - Incremental full-text index over log messages."""
+
+from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Final, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+TOKEN_PATTERN: Final = re.compile(r"\w+")
+QUERY_PATTERN: Final = re.compile(r'"([^"]*)"|(\S+)')
+
+_NO_CLIENT: Final = -1
+
+
+def _filter_key(field: str, value: object) -> str:
+    """Return the posting key of a filter value. Cannot collide with tokens, which never contain `:`."""
+    return f"{field}:{value}"
+
+
+class LogRecord(NamedTuple):
+    """A log message that was added to the index."""
+
+    tab: str
+    """The log tab the message was logged to, e.g. `"System"`."""
+    line: int
+    """The line in the tab the message starts at (zero-based)."""
+    text: str
+    """The message text."""
+    client_id: int | None
+    """The client the message belongs to, if any."""
+    level: str | None
+    """The log level of the message, if any, e.g. `"Warning"`."""
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase search tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class LogSearchIndex:
+    """Inverted index over log messages, updated incrementally as messages are logged.
+
+    Queries consist of words and double-quoted phrases, all of which must
+    match. Words match whole tokens case-insensitively, phrases match
+    consecutive tokens. Results can be filtered by tab, client and level.
+    """
+
+    __slots__ = ("_clients", "_levels", "_lines", "_postings", "_tabs", "_texts", "_value_ids", "_values")
+
+    def __init__(self) -> None:
+        """Initialize LogSearchIndex."""
+        self._postings: dict[str, array[int]] = {}
+        self._texts: list[str] = []
+        self._lines = array("Q")
+        self._clients = array("q")
+        self._tabs = array("H")
+        self._levels = array("H")
+        # Interned tab and level names, shared index space
+        self._values: list[str | None] = [None]
+        self._value_ids: dict[str | None, int] = {None: 0}
+
+    def __repr__(self) -> str:
+        """Return representation of this index."""
+        return f"{self.__class__.__name__}(records={len(self)})"
+
+    def __len__(self) -> int:
+        """Return the number of indexed messages."""
+        return len(self._texts)
+
+    def _intern(self, value: str | None) -> int:
+        """Return the id of a tab or level name, assigning one if needed."""
+        value_id = self._value_ids.get(value)
+        if value_id is None:
+            value_id = len(self._values)
+            self._values.append(value)
+            self._value_ids[value] = value_id
+        return value_id
+
+    def add(
+        self,
+        tab: str,
+        line: int,
+        text: str,
+        client_id: int | None = None,
+        level: str | None = None,
+    ) -> int:
+        """Add a log message to the index and return its record id."""
+        record_id = len(self._texts)
+        self._texts.append(text)
+        self._lines.append(line)
+        self._clients.append(_NO_CLIENT if client_id is None else client_id)
+        self._tabs.append(self._intern(tab))
+        self._levels.append(self._intern(level))
+
+        keys = set(tokenize(text))
+        keys.add(_filter_key("tab", tab))
+        if client_id is not None:
+            keys.add(_filter_key("client", client_id))
+        if level is not None:
+            keys.add(_filter_key("level", level))
+
+        postings = self._postings
+        for token in keys:
+            posting = postings.get(token)
+            if posting is None:
+                postings[token] = array("Q", (record_id,))
+            else:
+                posting.append(record_id)
+        return record_id
+
+    def clear(self) -> None:
+        """Remove all messages from the index."""
+        self._postings.clear()
+        self._texts.clear()
+        del self._lines[:], self._clients[:], self._tabs[:], self._levels[:]
+
+    def get(self, record_id: int) -> LogRecord:
+        """Return the record with the given id."""
+        client_id = self._clients[record_id]
+        return LogRecord(
+            self._values[self._tabs[record_id]] or "",
+            self._lines[record_id],
+            self._texts[record_id],
+            None if client_id == _NO_CLIENT else client_id,
+            self._values[self._levels[record_id]],
+        )
+
+    def search(
+        self,
+        query: str,
+        tab: str | None = None,
+        client_id: int | None = None,
+        level: str | None = None,
+        limit: int = 100,
+    ) -> list[LogRecord]:
+        """Search the index.
+
+        Parameters
+        ----------
+        query : str
+            Words and double-quoted phrases that must all occur in the message.
+        tab : str | None
+            Only return messages logged to this tab.
+        client_id : int | None
+            Only return messages belonging to this client.
+        level : str | None
+            Only return messages with this log level.
+        limit : int
+            The maximum number of results.
+
+        Returns
+        -------
+        list[LogRecord]
+            Matching messages, most recent first.
+
+        """
+        words: list[str] = []
+        phrases: list[re.Pattern[str]] = []
+        for phrase, word in QUERY_PATTERN.findall(query):
+            tokens = tokenize(phrase or word)
+            words.extend(tokens)
+            if phrase and len(tokens) > 1:
+                phrases.append(re.compile(r"\b" + r"\W+".join(map(re.escape, tokens)) + r"\b"))
+        if not words:
+            return []
+
+        # Filters are posting lists too, so a rare filter narrows the search just like a rare word
+        keys = set(words)
+        if tab is not None:
+            keys.add(_filter_key("tab", tab))
+        if client_id is not None:
+            keys.add(_filter_key("client", client_id))
+        if level is not None:
+            keys.add(_filter_key("level", level))
+
+        postings: list[array[int]] = []
+        for key in keys:
+            posting = self._postings.get(key)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+
+        results: list[LogRecord] = []
+        for record_id in self._candidates(postings):
+            if phrases:
+                text = self._texts[record_id].lower()
+                if not all(pattern.search(text) for pattern in phrases):
+                    continue
+            results.append(self.get(record_id))
+            if len(results) >= limit:
+                break
+        return results
+
+    @staticmethod
+    def _candidates(postings: list[array[int]]) -> Iterator[int]:
+        """Yield record ids contained in all postings, most recent first.
+
+        Walks the shortest posting list and binary searches the others, so
+        the cost depends on the rarest word, not on the size of the index.
+        """
+        shortest, *others = postings
+        for record_id in reversed(shortest):
+            for posting in others:
+                index = bisect_left(posting, record_id)
+                if index == len(posting) or posting[index] != record_id:
+                    break
+            else:
+                yield record_id
@@ -0,0 +1,283 @@
+"""Stalls - Detecting callbacks that block the GUI thread, which also runs the network I/O of every client."""
+
+from __future__ import annotations
+
+import functools
+import sys
+import threading
+import time
+import traceback
+from typing import TYPE_CHECKING, NamedTuple
+
+import trio
+
+from neuro_api_tony.metrics import metrics
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+LOOP_LAG_INTERVAL = 50
+"""Milliseconds between GUI timer ticks that measure how late the event loop runs timers."""
+
+STALL_SAMPLE_DEPTH = 20
+"""Maximum number of frames in the stack sample of a slow callback."""
+
+
+def callable_name(func: Callable[..., object]) -> str:
+    """Return a readable name for a callback, looking through `functools.partial`."""
+    while isinstance(func, functools.partial):
+        func = func.func
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", None)
+    if name is None:
+        return repr(func)
+    module = getattr(func, "__module__", None)
+    return f"{module}.{name}" if module else name
+
+
+class SlowCallback(NamedTuple):
+    """A callback that blocked the GUI thread for longer than the threshold."""
+
+    name: str
+    duration: float
+    """Seconds the event loop was blocked by the callback."""
+    stack: str | None
+    """Stack of the GUI thread sampled while the callback was blocking, or None if it finished before a sample was taken."""
+
+
+class _Watch:
+    """A callback that is currently running."""
+
+    __slots__ = ("inner_reported", "name", "stack", "started_at")
+
+    def __init__(self, name: str, started_at: float) -> None:
+        self.name = name
+        self.started_at = started_at
+        self.stack: str | None = None
+        self.inner_reported = False
+
+
+class StallDetector:
+    """Reports callbacks that keep the GUI thread from running its event loop for longer than `threshold` seconds.
+
+    Callbacks are marked with `begin` and `end`, and may be nested, e.g. a
+    Trio task step inside a batch of UI updates. Only the innermost slow
+    callback is reported, since the outer ones were only slow because of it.
+    A background thread samples the stack of the GUI thread once a callback
+    has been blocking for longer than the threshold, so the report shows
+    what it was doing.
+
+    While a modal dialog is open, its callback does not return, but the
+    dialog keeps running the event loop. `heartbeat` is called whenever the
+    event loop runs a timer, and only the time since the last heartbeat
+    counts as blocked.
+    """
+
+    __slots__ = (
+        "_alive_at",
+        "_closed",
+        "_lock",
+        "_stack",
+        "_thread",
+        "clock",
+        "on_slow_callback",
+        "slow_callbacks",
+        "thread_id",
+        "threshold",
+    )
+
+    def __init__(
+        self,
+        threshold: float,
+        clock: Callable[[], float] = time.perf_counter,
+        thread_id: int | None = None,
+    ) -> None:
+        """Initialize StallDetector.
+
+        Parameters
+        ----------
+        threshold : float
+            Seconds a callback may block before it is reported, or 0 to report none.
+        clock : Callable[[], float]
+            Function returning the current monotonic time in seconds.
+        thread_id : int | None
+            Identifier of the watched thread, or None for the current thread.
+
+        """
+        self.threshold = threshold
+        self.clock = clock
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self._lock = threading.Lock()
+        self._stack: list[_Watch] = []
+        self._alive_at = clock()
+        self._closed = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self.on_slow_callback: Callable[[SlowCallback], None] = lambda slow_callback: None
+        """Callback that is called on the watched thread after a slow callback returned."""
+
+        self.slow_callbacks = metrics().counter("gui.slow_callbacks")
+
+    def __repr__(self) -> str:
+        """Return representation of this detector."""
+        return f"{self.__class__.__name__}(threshold={self.threshold:g}, depth={len(self._stack)})"
+
+    def begin(self, name: str) -> None:
+        """Mark the start of a callback on the watched thread."""
+        watch = _Watch(name, self.clock())
+        with self._lock:
+            self._stack.append(watch)
+
+    def end(self) -> None:
+        """Mark the end of the callback that was started last, and report it if it was slow."""
+        now = self.clock()
+        with self._lock:
+            watch = self._stack.pop()
+            parent = self._stack[-1] if self._stack else None
+            blocked = now - max(watch.started_at, self._alive_at)
+
+        reported = watch.inner_reported
+        if not reported and 0 < self.threshold < blocked:
+            self.slow_callbacks.inc()
+            self.on_slow_callback(SlowCallback(watch.name, blocked, watch.stack))
+            reported = True
+        if parent is not None and reported:
+            parent.inner_reported = True
+
+    def heartbeat(self) -> None:
+        """Record that the event loop is running. Callbacks that are open now are not blocking it."""
+        self._alive_at = self.clock()
+
+    def sample(self) -> None:
+        """Sample the stack of the watched thread if its innermost callback has been blocking for too long."""
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            if not self._stack:
+                return
+            watch = self._stack[-1]
+            if watch.stack is not None or self.clock() - max(watch.started_at, self._alive_at) <= self.threshold:
+                return
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                watch.stack = "".join(traceback.format_stack(frame, STALL_SAMPLE_DEPTH))
+
+    def _run(self) -> None:
+        """Sample until closed. Runs in the background thread."""
+        while not self._closed.wait(max(self.threshold, 0.1) / 2):
+            self.sample()
+
+    def start(self) -> None:
+        """Start the background thread that samples stacks."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="stall-detector", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the background thread."""
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class SchedulingInstrument(trio.abc.Instrument):
+    """Measures how long Trio tasks wait to run after being woken up, and reports slow task steps.
+
+    Every task step is watched by the `StallDetector`, so a handler that
+    blocks is reported with the name of its task.
+    """
+
+    __slots__ = ("_scheduled_at", "_step_started_at", "clock", "detector", "scheduling_delay", "step_duration")
+
+    def __init__(self, detector: StallDetector, clock: Callable[[], float] = time.perf_counter) -> None:
+        """Initialize SchedulingInstrument.
+
+        Parameters
+        ----------
+        detector : StallDetector
+            The detector that task steps are reported to.
+        clock : Callable[[], float]
+            Function returning the current monotonic time in seconds.
+
+        """
+        self.detector = detector
+        self.clock = clock
+        self._scheduled_at: dict[trio.lowlevel.Task, float] = {}
+        self._step_started_at = 0.0
+        self.scheduling_delay = metrics().histogram("trio.scheduling_delay", "ms")
+        self.step_duration = metrics().histogram("trio.task_step", "ms")
+
+    def __repr__(self) -> str:
+        """Return representation of this instrument."""
+        return f"{self.__class__.__name__}({self.detector!r})"
+
+    def task_scheduled(self, task: trio.lowlevel.Task) -> None:
+        """Remember when a task was woken up."""
+        self._scheduled_at[task] = self.clock()
+
+    def before_task_step(self, task: trio.lowlevel.Task) -> None:
+        """Measure how long the task waited and start watching its step."""
+        now = self.clock()
+        scheduled_at = self._scheduled_at.pop(task, None)
+        if scheduled_at is not None:
+            self.scheduling_delay.observe((now - scheduled_at) * 1000)
+        self._step_started_at = now
+        self.detector.begin(f"Trio task {task.name}")
+
+    def after_task_step(self, task: trio.lowlevel.Task) -> None:
+        """Measure the step and stop watching it."""
+        self.step_duration.observe((self.clock() - self._step_started_at) * 1000)
+        self.detector.end()
+
+    def task_exited(self, task: trio.lowlevel.Task) -> None:
+        """Forget an exited task."""
+        self._scheduled_at.pop(task, None)
+
+
+class LoopLagMonitor:
+    """Measures how late the GUI event loop runs a timer, which is how long it was unable to handle events.
+
+    `tick` is called by a GUI timer every `interval` milliseconds.
+    """
+
+    __slots__ = ("_last_tick", "clock", "detector", "interval", "lag")
+
+    def __init__(
+        self,
+        detector: StallDetector | None = None,
+        interval: int = LOOP_LAG_INTERVAL,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """Initialize LoopLagMonitor.
+
+        Parameters
+        ----------
+        detector : StallDetector | None
+            Detector that is told the event loop is running on every tick.
+        interval : int
+            Milliseconds between ticks.
+        clock : Callable[[], float]
+            Function returning the current monotonic time in seconds.
+
+        """
+        self.detector = detector
+        self.interval = interval
+        self.clock = clock
+        self._last_tick: float | None = None
+        self.lag = metrics().histogram("gui.loop_lag", "ms")
+
+    def __repr__(self) -> str:
+        """Return representation of this monitor."""
+        return f"{self.__class__.__name__}(interval={self.interval})"
+
+    def tick(self) -> None:
+        """Record a timer tick."""
+        now = self.clock()
+        if self._last_tick is not None:
+            self.lag.observe(max(0.0, (now - self._last_tick) * 1000 - self.interval))
+        self._last_tick = now
+        if self.detector is not None:
+            self.detector.heartbeat()
+
+    def reset(self) -> None:
+        """Forget the last tick, e.g. after the timer was stopped."""
+        self._last_tick = None
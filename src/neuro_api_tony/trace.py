@@ -0,0 +1,185 @@
+"""Trace - Recording every websocket message to an append-only JSON lines file."""
+
+from __future__ import annotations
+
+import base64
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import orjson
+
+from neuro_api_tony.constants import VERSION
+from neuro_api_tony.metrics import metrics
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Callable, Iterator
+
+TRACE_FORMAT_VERSION = 1
+"""Version of the trace file format, written to the header line."""
+
+TRACE_FLUSH_INTERVAL = 0.2
+"""Seconds the background writer waits for more records before writing a batch."""
+
+TRACE_BATCH_SIZE = 1000
+"""Number of waiting records that are written right away instead of waiting for the flush interval."""
+
+TRACE_MAX_PENDING = 100_000
+"""Maximum number of records waiting to be written. Further records are dropped until the writer caught up."""
+
+TraceData = bytes | bytearray | memoryview | str
+
+
+def _encode_record(record: tuple[float, int, bool, TraceData]) -> bytes:
+    """Return a record as a JSON line."""
+    timestamp, client_id, inbound, data = record
+    entry: dict[str, Any] = {"t": timestamp, "client": client_id, "dir": "in" if inbound else "out"}
+    if isinstance(data, str):
+        entry["data"] = data
+    else:
+        raw = bytes(data)
+        try:
+            entry["data"] = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["base64"] = base64.b64encode(raw).decode("ascii")
+    return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+
+
+class TraceWriter:
+    """Appends websocket messages to a trace file from a background thread.
+
+    Recording a message only appends it to a list, so it is cheap enough to do
+    for every message. The background thread encodes and writes the records
+    in batches. Each line holds the seconds since the trace started (`t`),
+    the client id, the direction (`in` or `out`) and the message as `data`,
+    or as `base64` if it is not valid UTF-8. The first line is a header with
+    the wall clock time the trace started at.
+
+    If writing fails, the error is reported to `on_error` and further
+    records are dropped.
+    """
+
+    __slots__ = (
+        "_closed",
+        "_condition",
+        "_pending",
+        "_thread",
+        "clock",
+        "dropped",
+        "on_error",
+        "path",
+        "started_at",
+        "written",
+    )
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize TraceWriter and start its background thread.
+
+        Parameters
+        ----------
+        path : str | os.PathLike[str]
+            The trace file. Records are appended if it exists.
+        clock : Callable[[], float]
+            Function returning the current monotonic time in seconds.
+
+        """
+        self.path = Path(path)
+        self.clock = clock
+        self.started_at = clock()
+        self._pending: list[tuple[float, int, bool, TraceData]] = []
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self.on_error: Callable[[Exception], None] = lambda exc: None
+        """Called on the background thread when records could not be written. No records are recorded afterwards."""
+
+        self.written = metrics().counter("trace.written")
+        self.dropped = metrics().counter("trace.dropped")
+
+        header = {"trace": TRACE_FORMAT_VERSION, "version": VERSION, "startedAt": time.time()}
+        with self.path.open("ab") as file:
+            file.write(orjson.dumps(header, option=orjson.OPT_APPEND_NEWLINE))
+
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def __repr__(self) -> str:
+        """Return representation of this writer."""
+        return f"{self.__class__.__name__}({str(self.path)!r}, pending={len(self._pending)})"
+
+    def record(self, client_id: int, inbound: bool, data: TraceData) -> None:
+        """Record a websocket message. Can be called from any thread."""
+        record = (self.clock() - self.started_at, client_id, inbound, data)
+        with self._condition:
+            if self._closed or len(self._pending) >= TRACE_MAX_PENDING:
+                self.dropped.inc()
+                return
+            self._pending.append(record)
+            if len(self._pending) == TRACE_BATCH_SIZE:
+                self._condition.notify()
+
+    def _run(self) -> None:
+        """Write batches of records until closed or writing fails. Runs in the background thread."""
+        try:
+            self._write_batches()
+        except Exception as exc:
+            with self._condition:
+                self._closed = True
+                self.dropped.inc(len(self._pending))
+                self._pending = []
+            self.on_error(exc)
+
+    def _write_batches(self) -> None:
+        """Write batches of records until closed."""
+        with self.path.open("ab") as file:
+            while True:
+                with self._condition:
+                    if not self._closed and len(self._pending) < TRACE_BATCH_SIZE:
+                        self._condition.wait(TRACE_FLUSH_INTERVAL)
+                    batch, self._pending = self._pending, []
+                    closed = self._closed
+
+                if batch:
+                    file.write(b"".join(map(_encode_record, batch)))
+                    file.flush()
+                    self.written.inc(len(batch))
+                if closed:
+                    return
+
+    def close(self) -> None:
+        """Write the remaining records and stop the background thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+
+def read_trace(path: str | os.PathLike[str]) -> Iterator[dict[str, Any]]:
+    """Yield the records of a trace file in order, skipping header lines.
+
+    The message of each record is in `data`, as bytes if it was recorded as base64.
+    Each run of Tony appends a header and restarts `t` and the client ids,
+    so `session` holds the index of the run the record belongs to, from 0.
+    """
+    session = 0
+    seen_header = False
+    with Path(path).open("rb") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            entry = orjson.loads(line)
+            if "trace" in entry:
+                if seen_header:
+                    session += 1
+                seen_header = True
+                continue
+            entry["session"] = session
+            if "base64" in entry:
+                entry["data"] = base64.b64decode(entry.pop("base64"))
+            yield entry
@@ -0,0 +1,227 @@
+"""UI Queue - Batched, coalescing queue of updates for the GUI thread."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, NamedTuple, Protocol
+
+from neuro_api_tony.metrics import metrics
+from neuro_api_tony.stalls import callable_name
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from neuro_api_tony.model import NeuroAction
+    from neuro_api_tony.stalls import StallDetector
+
+
+class UIUpdateTarget(Protocol):
+    """The part of the view that receives queued updates."""
+
+    def add_action(self, action: NeuroAction) -> None:
+        """Add an action to the list."""
+
+    def remove_actions(self, name: str | None = None, client_id: int | None = None) -> None:
+        """Remove actions from the list by name and/or client_id."""
+
+    def on_action_result(self, success: bool, message: str | None) -> None:
+        """Handle an action/result message."""
+
+
+class _AddAction(NamedTuple):
+    action: NeuroAction
+
+
+class _RemoveActions(NamedTuple):
+    name: str | None
+    client_id: int | None
+
+
+class _ActionResult(NamedTuple):
+    success: bool
+    message: str | None
+
+
+class _Call(NamedTuple):
+    func: Callable[[], object]
+
+
+_Update = _AddAction | _RemoveActions | _ActionResult | _Call
+
+
+class UIUpdateQueue:
+    """Queue of pending UI updates that is drained in a single batch on the GUI thread.
+
+    Instead of posting one event per update, the queue posts at most one drain
+    callback at a time using `schedule` (usually `wx.CallAfter`). Everything
+    queued before the drain runs is applied in that batch, in order.
+
+    Redundant updates are coalesced while they are still pending:
+
+    - Removing actions drops pending additions of matching actions.
+    - Repeating the same removal twice in a row only removes once.
+    - Only the most recent pending action result is delivered.
+
+    All public methods are thread-safe, so `call_soon_threadsafe` can be passed
+    to Trio as `run_sync_soon_threadsafe`.
+    """
+
+    __slots__ = (
+        "_lock",
+        "_pending",
+        "_schedule",
+        "_scheduled",
+        "_scheduled_at",
+        "batch_duration",
+        "batches",
+        "coalesced",
+        "delay",
+        "depth",
+        "detector",
+        "target",
+    )
+
+    def __init__(self, schedule: Callable[[Callable[[], None]], object]) -> None:
+        """Initialize UIUpdateQueue.
+
+        Parameters
+        ----------
+        schedule : Callable[[Callable[[], None]], object]
+            A thread-safe function that runs a function on the GUI thread
+            soon, such as `wx.CallAfter`.
+
+        """
+        self._schedule = schedule
+        self._lock = threading.Lock()
+        self._pending: list[_Update | None] = []
+        self._scheduled = False
+        self._scheduled_at = 0.0
+
+        self.target: UIUpdateTarget | None = None
+        """The view that action updates are applied to. Must be set before the first drain."""
+        self.detector: StallDetector | None = None
+        """Detector that every batch and every queued function is reported to, if set."""
+
+        self.depth = metrics().gauge("ui_queue.depth")
+        self.batches = metrics().counter("ui_queue.batches")
+        self.coalesced = metrics().counter("ui_queue.coalesced")
+        self.delay = metrics().histogram("ui_queue.delay", "ms")
+        self.batch_duration = metrics().histogram("ui_queue.batch_duration", "ms")
+
+    def __repr__(self) -> str:
+        """Return representation of this queue."""
+        return f"{self.__class__.__name__}(depth={self.depth.value})"
+
+    def __len__(self) -> int:
+        """Return the number of pending updates."""
+        with self._lock:
+            return sum(update is not None for update in self._pending)
+
+    def _push(self, update: _Update) -> None:
+        """Append an update and schedule a drain if none is scheduled. Must hold the lock."""
+        self._pending.append(update)
+        self.depth.set(self.depth.value + 1)
+        if not self._scheduled:
+            self._scheduled = True
+            self._scheduled_at = time.perf_counter()
+            self._schedule(self._drain)
+
+    def _drop(self, index: int) -> None:
+        """Drop the pending update at `index`. Must hold the lock."""
+        self._pending[index] = None
+        self.depth.set(self.depth.value - 1)
+        self.coalesced.inc()
+
+    def call_soon_threadsafe(self, func: Callable[[], object]) -> None:
+        """Run `func` on the GUI thread as part of the next batch."""
+        with self._lock:
+            self._push(_Call(func))
+
+    def add_action(self, action: NeuroAction) -> None:
+        """Queue adding an action to the action list."""
+        with self._lock:
+            self._push(_AddAction(action))
+
+    def remove_actions(self, name: str | None = None, client_id: int | None = None) -> None:
+        """Queue removing actions from the action list by name and/or client_id."""
+        update = _RemoveActions(name, client_id)
+        with self._lock:
+            for i, pending in enumerate(self._pending):
+                if not isinstance(pending, _AddAction):
+                    continue
+                if (name is None or pending.action.name == name) and (
+                    client_id is None or pending.action.client_id == client_id
+                ):
+                    self._drop(i)
+            last = next((pending for pending in reversed(self._pending) if pending is not None), None)
+            if isinstance(last, _RemoveActions) and last == update:
+                self.coalesced.inc()
+                return
+            self._push(update)
+
+    def action_result(self, success: bool, message: str | None) -> None:
+        """Queue handling an action result."""
+        with self._lock:
+            for i, pending in enumerate(self._pending):
+                if isinstance(pending, _ActionResult):
+                    self._drop(i)
+            self._push(_ActionResult(success, message))
+
+    def _drain(self) -> None:
+        """Apply all pending updates. Runs on the GUI thread."""
+        started_at = time.perf_counter()
+        with self._lock:
+            batch = self._pending
+            self._pending = []
+            self._scheduled = False
+            self.depth.set(0)
+            self.delay.observe((started_at - self._scheduled_at) * 1000)
+        self.batches.inc()
+
+        if self.detector is not None:
+            self.detector.begin("UI update batch")
+        try:
+            self._apply_batch(batch)
+        finally:
+            if self.detector is not None:
+                self.detector.end()
+            self.batch_duration.observe((time.perf_counter() - started_at) * 1000)
+
+    def _apply_batch(self, batch: list[_Update | None]) -> None:
+        """Apply a batch of updates, requeueing the rest if one raises."""
+        for i, update in enumerate(batch):
+            try:
+                self._apply(update)
+            except BaseException:
+                # Do not lose the rest of the batch, put it back in front
+                with self._lock:
+                    rest = [pending for pending in batch[i + 1 :] if pending is not None]
+                    self._pending[:0] = rest
+                    self.depth.set(self.depth.value + len(rest))
+                    if self._pending and not self._scheduled:
+                        self._scheduled = True
+                        self._schedule(self._drain)
+                raise
+
+    def _apply(self, update: _Update | None) -> None:
+        """Apply a single update."""
+        if update is None:
+            return
+        if isinstance(update, _Call):
+            if self.detector is None:
+                update.func()
+                return
+            self.detector.begin(callable_name(update.func))
+            try:
+                update.func()
+            finally:
+                self.detector.end()
+            return
+        assert self.target is not None, "UIUpdateQueue.target must be set before updates are applied"
+        if isinstance(update, _AddAction):
+            self.target.add_action(update.action)
+        elif isinstance(update, _RemoveActions):
+            self.target.remove_actions(name=update.name, client_id=update.client_id)
+        else:
+            self.target.on_action_result(update.success, update.message)
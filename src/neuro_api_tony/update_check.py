@@ -0,0 +1,119 @@
+"""Update check - Looking up the latest version on PyPI, cached on disk."""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import TYPE_CHECKING
+
+from neuro_api_tony.config import get_tony_application_config_folder
+from neuro_api_tony.constants import PACKAGE_NAME, PYPI_API_URL, VERSION
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+UPDATE_CHECK_TTL = 24 * 60 * 60
+"""Seconds the latest version found on PyPI is cached for."""
+
+UPDATE_CHECK_TIMEOUT = 10
+"""Seconds to wait for PyPI to respond."""
+
+UPDATE_CACHE_FILE_NAME = "update-check.json"
+"""Name of the file in the Tony config folder the latest version is cached in."""
+
+
+def get_update_cache_path() -> Path:
+    """Return the path of the file the latest version is cached in."""
+    return get_tony_application_config_folder() / UPDATE_CACHE_FILE_NAME
+
+
+def read_cached_version(path: Path, now: float, ttl: float = UPDATE_CHECK_TTL) -> str | None:
+    """Return the cached latest version, or None if there is none or it is older than `ttl` seconds."""
+    try:
+        cache = json.loads(path.read_text(encoding="utf-8"))
+        checked_at = float(cache["checkedAt"])
+        version = str(cache["latestVersion"])
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+    # A timestamp in the future means the clock was changed, don't trust it
+    if not 0 <= now - checked_at < ttl:
+        return None
+    return version
+
+
+def write_cached_version(path: Path, version: str, now: float) -> None:
+    """Cache the latest version. Failing to write the cache is not an error."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"checkedAt": now, "latestVersion": version}), encoding="utf-8")
+    except OSError:
+        pass
+
+
+def fetch_latest_version() -> str:
+    """Return the latest version of Tony on PyPI."""
+    # Imported here since requests takes a while to import and is only needed in the background
+    import requests
+
+    response = requests.get(PYPI_API_URL, timeout=UPDATE_CHECK_TIMEOUT)
+    response.raise_for_status()
+    return str(response.json()["info"]["version"])
+
+
+def update_message(latest_version: str) -> str | None:
+    """Return the message telling the user about an update, or None if this is the latest version."""
+    import semver
+
+    if semver.Version.parse(latest_version).compare(VERSION) <= 0:
+        return None
+    return (
+        f"An update is available. ({VERSION} -> {latest_version})\n"
+        f"Depending on your installation method, pull the latest changes from GitHub or "
+        f'run "pip install --upgrade {PACKAGE_NAME}" to update.'
+    )
+
+
+def check_for_updates(
+    cache_path: Path | None = None,
+    fetch: Callable[[], str] = fetch_latest_version,
+    clock: Callable[[], float] = time.time,
+) -> str | None:
+    """Check whether an update is available, using the cached latest version if it is recent enough.
+
+    This blocks while PyPI is queried, so it should be called in the background.
+
+    Parameters
+    ----------
+    cache_path : Path | None
+        The file the latest version is cached in, or None for the default.
+    fetch : Callable[[], str]
+        Function returning the latest version from PyPI.
+    clock : Callable[[], float]
+        Function returning the current wall clock time in seconds.
+
+    Returns
+    -------
+    str | None
+        A message to show to the user, or None if there is nothing to report.
+
+    """
+    if cache_path is None:
+        cache_path = get_update_cache_path()
+    now = clock()
+
+    latest_version = read_cached_version(cache_path, now)
+    if latest_version is None:
+        try:
+            latest_version = fetch()
+        except OSError:
+            # Includes requests' connection errors and timeouts
+            return "Failed to check for updates. Please check your internet connection."
+        except Exception as exc:
+            return f"An error occurred while checking for updates:\n{exc}"
+        write_cached_version(cache_path, latest_version, now)
+
+    try:
+        return update_message(latest_version)
+    except ValueError as exc:
+        return f"An error occurred while checking for updates:\n{exc}"
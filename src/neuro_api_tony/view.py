@@ -2,19 +2,17 @@
 
 from __future__ import annotations
 
+import itertools
 import json
 import os
 import sys
 from datetime import datetime as dt
 from pathlib import Path
-from typing import TYPE_CHECKING, Literal, TypedDict
+from typing import TYPE_CHECKING
 
-import json_source_map as jsm
-import jsonschema
+import orjson
 import wx
 import wx.adv
-import wx.stc
-from jsf import JSF
 
 from neuro_api_tony.config import (
     FILE_NAMES as CONFIG_FILE_NAMES,
@@ -23,22 +21,26 @@ from neuro_api_tony.config import (
     ShowOriginAs,
     WarningID,
     config,
-    default_config,
+    config_snapshot,
     get_config_file_path,
     get_editor_theme_color,
-    get_log_theme_color,
+    get_log_theme_attr,
     is_dark_mode,
+    is_warning_enabled,
 )
 from neuro_api_tony.constants import GIT_REPO_URL, GITHUB_RAW_URL, VERSION
+from neuro_api_tony.metrics import metrics
+from neuro_api_tony.samples import sample_generator
 
 if TYPE_CHECKING:
     from collections.abc import Callable
 
     from neuro_api.command import ForcePriority
-    from neuro_api.json_schema_types import CoreSchemaMetaSchema
-    from typing_extensions import NotRequired
+    from wx import stc
 
+    from neuro_api_tony.api import LogMessage
     from neuro_api_tony.model import NeuroAction, TonyModel
+    from neuro_api_tony.search import LogRecord
 
 
 # region Events
@@ -105,6 +107,15 @@ LOG_LEVELS = {
     "SYSTEM": 60,
 }
 
+STATE_TEXT_MAX_LENGTH = 2000
+"""States up to this length are shown in a label, longer ones in a text box."""
+STATE_PREVIEW_MAX_LENGTH = 20_000
+"""States longer than this are truncated in the text box. The tree view shows the full state."""
+JSON_TREE_STRING_MAX_LENGTH = 200
+"""Strings longer than this are truncated in the JSON tree view."""
+JSON_TREE_MAX_CHILDREN = 500
+"""The maximum number of children shown for an object or array in the JSON tree view."""
+
 LATENCY_TOOLTIP = (
     "Latency in milliseconds to add to each outgoing command."
     " Must be non-negative and not exceed 10000 ms."
@@ -149,6 +160,8 @@ class TonyView:
         self.on_send_shutdown_graceful: Callable[[int | None], None] = lambda client_id: None
         self.on_send_shutdown_graceful_cancel: Callable[[int | None], None] = lambda client_id: None
         self.on_send_shutdown_immediate: Callable[[int | None], None] = lambda client_id: None
+        self.on_start_driver: Callable[[int | None], None] = lambda client_id: None
+        self.on_stop_driver: Callable[[], None] = lambda: None
 
         self.get_clients: Callable[[], list[tuple[int, str | None]]] = list
         # fmt: on
@@ -174,76 +187,77 @@ class TonyView:
         """Log a command."""
         game = next((g for cid, g in self.get_clients() if cid == client_id), None)
         tag = f"{game} --> Tony" if incoming else f"{game} <-- Tony"
-        color = (
-            get_log_theme_color(LogThemeColor.INCOMING) if incoming else get_log_theme_color(LogThemeColor.OUTGOING)
-        )
+        color = LogThemeColor.INCOMING if incoming else LogThemeColor.OUTGOING
 
         if addition is None:
-            self.add_export_log(command, tag, "Commands")
+            self.add_export_log(command, tag, "Commands", client_id)
             self.frame.panel.log_notebook.command_log_panel.log(command, tag, color)
         else:
-            self.add_export_log(f"{command}: {addition}", tag, "Commands")
+            self.add_export_log(f"{command}: {addition}", tag, "Commands", client_id)
             self.frame.panel.log_notebook.command_log_panel.log(
                 [
-                    (command + ": ", get_log_theme_color(LogThemeColor.DEFAULT)),
-                    (addition, get_log_theme_color(LogThemeColor.COMMAND_ADDITION)),
+                    (command + ": ", LogThemeColor.DEFAULT),
+                    (addition, LogThemeColor.COMMAND_ADDITION),
                 ],
                 tag,
                 color,
             )
 
-    def log_debug(self, message: str) -> None:
+    def log_debug(self, message: LogMessage) -> None:
         """Log a debug message."""
         if self.controls.get_log_level() <= LOG_LEVELS["DEBUG"]:
-            self.add_export_log(message, "Debug", "System")
+            message = _resolve_log_message(message)
+            self.add_export_log(message, "Debug", "System", level="Debug")
             self.frame.panel.log_notebook.system_log_panel.log(
                 message,
                 "Debug",
-                get_log_theme_color(LogThemeColor.DEBUG),
+                LogThemeColor.DEBUG,
             )
 
-    def log_info(self, message: str) -> None:
+    def log_info(self, message: LogMessage) -> None:
         """Log an informational message."""
         if self.controls.get_log_level() <= LOG_LEVELS["INFO"]:
-            self.add_export_log(message, "Info", "System")
+            message = _resolve_log_message(message)
+            self.add_export_log(message, "Info", "System", level="Info")
             self.frame.panel.log_notebook.system_log_panel.log(
                 message,
                 "Info",
-                get_log_theme_color(LogThemeColor.INFO),
+                LogThemeColor.INFO,
             )
 
-    def log_warning(self, warning_id: WarningID, message: str) -> None:
+    def log_warning(self, warning_id: WarningID, message: LogMessage) -> None:
         """Log a warning message."""
-        warning_configured = config().warnings.get(warning_id, default_config().warnings.get(warning_id, True))
-
-        if self.controls.get_log_level() <= LOG_LEVELS["WARNING"] and warning_configured:
-            self.add_export_log(message, "Warning", "System")
+        if self.controls.get_log_level() <= LOG_LEVELS["WARNING"] and is_warning_enabled(warning_id):
+            message = _resolve_log_message(message)
+            self.add_export_log(message, "Warning", "System", level="Warning")
             self.frame.panel.log_notebook.system_log_panel.log(
                 message,
                 "Warning",
-                get_log_theme_color(LogThemeColor.WARNING),
+                LogThemeColor.WARNING,
             )
             self.frame.panel.log_notebook.highlight(LOG_LEVELS["WARNING"])
 
-    def log_error(self, message: str) -> None:
+    def log_error(self, message: LogMessage) -> None:
         """Log an error message."""
         if self.controls.get_log_level() <= LOG_LEVELS["ERROR"]:
-            self.add_export_log(message, "Error", "System")
+            message = _resolve_log_message(message)
+            self.add_export_log(message, "Error", "System", level="Error")
             self.frame.panel.log_notebook.system_log_panel.log(
                 message,
                 "Error",
-                get_log_theme_color(LogThemeColor.ERROR),
+                LogThemeColor.ERROR,
             )
             self.frame.panel.log_notebook.highlight(LOG_LEVELS["ERROR"])
 
-    def log_critical(self, message: str) -> None:
+    def log_critical(self, message: LogMessage) -> None:
         """Log a critical error message."""
         if self.controls.get_log_level() <= LOG_LEVELS["CRITICAL"]:
-            self.add_export_log(message, "Critical", "System")
+            message = _resolve_log_message(message)
+            self.add_export_log(message, "Critical", "System", level="Critical")
             self.frame.panel.log_notebook.system_log_panel.log(
                 message,
                 "Critical",
-                get_log_theme_color(LogThemeColor.CRITICAL),
+                LogThemeColor.CRITICAL,
             )
             self.frame.panel.log_notebook.highlight(LOG_LEVELS["CRITICAL"])
 
@@ -252,18 +266,19 @@ class TonyView:
         tags = []
         colors = []
 
-        if config().show_origin_as == ShowOriginAs.CLIENT_ID:
+        show_origin_as = config_snapshot().show_origin_as
+        if show_origin_as == ShowOriginAs.CLIENT_ID:
             tags.append(f"{client_id}")
-            colors.append(get_log_theme_color(LogThemeColor.CONTEXT_ORIGIN))
-        elif config().show_origin_as == ShowOriginAs.GAME_NAME:
+            colors.append(LogThemeColor.CONTEXT_ORIGIN)
+        elif show_origin_as == ShowOriginAs.GAME_NAME:
             tags.append(self._get_client_game(client_id))
-            colors.append(get_log_theme_color(LogThemeColor.CONTEXT_ORIGIN))
+            colors.append(LogThemeColor.CONTEXT_ORIGIN)
 
         if silent:
             tags.append("silent")
-            colors.append(get_log_theme_color(LogThemeColor.CONTEXT_SILENT))
+            colors.append(LogThemeColor.CONTEXT_SILENT)
 
-        self.add_export_log(message, tags, "Context")
+        self.add_export_log(message, tags, "Context", client_id)
         self.frame.panel.log_notebook.context_log_panel.log(
             message,
             tags,
@@ -272,20 +287,21 @@ class TonyView:
 
     def log_description(self, message: str, client_id: int) -> None:
         """Log an action description."""
-        if not config().log_action_descriptions:
+        if not config_snapshot().log_action_descriptions:
             return
 
         tags = ["Action"]
-        colors = [get_log_theme_color(LogThemeColor.CONTEXT_ACTION)]
+        colors = [LogThemeColor.CONTEXT_ACTION]
 
-        if config().show_origin_as == ShowOriginAs.CLIENT_ID:
+        show_origin_as = config_snapshot().show_origin_as
+        if show_origin_as == ShowOriginAs.CLIENT_ID:
             tags.insert(0, f"{client_id}")
-            colors.insert(0, get_log_theme_color(LogThemeColor.CONTEXT_ORIGIN))
-        elif config().show_origin_as == ShowOriginAs.GAME_NAME:
+            colors.insert(0, LogThemeColor.CONTEXT_ORIGIN)
+        elif show_origin_as == ShowOriginAs.GAME_NAME:
             tags.insert(0, self._get_client_game(client_id))
-            colors.insert(0, get_log_theme_color(LogThemeColor.CONTEXT_ORIGIN))
+            colors.insert(0, LogThemeColor.CONTEXT_ORIGIN)
 
-        self.add_export_log(message, tags, "Context")
+        self.add_export_log(message, tags, "Context", client_id)
         self.frame.panel.log_notebook.context_log_panel.log(
             message,
             tags,
@@ -295,19 +311,20 @@ class TonyView:
     def log_query(self, message: str, client_id: int, ephemeral: bool = False) -> None:
         """Log an actions/force query."""
         tags = ["Query"]
-        colors = [get_log_theme_color(LogThemeColor.CONTEXT_QUERY)]
+        colors = [LogThemeColor.CONTEXT_QUERY]
 
         if ephemeral:
             tags.append("Ephemeral")
-            colors.append(get_log_theme_color(LogThemeColor.CONTEXT_EPHEMERAL))
-        if config().show_origin_as == ShowOriginAs.CLIENT_ID:
+            colors.append(LogThemeColor.CONTEXT_EPHEMERAL)
+        show_origin_as = config_snapshot().show_origin_as
+        if show_origin_as == ShowOriginAs.CLIENT_ID:
             tags.insert(0, f"{client_id}")
-            colors.insert(0, get_log_theme_color(LogThemeColor.CONTEXT_ORIGIN))
-        elif config().show_origin_as == ShowOriginAs.GAME_NAME:
+            colors.insert(0, LogThemeColor.CONTEXT_ORIGIN)
+        elif show_origin_as == ShowOriginAs.GAME_NAME:
             tags.insert(0, self._get_client_game(client_id))
-            colors.insert(0, get_log_theme_color(LogThemeColor.CONTEXT_ORIGIN))
+            colors.insert(0, LogThemeColor.CONTEXT_ORIGIN)
 
-        self.add_export_log(message, tags, "Context")
+        self.add_export_log(message, tags, "Context", client_id)
         self.frame.panel.log_notebook.context_log_panel.log(
             message,
             tags,
@@ -317,19 +334,20 @@ class TonyView:
     def log_state(self, message: str, client_id: int, ephemeral: bool = False) -> None:
         """Log an actions/force state."""
         tags = ["State"]
-        colors = [get_log_theme_color(LogThemeColor.CONTEXT_STATE)]
+        colors = [LogThemeColor.CONTEXT_STATE]
 
-        if config().show_origin_as == ShowOriginAs.CLIENT_ID:
+        show_origin_as = config_snapshot().show_origin_as
+        if show_origin_as == ShowOriginAs.CLIENT_ID:
             tags.insert(0, f"{client_id}")
-            colors.insert(0, get_log_theme_color(LogThemeColor.CONTEXT_ORIGIN))
-        elif config().show_origin_as == ShowOriginAs.GAME_NAME:
+            colors.insert(0, LogThemeColor.CONTEXT_ORIGIN)
+        elif show_origin_as == ShowOriginAs.GAME_NAME:
             tags.insert(0, self._get_client_game(client_id))
-            colors.insert(0, get_log_theme_color(LogThemeColor.CONTEXT_ORIGIN))
+            colors.insert(0, LogThemeColor.CONTEXT_ORIGIN)
 
         if ephemeral:
             tags.append("Ephemeral")
-            colors.append(get_log_theme_color(LogThemeColor.CONTEXT_EPHEMERAL))
-        self.add_export_log(message, tags, "Context")
+            colors.append(LogThemeColor.CONTEXT_EPHEMERAL)
+        self.add_export_log(message, tags, "Context", client_id)
         self.frame.panel.log_notebook.context_log_panel.log(
             message,
             tags,
@@ -340,19 +358,18 @@ class TonyView:
         """Log an action result message."""
         tags = ["Result"]
         colors = [
-            get_log_theme_color(LogThemeColor.CONTEXT_ACTION_RESULT_SUCCESS)
-            if success
-            else get_log_theme_color(LogThemeColor.CONTEXT_ACTION_RESULT_FAILURE),
+            LogThemeColor.CONTEXT_ACTION_RESULT_SUCCESS if success else LogThemeColor.CONTEXT_ACTION_RESULT_FAILURE,
         ]
 
-        if config().show_origin_as == ShowOriginAs.CLIENT_ID:
+        show_origin_as = config_snapshot().show_origin_as
+        if show_origin_as == ShowOriginAs.CLIENT_ID:
             tags.insert(0, f"{client_id}")
-            colors.insert(0, get_log_theme_color(LogThemeColor.CONTEXT_ORIGIN))
-        elif config().show_origin_as == ShowOriginAs.GAME_NAME:
+            colors.insert(0, LogThemeColor.CONTEXT_ORIGIN)
+        elif show_origin_as == ShowOriginAs.GAME_NAME:
             tags.insert(0, self._get_client_game(client_id))
-            colors.insert(0, get_log_theme_color(LogThemeColor.CONTEXT_ORIGIN))
+            colors.insert(0, LogThemeColor.CONTEXT_ORIGIN)
 
-        self.add_export_log(message, tags, "Context")
+        self.add_export_log(message, tags, "Context", client_id)
         self.frame.panel.log_notebook.context_log_panel.log(
             message,
             tags,
@@ -365,29 +382,44 @@ class TonyView:
         if f"(ID: {client_id})" not in game:
             game = f"{game} (ID: {client_id})"
         tag = f"{game} --> Tony" if incoming else f"{game} <-- Tony"
-        color = (
-            get_log_theme_color(LogThemeColor.INCOMING) if incoming else get_log_theme_color(LogThemeColor.OUTGOING)
-        )
+        color = LogThemeColor.INCOMING if incoming else LogThemeColor.OUTGOING
 
-        self.add_export_log(message, tag, "Raw")
+        self.add_export_log(message, tag, "Raw", client_id)
         self.frame.panel.log_notebook.raw_log_panel.log(message, tag, color)
 
     def clear_logs(self) -> None:
         """Clear all logs."""
-        self.frame.panel.log_notebook.system_log_panel.text.Clear()
-        self.frame.panel.log_notebook.command_log_panel.text.Clear()
-        self.frame.panel.log_notebook.context_log_panel.text.Clear()
-        self.frame.panel.log_notebook.raw_log_panel.text.Clear()
+        for panel in self.frame.panel.log_notebook.panels.values():
+            panel.clear()
         self.model.clear_logs()
 
-    def add_export_log(self, message: str, tags: str | list[str] | None, export_tag: str) -> None:
-        """Add a log message to the export log."""
+    def restyle_logs(self) -> None:
+        """Redraw all logs in the colors of the current log theme."""
+        for panel in self.frame.panel.log_notebook.panels.values():
+            panel.restyle()
+
+    def add_export_log(
+        self,
+        message: str,
+        tags: str | list[str] | None,
+        export_tag: str,
+        client_id: int | None = None,
+        level: str | None = None,
+    ) -> None:
+        """Add a log message to the export log and the search index.
+
+        Must be called before the message is logged to its panel, so the
+        indexed line is the one the message will start at.
+        """
         if isinstance(tags, str):
             tags = [tags]
         tags = [dt.now().strftime("%X")] + (tags or [])
 
         self.model.add_log(export_tag, f"{' '.join(f'[{tag}]' for tag in tags)} {message}")
 
+        panel = self.frame.panel.log_notebook.panels[export_tag]
+        self.model.log_index.add(export_tag, panel.line_count, message, client_id, level)
+
     def show_action_dialog(self, action: NeuroAction) -> str | None:
         """Show a dialog for an action. Returns the JSON string the user entered if "Send" was clicked, otherwise None."""
         self.action_dialog = ActionDialog(
@@ -448,6 +480,10 @@ class TonyView:
         """Disable executing actions."""
         self.frame.panel.action_list.enable_actions(False)
 
+    def set_driver_running(self, running: bool) -> None:
+        """Update the control panel to show whether the action driver is running."""
+        self.frame.panel.control_panel.set_driver_running(running)
+
     def force_actions(
         self,
         state: str,
@@ -456,8 +492,8 @@ class TonyView:
         actions: list[NeuroAction],
         priority: ForcePriority,
         retry: bool = False,
-    ) -> None:
-        """Show a dialog for forcing actions."""
+    ) -> bool:
+        """Show a dialog for forcing actions. Returns True if an action was sent."""
         actions_force_dialog = ActionsForceDialog(
             self.frame,
             self,
@@ -474,6 +510,8 @@ class TonyView:
         # Executing the action has already been handled by the dialog
         if result != wx.ID_OK:
             self.log_info("Manually ignored forced action.")
+            return False
+        return True
 
     def clear_actions(self) -> None:
         """Clear the list of actions."""
@@ -690,7 +728,7 @@ class ActionList(wx.Panel):  # type: ignore[misc]
 
         if sent:
             self.GetEventHandler().ProcessEvent(ExecuteEvent(self.GetId(), action))
-        top.view.log_debug(f"Sent: {sent}")
+        top.view.log_debug(lambda: f"Sent: {sent}")
 
     def on_delete(self, event: wx.CommandEvent) -> None:
         """Handle delete command event."""
@@ -779,6 +817,7 @@ class LogNotebook(wx.Panel):  # type: ignore[misc]
         self.maximize_button = wx.Button(button_panel, label="Maximize")
         self.clear_button = wx.Button(button_panel, label="Clear")
         self.export_button = wx.Button(button_panel, label="Export")
+        self.search_button = wx.Button(button_panel, label="Search")
         self.restore_button.Hide()
 
         self.notebook.AddPage(self.system_log_panel, "System")
@@ -786,11 +825,18 @@ class LogNotebook(wx.Panel):  # type: ignore[misc]
         self.notebook.AddPage(self.context_log_panel, "Context")
         self.notebook.AddPage(self.raw_log_panel, "Raw")
 
+        self.panels: dict[str, LogPanel] = {
+            self.notebook.GetPageText(i): self.notebook.GetPage(i) for i in range(self.notebook.GetPageCount())
+        }
+        """Log panels by tab name."""
+        self.search_dialog: LogSearchDialog | None = None
+
         button_panel_sizer = wx.BoxSizer(wx.HORIZONTAL)
         button_panel_sizer.Add(self.restore_button, 1, wx.EXPAND | wx.ALL, 2)
         button_panel_sizer.Add(self.maximize_button, 1, wx.EXPAND | wx.ALL, 2)
         button_panel_sizer.Add(self.clear_button, 1, wx.EXPAND | wx.ALL, 2)
         button_panel_sizer.Add(self.export_button, 1, wx.EXPAND | wx.ALL, 2)
+        button_panel_sizer.Add(self.search_button, 1, wx.EXPAND | wx.ALL, 2)
         button_panel.SetSizer(button_panel_sizer)
 
         # Create sizer
@@ -810,6 +856,7 @@ class LogNotebook(wx.Panel):  # type: ignore[misc]
         self.Bind(wx.EVT_BUTTON, self.on_maximize, self.maximize_button)
         self.Bind(wx.EVT_BUTTON, self.on_clear, self.clear_button)
         self.Bind(wx.EVT_BUTTON, self.on_export, self.export_button)
+        self.Bind(wx.EVT_BUTTON, self.on_search, self.search_button)
 
         self.Bind(wx.EVT_NOTEBOOK_PAGE_CHANGED, self.on_page_changed, self.notebook)
 
@@ -818,6 +865,7 @@ class LogNotebook(wx.Panel):  # type: ignore[misc]
         self.maximize_button.SetToolTip("Maximize the log panel to fill the entire window.")
         self.clear_button.SetToolTip("Clear all logs. Exported logs will also be cleared.")
         self.export_button.SetToolTip("Export logs to a file.")
+        self.search_button.SetToolTip("Search all logs.")
 
     def highlight(self, level: int) -> None:
         """Highlight the log panel with a color."""
@@ -901,6 +949,32 @@ class LogNotebook(wx.Panel):  # type: ignore[misc]
         assert isinstance(top, MainFrame)
         top.panel.maximize_log()
 
+    def on_search(self, event: wx.CommandEvent) -> None:
+        """Handle search command event."""
+        event.Skip()
+
+        if self.search_dialog is None:
+            top = self.GetTopLevelParent()
+            assert isinstance(top, MainFrame)
+            self.search_dialog = LogSearchDialog(top, top.view)
+            self.search_dialog.Bind(wx.EVT_WINDOW_DESTROY, self.on_search_dialog_destroyed)
+        self.search_dialog.Show()
+        self.search_dialog.Raise()
+        self.search_dialog.search_ctrl.SetFocus()
+
+    def on_search_dialog_destroyed(self, event: wx.WindowDestroyEvent) -> None:
+        """Handle search dialog destroyed event."""
+        event.Skip()
+
+        if event.GetEventObject() is self.search_dialog:
+            self.search_dialog = None
+
+    def show_line(self, tab: str, line: int) -> None:
+        """Switch to a log tab and select a line in it."""
+        panel = self.panels[tab]
+        self.notebook.SetSelection(self.notebook.FindPage(panel))
+        panel.select_line(line)
+
 
 class LogPanel(wx.Panel):  # type: ignore[misc]
     """The panel for logging messages."""
@@ -918,17 +992,54 @@ class LogPanel(wx.Panel):  # type: ignore[misc]
         self.sizer.Add(self.text, 1, wx.EXPAND)
         self.SetSizer(self.sizer)
 
+        self.line_count = 0
+        """The number of lines logged so far, i.e. the line the next message starts at."""
+        self.spans: list[tuple[int, int, LogThemeColor]] = []
+        """Ranges of the text and the theme color they are drawn in, to redraw them when the log theme changes."""
+
+    def clear(self) -> None:
+        """Clear the log."""
+        self.text.Clear()
+        self.line_count = 0
+        self.spans.clear()
+
+    def restyle(self) -> None:
+        """Redraw the logged text in the colors of the current log theme."""
+        self.text.Freeze()
+        try:
+            for start, end, color in self.spans:
+                self.text.SetStyle(start, end, get_log_theme_attr(color))
+        finally:
+            self.text.Thaw()
+
+    def _append(self, text: str, color: LogThemeColor) -> None:
+        """Append text in a theme color."""
+        start = self.text.GetLastPosition()
+        self.text.SetDefaultStyle(get_log_theme_attr(color))
+        self.text.AppendText(text)
+        self.spans.append((start, self.text.GetLastPosition(), color))
+
+    def select_line(self, line: int) -> None:
+        """Select a line and scroll it into view."""
+        start = self.text.XYToPosition(0, line)
+        if start == -1:
+            return
+        end = start + self.text.GetLineLength(line)
+        self.text.SetFocus()
+        self.text.SetSelection(start, end)
+        self.text.ShowPosition(start)
+
     def log(
         self,
-        message: str | list[tuple[str, wx.Colour]],
+        message: str | list[tuple[str, LogThemeColor]],
         tags: str | list[str] | None = None,
-        tag_colors: wx.Colour | list[wx.Colour] | None = None,
+        tag_colors: LogThemeColor | list[LogThemeColor] | None = None,
     ) -> None:
         """Log a message with optional tags and colors."""
         # Convert single tags and colors to lists
         if isinstance(tags, str):
             tags = [tags]
-        if isinstance(tag_colors, wx.Colour):
+        if isinstance(tag_colors, LogThemeColor):
             tag_colors = [tag_colors]
 
         # Convert None to empty lists
@@ -936,28 +1047,30 @@ class LogPanel(wx.Panel):  # type: ignore[misc]
         tag_colors = tag_colors or []
 
         # Add default color for tags without color
-        tag_colors += [get_log_theme_color(LogThemeColor.DEFAULT)] * (len(tags) - len(tag_colors))
+        tag_colors += [LogThemeColor.DEFAULT] * (len(tags) - len(tag_colors))
+
+        self.line_count += sum(tag.count("\n") for tag in tags) + 1
+        if isinstance(message, str):
+            self.line_count += message.count("\n")
+        else:
+            self.line_count += sum(msg.count("\n") for msg, _ in message)
 
         # Log timestamp
         top = self.GetTopLevelParent()
         assert isinstance(top, MainFrame)
         fmt = "%H:%M:%S.%f" if top.view.controls.microsecond_precision else "%H:%M:%S"
-        self.text.SetDefaultStyle(wx.TextAttr(get_log_theme_color(LogThemeColor.TIMESTAMP)))
-        self.text.AppendText(f"[{dt.now().strftime(fmt)}] ")
+        self._append(f"[{dt.now().strftime(fmt)}] ", LogThemeColor.TIMESTAMP)
 
         # Log tags
         for tag, tag_color in zip(tags, tag_colors, strict=True):
-            self.text.SetDefaultStyle(wx.TextAttr(tag_color))
-            self.text.AppendText(f"[{tag}] ")
+            self._append(f"[{tag}] ", tag_color)
 
         # Log message
         if isinstance(message, str):
-            self.text.SetDefaultStyle(wx.TextAttr(get_log_theme_color(LogThemeColor.DEFAULT)))
-            self.text.AppendText(f"{message}\n")
+            self._append(f"{message}\n", LogThemeColor.DEFAULT)
         else:
             for msg, color in message:
-                self.text.SetDefaultStyle(wx.TextAttr(color))
-                self.text.AppendText(f"{msg}")
+                self._append(msg, color)
             self.text.AppendText("\n")
 
 
@@ -975,9 +1088,11 @@ class ControlPanel(wx.Panel):  # type: ignore[misc]
         # Create controls
 
         self.config_button = wx.Button(self, label="Configure Tony")
+        self.statistics_button = wx.Button(self, label="Statistics")
         self.ignore_actions_force_checkbox = wx.CheckBox(self, label="Ignore forced actions")
         self.auto_send_checkbox = wx.CheckBox(self, label="Auto-answer")
         self.microsecond_precision_checkbox = wx.CheckBox(self, label="Log microseconds")
+        self.fuzz_checkbox = wx.CheckBox(self, label="Fuzz invalid data")
 
         latency_panel = wx.Panel(self)
         latency_text1 = wx.StaticText(latency_panel, label="L*tency:")
@@ -1001,6 +1116,8 @@ class ControlPanel(wx.Panel):  # type: ignore[misc]
         self.send_shutdown_graceful_button = wx.Button(button_panel, label="Graceful shutdown")
         self.send_shutdown_graceful_cancel_button = wx.Button(button_panel, label="Cancel shutdown")
         self.send_shutdown_immediate_button = wx.Button(button_panel, label="Immediate shutdown")
+        self.driver_button = wx.Button(button_panel, label="Start driver")
+        self.driver_running = False
 
         # Create sizers
 
@@ -1020,6 +1137,7 @@ class ControlPanel(wx.Panel):  # type: ignore[misc]
         button_panel_sizer.Add(self.send_shutdown_graceful_button, (1, 0), (1, 1), wx.EXPAND | wx.ALL, 2)
         button_panel_sizer.Add(self.send_shutdown_graceful_cancel_button, (0, 1), (1, 1), wx.EXPAND | wx.ALL, 2)
         button_panel_sizer.Add(self.send_shutdown_immediate_button, (1, 1), (1, 1), wx.EXPAND | wx.ALL, 2)
+        button_panel_sizer.Add(self.driver_button, (2, 0), (1, 2), wx.EXPAND | wx.ALL, 2)
         button_panel.SetSizer(button_panel_sizer)
 
         character_id_panel_sizer = wx.BoxSizer(wx.HORIZONTAL)
@@ -1034,9 +1152,11 @@ class ControlPanel(wx.Panel):  # type: ignore[misc]
 
         self.sizer = wx.GridBagSizer(0, 20)
         self.sizer.Add(self.config_button, (0, 0), (1, 1), wx.EXPAND | wx.ALL, 2)
+        self.sizer.Add(self.statistics_button, (0, 1), (1, 1), wx.EXPAND | wx.ALL, 2)
         self.sizer.Add(self.ignore_actions_force_checkbox, (1, 0), (1, 1), wx.EXPAND | wx.ALL, 2)
         self.sizer.Add(self.auto_send_checkbox, (2, 0), (1, 1), wx.EXPAND | wx.ALL, 2)
         self.sizer.Add(self.microsecond_precision_checkbox, (3, 0), (1, 1), wx.EXPAND | wx.ALL, 2)
+        self.sizer.Add(self.fuzz_checkbox, (1, 1), (1, 1), wx.EXPAND | wx.ALL, 2)
         self.sizer.Add(latency_panel, (4, 0), (1, 1), wx.EXPAND, 0)
         self.sizer.Add(log_level_panel, (5, 0), (1, 1), wx.EXPAND, 0)
         self.sizer.Add(character_id_panel, (4, 1), (1, 1), wx.EXPAND, 0)
@@ -1049,9 +1169,11 @@ class ControlPanel(wx.Panel):  # type: ignore[misc]
         # Bind events
 
         self.Bind(wx.EVT_BUTTON, self.on_config, self.config_button)
+        self.Bind(wx.EVT_BUTTON, self.on_statistics, self.statistics_button)
         self.Bind(wx.EVT_CHECKBOX, self.on_ignore_actions_force, self.ignore_actions_force_checkbox)
         self.Bind(wx.EVT_CHECKBOX, self.on_auto_send, self.auto_send_checkbox)
         self.Bind(wx.EVT_CHECKBOX, self.on_microsecond_precision, self.microsecond_precision_checkbox)
+        self.Bind(wx.EVT_CHECKBOX, self.on_fuzz, self.fuzz_checkbox)
 
         self.Bind(wx.EVT_TEXT, self.on_latency, self.latency_input)
 
@@ -1064,12 +1186,14 @@ class ControlPanel(wx.Panel):  # type: ignore[misc]
         self.Bind(wx.EVT_BUTTON, self.on_send_shutdown_graceful, self.send_shutdown_graceful_button)
         self.Bind(wx.EVT_BUTTON, self.on_send_shutdown_graceful_cancel, self.send_shutdown_graceful_cancel_button)
         self.Bind(wx.EVT_BUTTON, self.on_send_shutdown_immediate, self.send_shutdown_immediate_button)
+        self.Bind(wx.EVT_BUTTON, self.on_driver, self.driver_button)
 
         # Set default values
 
         self.ignore_actions_force_checkbox.SetValue(False)
         self.auto_send_checkbox.SetValue(False)
         self.microsecond_precision_checkbox.SetValue(False)
+        self.fuzz_checkbox.SetValue(False)
         self.log_level_choice.SetStringSelection(self.view.controls.get_log_level_str())
         self.character_id_input.SetValue(self.view.controls.character_id)
         self.display_name_input.SetValue(self.view.controls.display_name)
@@ -1077,11 +1201,16 @@ class ControlPanel(wx.Panel):  # type: ignore[misc]
         # Add tooltips
 
         self.config_button.SetToolTip("Open the configuration.")
+        self.statistics_button.SetToolTip("Show statistics such as action latency and forced action retries.")
         self.ignore_actions_force_checkbox.SetToolTip("Ignore forced actions.")
         self.auto_send_checkbox.SetToolTip(
             "Automatically answer forced actions with randomly generated data (like Randy).",
         )
         self.microsecond_precision_checkbox.SetToolTip("Use microsecond precision for timestamps.")
+        self.fuzz_checkbox.SetToolTip(
+            "Make the driver send invalid data, such as wrong types, missing properties and oversized strings."
+            " Data that crashes or hangs the game is recorded to the fuzz corpus file.",
+        )
         self.latency_input.SetToolTip(LATENCY_TOOLTIP)
         self.log_level_choice.SetToolTip(
             "Set the log level. Exported logs will still show all messages."
@@ -1112,6 +1241,10 @@ class ControlPanel(wx.Panel):  # type: ignore[misc]
             "Request an immediate shutdown from the game."
             " This is not officially part of the API specification and may not be supported by all SDKs.",
         )
+        self.driver_button.SetToolTip(
+            "Continuously send registered actions with generated data to load-test the game."
+            " The rate and how actions are selected can be set in the config file.",
+        )
 
     def on_config(self, event: wx.CommandEvent) -> None:
         """Handle config command event."""
@@ -1121,6 +1254,13 @@ class ControlPanel(wx.Panel):  # type: ignore[misc]
             assert isinstance(dialog, ConfigDialog)
             dialog.ShowModal()
 
+    def on_statistics(self, event: wx.CommandEvent) -> None:
+        """Handle statistics command event."""
+        event.Skip()
+
+        with StatisticsDialog(self) as dialog:
+            dialog.ShowModal()
+
     def on_ignore_actions_force(self, event: wx.CommandEvent) -> None:
         """Handle ignore_actions_force command event."""
         event.Skip()
@@ -1139,6 +1279,12 @@ class ControlPanel(wx.Panel):  # type: ignore[misc]
 
         self.view.controls.microsecond_precision = event.IsChecked()
 
+    def on_fuzz(self, event: wx.CommandEvent) -> None:
+        """Handle fuzz command event."""
+        event.Skip()
+
+        self.view.controls.fuzz = event.IsChecked()
+
     def on_latency(self, event: wx.CommandEvent) -> None:
         """Handle latency command event."""
         event.Skip()
@@ -1207,16 +1353,22 @@ class ControlPanel(wx.Panel):  # type: ignore[misc]
         self.PopupMenu(menu)
         menu.Destroy()
 
+    def on_driver(self, event: wx.CommandEvent) -> None:
+        """Handle driver command event."""
+        event.Skip()
 
-class SchemaDict(TypedDict):
-    """Schema dictionary."""
+        if self.driver_running:
+            self.view.on_stop_driver()
+            return
 
-    type: NotRequired[
-        Literal["array", "boolean", "integer", "null", "number", "object", "string"]
-        | list[Literal["array", "boolean", "integer", "null", "number", "object", "string"]]
-    ]
-    properties: NotRequired[dict[str, CoreSchemaMetaSchema]]
-    required: NotRequired[list[str]]
+        menu = ClientMenu(self.view, self.view.on_start_driver)
+        self.PopupMenu(menu)
+        menu.Destroy()
+
+    def set_driver_running(self, running: bool) -> None:
+        """Show whether the action driver is running."""
+        self.driver_running = running
+        self.driver_button.SetLabel("Stop driver" if running else "Start driver")
 
 
 class ActionDialog(wx.Dialog):  # type: ignore[misc]
@@ -1238,9 +1390,12 @@ class ActionDialog(wx.Dialog):  # type: ignore[misc]
         self.target_sash_ratio = 2 / 3
         self.is_error = False
 
+        # Only imported once an action dialog opens, to keep it out of startup
+        from wx import stc
+
         self.content_splitter = wx.SplitterWindow(self, style=wx.SP_LIVE_UPDATE)
-        self.text = wx.stc.StyledTextCtrl(self.content_splitter, style=wx.TE_MULTILINE | wx.HSCROLL)
-        self.info = wx.stc.StyledTextCtrl(self.content_splitter, style=wx.TE_MULTILINE | wx.HSCROLL | wx.TE_READONLY)
+        self.text = stc.StyledTextCtrl(self.content_splitter, style=wx.TE_MULTILINE | wx.HSCROLL)
+        self.info = stc.StyledTextCtrl(self.content_splitter, style=wx.TE_MULTILINE | wx.HSCROLL | wx.TE_READONLY)
         self.error_text = wx.StaticText(self, label="Invalid JSON data")
         self.allow_invalid_checkbox = wx.CheckBox(self, label="Don't validate")
         button_panel = wx.Panel(self)
@@ -1264,7 +1419,7 @@ class ActionDialog(wx.Dialog):  # type: ignore[misc]
         self.SetSizer(self.sizer)
 
         # Bind events
-        self.Bind(wx.stc.EVT_STC_MODIFIED, self.on_value_change, self.text)
+        self.Bind(stc.EVT_STC_MODIFIED, self.on_value_change, self.text)
         self.Bind(wx.EVT_CHECKBOX, self.on_allow_invalid, self.allow_invalid_checkbox)
         self.Bind(wx.EVT_BUTTON, self.on_send, self.send_button)
         self.Bind(wx.EVT_BUTTON, self.on_show_schema, self.show_schema_button)
@@ -1286,7 +1441,6 @@ class ActionDialog(wx.Dialog):  # type: ignore[misc]
         self.info.SetValue(json.dumps(self.action.schema, indent=2))
         self.allow_invalid_checkbox.SetValue(self.allow_invalid)
 
-        self.faker = JSF(action.schema or {})  # pyright: ignore[reportArgumentType]
         if action.name in view.model.last_action_data:
             self.text.SetValue(view.model.last_action_data[action.name])
         else:
@@ -1304,89 +1458,20 @@ class ActionDialog(wx.Dialog):  # type: ignore[misc]
 
     def regenerate(self) -> None:
         """Regenerate the JSON data."""
-        try:
-            sample = self.faker.generate()
-            self.text.SetValue(json.dumps(sample, indent=2))
-        except (TypeError, Exception) as e:
-            if "cannot pickle" in str(e):
-                self.view.log_warning(
-                    WarningID.JSF_FAILED,
-                    f"JSF failed for {self.action.name}, using fallback generator: {e}",
-                )
-                schema = self.action.schema or {}
-                type_ = schema.get("type")
-                sample = {}
-                if type_ is not None:
-                    sample = self._generate_from_schema(
-                        SchemaDict(
-                            {
-                                "type": type_,
-                                "properties": schema.get("properties", {}),
-                                "required": schema.get("required", []),
-                            },
-                        ),
-                    )
-                self.text.SetValue(json.dumps(sample, indent=2))
-            else:
-                raise e
-
-    def _generate_from_schema(self, schema: SchemaDict) -> dict[str, object]:
-        """Generate a sample JSON object based on the schema without JSF."""
-        if not schema or schema.get("type") != "object":
-            return {}
-
-        properties = schema.get("properties", {})
-        required = schema.get("required", [])
-        result: dict[str, object] = {}
-
-        for prop_name, prop_schema in properties.items():
-            # Skip if prop_schema is False
-            if prop_schema is False:
-                continue
-
-            if "enum" in prop_schema:
-                result[prop_name] = prop_schema["enum"][0] if prop_schema["enum"] else ""
-            elif prop_schema.get("type") == "string":
-                result[prop_name] = f"sample_{prop_name}"
-            elif prop_schema.get("type") in ("number", "integer"):
-                min_val = prop_schema.get("minimum", 1)
-                # max_val = prop_schema.get("maximum", min_val + 10)
-                # TODO: Handle more complex cases, here we only use minimum
-                result[prop_name] = min_val
-            elif prop_schema.get("type") == "boolean":
-                result[prop_name] = False
-            elif prop_schema.get("type") == "object":
-                result[prop_name] = self._generate_from_schema(
-                    SchemaDict(
-                        {
-                            "type": prop_schema.get("type", "object"),
-                            "properties": schema.get("properties", {}),
-                            "required": schema.get("required", []),
-                        },
-                    ),
-                )
-            elif prop_schema.get("type") == "array":
-                result[prop_name] = []
-            else:
-                # Default fallback
-                result[prop_name] = None
-
-        # Ensure required fields are present
-        for req_field in required:
-            if req_field not in result:
-                result[req_field] = f"required_{req_field}"
+        sample = sample_generator().generate(self.action.schema or {})
+        self.text.SetValue(json.dumps(sample, indent=2))
 
-        return result
-
-    def on_value_change(self, event: wx.stc.StyledTextEvent) -> None:
+    def on_value_change(self, event: stc.StyledTextEvent) -> None:
         """Handle text change."""
+        from wx import stc
+
         event.Skip()
         mod = event.GetModificationType()
-        if not mod & (wx.stc.STC_MOD_INSERTTEXT | wx.stc.STC_MOD_DELETETEXT):
+        if not mod & (stc.STC_MOD_INSERTTEXT | stc.STC_MOD_DELETETEXT):
             return
 
         # TODO: Configurable
-        if event.GetText() == "\n" and mod & wx.stc.STC_MOD_INSERTTEXT and not (mod & wx.stc.STC_PERFORMED_REDO):
+        if event.GetText() == "\n" and mod & stc.STC_MOD_INSERTTEXT and not (mod & stc.STC_PERFORMED_REDO):
             position = event.GetPosition()
             line = self.text.LineFromPosition(position)
             # line_content = self.text.GetLine(line)
@@ -1401,6 +1486,8 @@ class ActionDialog(wx.Dialog):  # type: ignore[misc]
 
         json_str = self.text.GetValue()
 
+        import jsonschema
+
         try:
             json_cmd = json.loads(json_str)
             jsonschema.validate(json_cmd, self.action.schema or {})
@@ -1425,6 +1512,8 @@ class ActionDialog(wx.Dialog):  # type: ignore[misc]
                     length += 1
                 self.text.IndicatorFillRange(start, length)
             elif isinstance(exc, jsonschema.ValidationError):
+                import json_source_map as jsm
+
                 source_map = jsm.calculate(json_str)
                 path = "/" + "/".join(map(str, exc.path)) if exc.path else ""
                 if path in source_map:
@@ -1464,6 +1553,8 @@ class ActionDialog(wx.Dialog):  # type: ignore[misc]
         """Handle send button."""
         event.Skip()
 
+        import jsonschema
+
         try:
             json_str = self.text.GetValue()
             if not self.allow_invalid:
@@ -1549,17 +1640,26 @@ class ActionsForceDialog(wx.Dialog):  # type: ignore[misc]
         self.ephemeral_context = ephemeral_context
         self.actions = actions
         self.priority = priority
+        # Decide by length, parsing and measuring a large state would take too long
+        self.large_state = len(state) > STATE_TEXT_MAX_LENGTH
         self.formatted_state: str
-        try:
-            self.formatted_state = json.dumps(json.loads(state), indent=2)
-        except (json.JSONDecodeError, TypeError):
+        if self.large_state:
             self.formatted_state = state
+        else:
+            try:
+                self.formatted_state = json.dumps(json.loads(state), indent=2)
+            except (json.JSONDecodeError, TypeError):
+                self.formatted_state = state
 
         state_panel = wx.Panel(self)
         self.state_label = wx.StaticText(state_panel, label="State:")
         self.state_text = wx.StaticText(state_panel, label="")
         self.state_textctrl = wx.TextCtrl(state_panel, style=wx.TE_MULTILINE | wx.TE_READONLY, size=wx.Size(-1, 100))
+        self.state_tree = JSONTree(state_panel, size=wx.Size(-1, 200))
+        self.state_tree_button = wx.Button(state_panel, label="Tree view")
         self.state_textctrl.Hide()
+        self.state_tree.Hide()
+        self.state_tree_button.Hide()
 
         query_panel = wx.Panel(self)
         self.query_label = wx.StaticText(query_panel, label="Query:")
@@ -1573,6 +1673,8 @@ class ActionsForceDialog(wx.Dialog):  # type: ignore[misc]
         state_sizer.Add(self.state_label, 0, wx.TOP | wx.ALL, 2)
         state_sizer.Add(self.state_text, 1, wx.EXPAND | wx.ALL, 2)
         state_sizer.Add(self.state_textctrl, 1, wx.EXPAND | wx.ALL, 2)
+        state_sizer.Add(self.state_tree, 1, wx.EXPAND | wx.ALL, 2)
+        state_sizer.Add(self.state_tree_button, 0, wx.ALL, 2)
         state_panel.SetSizer(state_sizer)
 
         query_sizer = wx.BoxSizer(wx.HORIZONTAL)
@@ -1595,8 +1697,11 @@ class ActionsForceDialog(wx.Dialog):  # type: ignore[misc]
             "With ephemeral context, Neuro will not remember the state and query after this action.",
         )
 
+        self.state_tree_button.SetToolTip("Switch between the text and the tree view of the state.")
+
         # Bind events
         self.Bind(EVT_EXECUTE, self.on_execute, self.action_list)
+        self.Bind(wx.EVT_BUTTON, self.on_toggle_state_tree, self.state_tree_button)
 
         # Setup
         for action in actions:
@@ -1609,16 +1714,29 @@ class ActionsForceDialog(wx.Dialog):  # type: ignore[misc]
 
         state_width = self.state_text.GetSize()[0]
         query_width = self.query_text.GetSize()[0]
-        self.state_text.SetLabel(self.formatted_state or "<None>")
         self.query_text.SetLabel(query or "<None>")
-        self.state_text.Wrap(state_width)
         self.query_text.Wrap(query_width)
 
-        # If state is too large, switch to textctrl
-        if self.state_text.GetSize()[1] > 100:
+        if self.large_state:
             self.state_text.Hide()
             self.state_textctrl.Show()
-            self.state_textctrl.SetValue(self.formatted_state)
+            self.state_tree_button.Show()
+            if len(state) > STATE_PREVIEW_MAX_LENGTH:
+                self.state_textctrl.SetValue(
+                    f"{state[:STATE_PREVIEW_MAX_LENGTH]}..."
+                    f"\n\n<{len(state) - STATE_PREVIEW_MAX_LENGTH} more characters, open the tree view to see everything>",
+                )
+            else:
+                self.state_textctrl.SetValue(state)
+        else:
+            self.state_text.SetLabel(self.formatted_state or "<None>")
+            self.state_text.Wrap(state_width)
+
+            # If state is too high, switch to textctrl
+            if self.state_text.GetSize()[1] > 100:
+                self.state_text.Hide()
+                self.state_textctrl.Show()
+                self.state_textctrl.SetValue(self.formatted_state)
 
         self.Layout()
         self.sizer.Fit(self)
@@ -1629,6 +1747,71 @@ class ActionsForceDialog(wx.Dialog):  # type: ignore[misc]
 
         self.EndModal(wx.ID_OK)
 
+    def on_toggle_state_tree(self, event: wx.CommandEvent) -> None:
+        """Handle state tree view button event."""
+        event.Skip()
+
+        if self.state_tree.IsShown():
+            self.state_tree.Hide()
+            self.state_textctrl.Show()
+            self.state_tree_button.SetLabel("Tree view")
+        else:
+            # Only parse the state when it is actually needed
+            if self.state_tree.IsEmpty():
+                try:
+                    self.state_tree.set_value(orjson.loads(self.state))
+                except orjson.JSONDecodeError:
+                    # Not JSON, show the full text instead
+                    self.state_textctrl.SetValue(self.state)
+                    self.state_tree_button.Disable()
+                    self.state_tree_button.SetToolTip("The state is not valid JSON.")
+                    return
+            self.state_textctrl.Hide()
+            self.state_tree.Show()
+            self.state_tree_button.SetLabel("Text view")
+        self.Layout()
+
+
+class JSONTree(wx.TreeCtrl):  # type: ignore[misc]
+    """Collapsible tree view of a JSON value that only creates items when they are expanded."""
+
+    def __init__(self, parent: wx.Window, size: wx.Size = wx.DefaultSize) -> None:
+        """Initialize JSON Tree."""
+        super().__init__(parent, size=size, style=wx.TR_DEFAULT_STYLE | wx.TR_HIDE_ROOT)
+
+        self.Bind(wx.EVT_TREE_ITEM_EXPANDING, self.on_item_expanding)
+
+    def set_value(self, value: object) -> None:
+        """Show a JSON value."""
+        self.DeleteAllItems()
+        root = self.AddRoot("")
+        item = self._append(root, None, value)
+        if self.ItemHasChildren(item):
+            self.Expand(item)
+
+    def _append(self, parent: wx.TreeItemId, key: str | int | None, value: object) -> wx.TreeItemId:
+        """Append an item for a value. Children of objects and arrays are created when it is expanded."""
+        item = self.AppendItem(parent, _json_tree_label(key, value))
+        if isinstance(value, dict | list) and value:
+            self.SetItemData(item, value)
+            self.SetItemHasChildren(item, True)
+        return item
+
+    def on_item_expanding(self, event: wx.TreeEvent) -> None:
+        """Handle item expanding event."""
+        event.Skip()
+
+        item = event.GetItem()
+        value = self.GetItemData(item)
+        if value is None or self.GetChildrenCount(item, False) > 0:
+            return
+
+        children = value.items() if isinstance(value, dict) else enumerate(value)
+        for key, child in itertools.islice(children, JSON_TREE_MAX_CHILDREN):
+            self._append(item, key, child)
+        if len(value) > JSON_TREE_MAX_CHILDREN:
+            self.AppendItem(item, f"<{len(value) - JSON_TREE_MAX_CHILDREN} more>")
+
 
 class ConfigDialog(wx.Dialog):  # type: ignore[misc]
     """Configuration Dialog."""
@@ -1769,6 +1952,193 @@ class ConfigDialog(wx.Dialog):  # type: ignore[misc]
         self.EndModal(wx.ID_OK)
 
 
+class LogSearchDialog(wx.Dialog):  # type: ignore[misc]
+    """Log Search Dialog."""
+
+    SEARCH_LIMIT = 500
+    """The maximum number of results shown."""
+
+    def __init__(self, parent: MainFrame, view: TonyView) -> None:
+        """Initialize Log Search Dialog."""
+        super().__init__(
+            parent,
+            title="Search Logs",
+            style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER,
+        )
+
+        self.view = view
+        self.results: list[LogRecord] = []
+        self.client_ids: list[int | None] = [None]
+
+        self.search_ctrl = wx.SearchCtrl(self, style=wx.TE_PROCESS_ENTER)
+        self.search_ctrl.ShowCancelButton(True)
+
+        filter_panel = wx.Panel(self)
+        self.tab_choice = wx.Choice(filter_panel, choices=["All tabs", *parent.panel.log_notebook.panels])
+        self.level_choice = wx.Choice(
+            filter_panel,
+            choices=["All levels", *(level.capitalize() for level in LOG_LEVELS if level != "SYSTEM")],
+        )
+        self.client_choice = wx.Choice(filter_panel)
+        self.tab_choice.SetSelection(0)
+        self.level_choice.SetSelection(0)
+
+        self.result_list = wx.ListCtrl(self, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+        self.result_list.InsertColumn(0, "Tab", width=80)
+        self.result_list.InsertColumn(1, "Line", width=60)
+        self.result_list.InsertColumn(2, "Message", width=400)
+        self.status_text = wx.StaticText(self, label="")
+
+        filter_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        filter_sizer.Add(self.tab_choice, 1, wx.EXPAND | wx.ALL, 2)
+        filter_sizer.Add(self.level_choice, 1, wx.EXPAND | wx.ALL, 2)
+        filter_sizer.Add(self.client_choice, 1, wx.EXPAND | wx.ALL, 2)
+        filter_panel.SetSizer(filter_sizer)
+
+        self.sizer = wx.BoxSizer(wx.VERTICAL)
+        self.sizer.Add(self.search_ctrl, 0, wx.EXPAND | wx.ALL, 2)
+        self.sizer.Add(filter_panel, 0, wx.EXPAND | wx.ALL, 0)
+        self.sizer.Add(self.result_list, 1, wx.EXPAND | wx.ALL, 2)
+        self.sizer.Add(self.status_text, 0, wx.EXPAND | wx.ALL, 2)
+        self.SetSizer(self.sizer)
+        self.SetSize(600, 400)
+
+        # Bind events
+        self.Bind(wx.EVT_TEXT, self.on_search, self.search_ctrl)
+        self.Bind(wx.EVT_SEARCH, self.on_search, self.search_ctrl)
+        self.Bind(wx.EVT_CHOICE, self.on_search, self.tab_choice)
+        self.Bind(wx.EVT_CHOICE, self.on_search, self.level_choice)
+        self.Bind(wx.EVT_CHOICE, self.on_search, self.client_choice)
+        self.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.on_result_activated, self.result_list)
+        self.Bind(wx.EVT_SHOW, self.on_show)
+
+        # Set tooltips
+        self.search_ctrl.SetToolTip(
+            'Words to search for. Use double quotes to search for a phrase, e.g. "action result".',
+        )
+        self.result_list.SetToolTip("Double-click a result to jump to it.")
+
+    def update_clients(self) -> None:
+        """Update the client filter with the connected clients."""
+        client_id = self.client_ids[max(self.client_choice.GetSelection(), 0)]
+        self.client_ids = [None]
+        self.client_choice.Clear()
+        self.client_choice.Append("All clients")
+        for cid, game in self.view.get_clients():
+            self.client_ids.append(cid)
+            self.client_choice.Append(f"{game} (ID: {cid})")
+        self.client_choice.SetSelection(self.client_ids.index(client_id) if client_id in self.client_ids else 0)
+
+    def search(self) -> None:
+        """Search the logs and show the results."""
+        tab = self.tab_choice.GetSelection()
+        level = self.level_choice.GetSelection()
+        self.results = self.view.model.log_index.search(
+            self.search_ctrl.GetValue(),
+            tab=self.tab_choice.GetString(tab) if tab > 0 else None,
+            client_id=self.client_ids[max(self.client_choice.GetSelection(), 0)],
+            level=self.level_choice.GetString(level) if level > 0 else None,
+            limit=self.SEARCH_LIMIT,
+        )
+
+        self.result_list.DeleteAllItems()
+        for i, record in enumerate(self.results):
+            self.result_list.InsertItem(i, record.tab)
+            self.result_list.SetItem(i, 1, str(record.line + 1))
+            self.result_list.SetItem(i, 2, record.text.split("\n", 1)[0])
+
+        if len(self.results) >= self.SEARCH_LIMIT:
+            self.status_text.SetLabel(f"Showing the {self.SEARCH_LIMIT} most recent results")
+        else:
+            self.status_text.SetLabel(f"{len(self.results)} results")
+
+    def on_show(self, event: wx.ShowEvent) -> None:
+        """Handle show event."""
+        event.Skip()
+
+        if event.IsShown():
+            self.update_clients()
+            self.search()
+
+    def on_search(self, event: wx.CommandEvent) -> None:
+        """Handle search event."""
+        event.Skip()
+
+        self.search()
+
+    def on_result_activated(self, event: wx.ListEvent) -> None:
+        """Handle result activated event."""
+        event.Skip()
+
+        record = self.results[event.GetIndex()]
+        self.GetParent().panel.log_notebook.show_line(record.tab, record.line)
+
+
+class StatisticsDialog(wx.Dialog):  # type: ignore[misc]
+    """Statistics Dialog."""
+
+    REFRESH_INTERVAL = 1000
+    """Milliseconds between updates of the statistics."""
+
+    def __init__(self, parent: wx.Window) -> None:
+        """Initialize Statistics Dialog."""
+        super().__init__(
+            parent,
+            title="Statistics",
+            style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER,
+        )
+
+        self.metric_list = wx.ListCtrl(self, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+        self.metric_list.InsertColumn(0, "Name", width=260)
+        self.metric_list.InsertColumn(1, "Value", width=300)
+        self.timer = wx.Timer(self)
+
+        self.sizer = wx.BoxSizer(wx.VERTICAL)
+        self.sizer.Add(self.metric_list, 1, wx.EXPAND | wx.ALL, 2)
+        self.sizer.Add(self.CreateButtonSizer(wx.CLOSE), 0, wx.EXPAND | wx.ALL, 2)
+        self.SetSizer(self.sizer)
+        self.SetSize(600, 400)
+
+        # Bind events
+        self.Bind(wx.EVT_TIMER, self.on_timer, self.timer)
+        self.Bind(wx.EVT_BUTTON, self.on_close, id=wx.ID_CLOSE)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.on_destroy)
+
+        self.update()
+        self.timer.Start(self.REFRESH_INTERVAL)
+
+    def update(self) -> None:
+        """Show the current value of all metrics."""
+        snapshot = metrics().snapshot()
+        self.metric_list.Freeze()
+        if self.metric_list.GetItemCount() != len(snapshot):
+            self.metric_list.DeleteAllItems()
+            for i, name in enumerate(snapshot):
+                self.metric_list.InsertItem(i, name)
+        for i, (name, value) in enumerate(snapshot.items()):
+            self.metric_list.SetItem(i, 0, name)
+            self.metric_list.SetItem(i, 1, value)
+        self.metric_list.Thaw()
+
+    def on_timer(self, event: wx.TimerEvent) -> None:
+        """Handle timer event."""
+        event.Skip()
+
+        self.update()
+
+    def on_close(self, event: wx.CommandEvent) -> None:
+        """Handle close command event."""
+        event.Skip()
+
+        self.EndModal(wx.ID_CLOSE)
+
+    def on_destroy(self, event: wx.WindowDestroyEvent) -> None:
+        """Handle destroy event."""
+        event.Skip()
+
+        self.timer.Stop()
+
+
 class ClientMenu(wx.Menu):  # type: ignore[misc]
     """The context menu for selecting clients."""
 
@@ -1835,6 +2205,7 @@ class Controls:
         self.auto_send: bool = False
         self.latency: int = 0
         self.microsecond_precision: bool = False
+        self.fuzz: bool = False
         self.character_id: str = config().character_id
         self.display_name: str = config().display_name
 
@@ -1858,7 +2229,25 @@ class Controls:
 # region Helper functions
 
 
-def setup_json_editor(editor: wx.stc.StyledTextCtrl) -> None:
+def _resolve_log_message(message: LogMessage) -> str:
+    """Return the log message, calling it first if it is a message factory."""
+    return message if isinstance(message, str) else message()
+
+
+def _json_tree_label(key: str | int | None, value: object) -> str:
+    """Return the label of a JSON tree item, truncating long strings."""
+    if isinstance(value, dict):
+        text = f"{{{len(value)} {'key' if len(value) == 1 else 'keys'}}}"
+    elif isinstance(value, list):
+        text = f"[{len(value)} {'item' if len(value) == 1 else 'items'}]"
+    elif isinstance(value, str) and len(value) > JSON_TREE_STRING_MAX_LENGTH:
+        text = f"{json.dumps(value[:JSON_TREE_STRING_MAX_LENGTH])}... <{len(value)} characters>"
+    else:
+        text = json.dumps(value)
+    return text if key is None else f"{key}: {text}"
+
+
+def setup_json_editor(editor: stc.StyledTextCtrl) -> None:
     """Set up a JSON editor with syntax highlighting.
 
     Parameters
@@ -1869,63 +2258,65 @@ def setup_json_editor(editor: wx.stc.StyledTextCtrl) -> None:
         Whether to use a dark theme.
 
     """
-    editor.SetLexer(wx.stc.STC_LEX_JSON)
+    from wx import stc
+
+    editor.SetLexer(stc.STC_LEX_JSON)
     editor.SetKeyWords(0, "true false null")
 
     editor.SetPasteConvertEndings(True)
-    editor.SetEOLMode(wx.stc.STC_EOL_LF)
+    editor.SetEOLMode(stc.STC_EOL_LF)
 
     editor.SetMultipleSelection(True)
     editor.SetAdditionalSelectionTyping(True)
-    editor.SetMultiPaste(wx.stc.STC_MULTIPASTE_EACH)
+    editor.SetMultiPaste(stc.STC_MULTIPASTE_EACH)
 
-    # editor.SetViewWhiteSpace(wx.stc.STC_WS_VISIBLEALWAYS)
+    # editor.SetViewWhiteSpace(stc.STC_WS_VISIBLEALWAYS)
 
     editor.SetBackSpaceUnIndents(True)
     # editor.SetHighlightGuide(1)  # Idk what this does
     editor.SetIndent(2)
-    editor.SetIndentationGuides(wx.stc.STC_IV_LOOKBOTH)
+    editor.SetIndentationGuides(stc.STC_IV_LOOKBOTH)
     editor.SetTabWidth(2)
     editor.SetUseTabs(False)
 
-    editor.IndicatorSetStyle(0, wx.stc.STC_INDIC_SQUIGGLE)
+    editor.IndicatorSetStyle(0, stc.STC_INDIC_SQUIGGLE)
     editor.IndicatorSetForeground(0, wx.RED)
 
-    # editor.SetAutomaticFold(wx.stc.STC_AUTOMATICFOLD_SHOW | wx.stc.STC_AUTOMATICFOLD_CLICK | wx.stc.STC_AUTOMATICFOLD_CHANGE)
-    # editor.SetFoldFlags(wx.stc.STC_FOLDFLAG_LEVELNUMBERS)
+    # editor.SetAutomaticFold(stc.STC_AUTOMATICFOLD_SHOW | stc.STC_AUTOMATICFOLD_CLICK | stc.STC_AUTOMATICFOLD_CHANGE)
+    # editor.SetFoldFlags(stc.STC_FOLDFLAG_LEVELNUMBERS)
 
-    editor.SetWrapMode(wx.stc.STC_WRAP_WORD)
-    editor.SetWrapIndentMode(wx.stc.STC_WRAPINDENT_INDENT)
-    editor.SetWrapVisualFlags(wx.stc.STC_WRAPVISUALFLAG_END)
+    editor.SetWrapMode(stc.STC_WRAP_WORD)
+    editor.SetWrapIndentMode(stc.STC_WRAPINDENT_INDENT)
+    editor.SetWrapVisualFlags(stc.STC_WRAPVISUALFLAG_END)
 
     editor.SetCaretForeground(get_editor_theme_color(EditorThemeColor.CARET))
 
     editor.StyleSetSpec(
-        wx.stc.STC_STYLE_DEFAULT,
+        stc.STC_STYLE_DEFAULT,
         f"fore:{get_editor_theme_color(EditorThemeColor.DEFAULT)},back:{get_editor_theme_color(EditorThemeColor.BACKGROUND)},face:Courier New",
     )
     editor.StyleClearAll()
 
-    # editor.StyleSetHotSpot(wx.stc.STC_JSON_URI, True)  # Makes links seem clickable, but doesn't actually do anything
+    # editor.StyleSetHotSpot(stc.STC_JSON_URI, True)  # Makes links seem clickable, but doesn't actually do anything
 
-    # editor.StyleSetSpec(wx.stc.STC_JSON_ERROR, "fore:white,back:red")  # We have squiggles for this
-    # editor.StyleSetSpec(wx.stc.STC_JSON_ESCAPESEQUENCE, "fore:orange")  # Doesn't seem to work
-    # editor.StyleSetSpec(wx.stc.STC_JSON_STRINGEOL, "fore:black,back:red,eol")
-    editor.StyleSetSpec(wx.stc.STC_JSON_KEYWORD, f"fore:{get_editor_theme_color(EditorThemeColor.KEYWORD)}")
-    editor.StyleSetSpec(wx.stc.STC_JSON_PROPERTYNAME, f"fore:{get_editor_theme_color(EditorThemeColor.PROPERTYNAME)}")
-    editor.StyleSetSpec(wx.stc.STC_JSON_COMPACTIRI, f"fore:{get_editor_theme_color(EditorThemeColor.COMPACTIRI)}")
-    editor.StyleSetSpec(wx.stc.STC_JSON_STRING, f"fore:{get_editor_theme_color(EditorThemeColor.STRING)}")
-    editor.StyleSetSpec(wx.stc.STC_JSON_URI, f"fore:{get_editor_theme_color(EditorThemeColor.URI)},underline")
-    editor.StyleSetSpec(wx.stc.STC_JSON_NUMBER, f"fore:{get_editor_theme_color(EditorThemeColor.NUMBER)}")
+    # editor.StyleSetSpec(stc.STC_JSON_ERROR, "fore:white,back:red")  # We have squiggles for this
+    # editor.StyleSetSpec(stc.STC_JSON_ESCAPESEQUENCE, "fore:orange")  # Doesn't seem to work
+    # editor.StyleSetSpec(stc.STC_JSON_STRINGEOL, "fore:black,back:red,eol")
+    editor.StyleSetSpec(stc.STC_JSON_KEYWORD, f"fore:{get_editor_theme_color(EditorThemeColor.KEYWORD)}")
+    editor.StyleSetSpec(stc.STC_JSON_PROPERTYNAME, f"fore:{get_editor_theme_color(EditorThemeColor.PROPERTYNAME)}")
+    editor.StyleSetSpec(stc.STC_JSON_COMPACTIRI, f"fore:{get_editor_theme_color(EditorThemeColor.COMPACTIRI)}")
+    editor.StyleSetSpec(stc.STC_JSON_STRING, f"fore:{get_editor_theme_color(EditorThemeColor.STRING)}")
+    editor.StyleSetSpec(stc.STC_JSON_URI, f"fore:{get_editor_theme_color(EditorThemeColor.URI)},underline")
+    editor.StyleSetSpec(stc.STC_JSON_NUMBER, f"fore:{get_editor_theme_color(EditorThemeColor.NUMBER)}")
 
     # Other styles to consider (background colors for visibility testing)
-    # editor.StyleSetSpec(wx.stc.STC_JSON_DEFAULT,            "back:wheat")  # Spaces
-    # editor.StyleSetSpec(wx.stc.STC_JSON_OPERATOR,           "back:magenta")  # Punctuation
+    # editor.StyleSetSpec(stc.STC_JSON_DEFAULT,            "back:wheat")  # Spaces
+    # editor.StyleSetSpec(stc.STC_JSON_OPERATOR,           "back:magenta")  # Punctuation
 
     # Idk what these do
-    # editor.StyleSetSpec(wx.stc.STC_JSON_BLOCKCOMMENT, "back:green")
-    # editor.StyleSetSpec(wx.stc.STC_JSON_LDKEYWORD, "back:cyan")
-    # editor.StyleSetSpec(wx.stc.STC_JSON_LINECOMMENT, "back:dim grey")
+    # editor.StyleSetSpec(stc.STC_JSON_BLOCKCOMMENT, "back:green")
+    # editor.StyleSetSpec(stc.STC_JSON_LDKEYWORD, "back:cyan")
+    # editor.StyleSetSpec(stc.STC_JSON_LINECOMMENT, "back:dim grey")
 
 
 # endregion
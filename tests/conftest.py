@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import random
+from typing import Any
+
+import orjson
+import pytest
+import trio
+
+
+class FakeClock:
+    """Clock that only advances when told to."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Create a clock that only advances when told to."""
+    return FakeClock()
+
+
+@pytest.fixture
+def rng() -> random.Random:
+    """Create a seeded random number generator."""
+    return random.Random(0)  # noqa: S311
+
+
+class FakeTony:
+    """Peer acting as Tony for a game: acknowledges startups and sends an action for every forced action."""
+
+    def __init__(self) -> None:
+        self.received: list[dict[str, Any]] = []
+        self.to_game, self.from_tony = trio.open_memory_channel[str](100)
+        self.next_id = 0
+
+    @property
+    def commands(self) -> list[str]:
+        """Return the commands received from the game."""
+        return [message["command"] for message in self.received]
+
+    async def send(self, data: str | bytes) -> None:
+        """Receive a message from the game."""
+        message = orjson.loads(data)
+        self.received.append(message)
+        if message["command"] == "startup":
+            await self.to_game.send('{"command": "startup", "data": {"session": {"sessionId": "live-session"}}}')
+        elif message["command"] == "actions/force":
+            self.next_id += 1
+            name = message["data"]["action_names"][0]
+            action = {"command": "action", "data": {"id": f"live-{self.next_id}", "name": name}}
+            await self.to_game.send(orjson.dumps(action).decode("utf-8"))
+
+    async def receive(self) -> str:
+        """Send the next message to the game."""
+        return await self.from_tony.receive()
+
+
+@pytest.fixture
+def tony() -> FakeTony:
+    """Create a peer acting as Tony."""
+    return FakeTony()
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import dataclasses
 import sys
 from typing import TYPE_CHECKING, Any
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 import trio
+import trio.testing
 
 if sys.version_info < (3, 11):
     pass
@@ -13,7 +15,10 @@ if sys.version_info < (3, 11):
 from collections.abc import Coroutine
 from functools import partial
 
+from neuro_api_tony import config as config_module
 from neuro_api_tony.api import ActionsRegisterCommand, NeuroAPI
+from neuro_api_tony.config import SendActionsTo, config_snapshot
+from neuro_api_tony.loopback import connect_loopback
 from neuro_api_tony.model import NeuroAction
 
 if TYPE_CHECKING:
@@ -457,3 +462,71 @@ async def test_handle_producer_no_client(api: NeuroAPI) -> None:
 ##        nursery.cancel_scope.cancel()
 ##
 ##    assert api._current_action_id is None
+
+
+def test_action_window(api: NeuroAPI, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the in-flight window limits how many actions can wait for a result per client."""
+    client = MagicMock()
+    client.in_flight_window = 2
+    api._clients[0] = (client, MagicMock())
+
+    assert not api.is_action_window_full(0)
+    api.in_flight.add(0, "tony_action_0", "test_action")
+    assert not api.is_action_window_full(0)
+    api.in_flight.add(0, "tony_action_1", "test_action")
+    assert api.is_action_window_full(0)
+    api.in_flight.complete(0, "tony_action_0")
+    assert not api.is_action_window_full(0)
+
+
+@pytest.mark.parametrize("send_actions_to", list(SendActionsTo))
+def test_send_action_without_clients(
+    api: NeuroAPI,
+    monkeypatch: pytest.MonkeyPatch,
+    send_actions_to: SendActionsTo,
+) -> None:
+    """Test that the action driver can check and send actions while no client is connected."""
+    monkeypatch.setattr(
+        config_module,
+        "_snapshot",
+        dataclasses.replace(config_snapshot(), send_actions_to=send_actions_to),
+    )
+
+    assert not api.is_action_window_full(0)
+    assert not api.send_action("tony_action_0", "test_action", None, 0)
+
+
+@pytest.mark.trio
+async def test_action_window_fixed_on_connect(api: NeuroAPI, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a client keeps the in-flight window it connected with when the setting changes."""
+    monkeypatch.setattr(config_module, "_snapshot", dataclasses.replace(config_snapshot(), max_in_flight_actions=2))
+    async with connect_loopback(api):
+        await trio.testing.wait_all_tasks_blocked()
+        monkeypatch.setattr(
+            config_module,
+            "_snapshot",
+            dataclasses.replace(config_snapshot(), max_in_flight_actions=5),
+        )
+        (client_id,) = api._clients
+
+        assert api.send_action("tony_action_0", "test_action", None, client_id)
+        assert not api.is_action_window_full(client_id)
+        assert api.send_action("tony_action_1", "test_action", None, client_id)
+        assert api.is_action_window_full(client_id)
+
+
+@pytest.mark.trio
+async def test_action_timeout_reported(api: NeuroAPI, autojump_clock: trio.testing.MockClock) -> None:
+    """Test that actions whose result is overdue are reported once."""
+    api.in_flight.clock = trio.current_time
+    timed_out: list[tuple[int, str]] = []
+    api.on_action_timeout = lambda client_id, id_: timed_out.append((client_id, id_))
+    api.in_flight.add(0, "tony_action_0", "test_action", timeout=5)
+
+    async with trio.open_nursery() as nursery:
+        nursery.start_soon(api._watch_action_deadlines)
+        await trio.sleep(4)
+        assert timed_out == []
+        await trio.sleep(10)
+        assert timed_out == [(0, "tony_action_0")]
+        nursery.cancel_scope.cancel()
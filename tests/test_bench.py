@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import orjson
+import pytest
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+
+def load_bench() -> ModuleType:
+    """Import benchmarks/bench.py, which is a script and not part of the package."""
+    spec = importlib.util.spec_from_file_location("bench", Path(__file__).parents[1] / "benchmarks" / "bench.py")
+    assert spec is not None
+    assert spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+bench = load_bench()
+
+
+def test_compare_reports_regressions_above_threshold() -> None:
+    baseline = {"fast": 1.0, "slow": 1.0, "removed": 1.0}
+    results = {"fast": 0.5, "slow": 1.2, "new": 1.0}
+
+    comparisons, regressions = bench.compare(baseline, results, threshold=0.15)
+
+    assert [(comparison.name, comparison.change) for comparison in comparisons] == [
+        ("fast", pytest.approx(-0.5)),
+        ("slow", pytest.approx(0.2)),
+    ]
+    assert [regression.name for regression in regressions] == ["slow"]
+    assert bench.compare(baseline, results, threshold=0.25)[1] == []
+
+
+def test_save_baseline_keeps_benchmarks_that_were_not_run(tmp_path: Path) -> None:
+    path = tmp_path / "baseline.json"
+    bench.save_baseline({"b": 2.0, "a": 1.0}, path)
+    bench.save_baseline({"b": 3.0, "c": 4.0}, path)
+
+    assert bench.load_baseline(path) == {"a": 1.0, "b": 3.0, "c": 4.0}
+    assert list(orjson.loads(path.read_bytes())["results"]) == ["a", "b", "c"]
+
+
+def test_measure_calibrates_number(monkeypatch: pytest.MonkeyPatch) -> None:
+    numbers: list[int] = []
+
+    def fake_time(run: object, number: int) -> float:
+        numbers.append(number)
+        return number * 0.001
+
+    monkeypatch.setattr(bench, "_time", fake_time)
+
+    assert bench.measure(SimpleNamespace(name="case", run=None, number=None)) == pytest.approx(0.001)
+    assert numbers == [1, 200] + [200] * bench.REPEAT
+
+    numbers.clear()
+    assert bench.measure(SimpleNamespace(name="case", run=None, number=10)) == pytest.approx(0.001)
+    assert numbers == [10] * bench.REPEAT
+
+
+def test_main_compare_exits_with_1_on_regression(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "baseline.json"
+    bench.save_baseline({"case": 1.0}, path)
+
+    monkeypatch.setattr(bench, "run_benchmarks", lambda keyword: {"case": 1.1})
+    assert bench.main(["compare", "--baseline", str(path)]) == 0
+
+    monkeypatch.setattr(bench, "run_benchmarks", lambda keyword: {"case": 2.0})
+    assert bench.main(["compare", "--baseline", str(path)]) == 1
+
+
+def test_main_compare_requires_baseline(tmp_path: Path) -> None:
+    with pytest.raises(SystemExit):
+        bench.main(["compare", "--baseline", str(tmp_path / "missing.json")])
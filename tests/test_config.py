@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from neuro_api_tony import config as config_module
+from neuro_api_tony.config import (
+    MAX_PORT,
+    MINIMUM_VALUES,
+    WARNING_BITS,
+    ActionScope,
+    ConfigSnapshot,
+    EditorThemeColor,
+    WarningID,
+    config_key,
+    config_snapshot,
+    get_enabled_warnings,
+    is_warning_enabled,
+    load_config_from_file,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+
+@pytest.fixture(autouse=True)
+def restore_config() -> Generator[None, None, None]:
+    """Restore the global configuration after each test."""
+    old_config = config_module._config
+    old_snapshot = config_module._snapshot
+    old_file = config_module._current_config_file
+    yield None
+    config_module._config = old_config
+    config_module._snapshot = old_snapshot
+    config_module._current_config_file = old_file
+
+
+def test_warning_bits_unique() -> None:
+    assert len(set(WARNING_BITS.values())) == len(WarningID)
+
+
+def test_all_warnings_enabled_by_default() -> None:
+    for warning_id in WarningID:
+        assert is_warning_enabled(warning_id)
+
+
+def test_disabled_warning_from_file(tmp_path: Path) -> None:
+    path = tmp_path / "tony-config.json"
+    path.write_text(json.dumps({"warnings": {"emptyUnregister": False}}), encoding="utf-8")
+
+    assert is_warning_enabled(WarningID.EMPTY_UNREGISTER)
+    load_config_from_file(path)
+
+    assert not is_warning_enabled(WarningID.EMPTY_UNREGISTER)
+    assert is_warning_enabled(WarningID.UNKNOWN_COMMAND)
+    assert not get_enabled_warnings() & WARNING_BITS[WarningID.EMPTY_UNREGISTER]
+
+
+def test_snapshot_swapped_on_load(tmp_path: Path) -> None:
+    path = tmp_path / "tony-config.json"
+    path.write_text(
+        json.dumps({"actionScope": "client", "allowedSchemaKeys": ["format"], "actionResultTimeout": 0}),
+        encoding="utf-8",
+    )
+    old_snapshot = config_snapshot()
+
+    load_config_from_file(path)
+
+    snapshot = config_snapshot()
+    assert snapshot is not old_snapshot
+    assert snapshot.action_scope == ActionScope.CLIENT
+    assert snapshot.allowed_schema_keys == frozenset({"format"})
+    assert snapshot.action_result_timeout is None
+    # Handlers holding the old snapshot keep seeing the old configuration
+    assert old_snapshot.action_scope == ActionScope.GLOBAL
+    assert old_snapshot.allowed_schema_keys == frozenset()
+
+
+def test_invalid_in_flight_window_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "tony-config.json"
+    path.write_text(json.dumps({"maxInFlightActions": 0}), encoding="utf-8")
+    old_snapshot = config_snapshot()
+
+    with pytest.raises(ValueError, match="maxInFlightActions"):
+        load_config_from_file(path)
+    assert config_snapshot() is old_snapshot
+
+
+@pytest.mark.parametrize(
+    ("key", "value"),
+    [
+        ("maxConcurrentForcedActions", 0),
+        ("retryMaxAttempts", -1),
+        ("retryBaseDelay", -0.5),
+        ("retryMaxDelay", -1),
+        ("circuitBreakerThreshold", 0),
+        ("circuitBreakerCooldown", -1),
+        ("slowCallbackThreshold", -0.1),
+        ("driverRate", -1),
+        ("driverRate", float("nan")),
+        ("actionResultTimeout", -1),
+        ("port", -1),
+        ("port", 65536),
+        ("driverWeights", {"jerald": -1}),
+    ],
+)
+def test_out_of_range_value_rejected(tmp_path: Path, key: str, value: object) -> None:
+    path = tmp_path / "tony-config.json"
+    path.write_text(json.dumps({key: value}), encoding="utf-8")
+    old_snapshot = config_snapshot()
+
+    with pytest.raises(ValueError, match=key):
+        load_config_from_file(path)
+    assert config_snapshot() is old_snapshot
+
+
+def test_minimum_values_match_schema() -> None:
+    schema = json.loads((Path(__file__).parents[1] / "tony-config.schema.json").read_text(encoding="utf-8"))
+    minimums = {key: value["minimum"] for key, value in schema["properties"].items() if "minimum" in value}
+    assert minimums == {config_key(name): minimum for name, minimum in MINIMUM_VALUES.items()}
+    assert schema["properties"]["port"]["maximum"] == MAX_PORT
+
+
+def test_snapshot_is_immutable() -> None:
+    with pytest.raises(AttributeError):
+        config_snapshot().max_in_flight_actions = 2  # type: ignore[misc]
+
+
+def test_snapshot_warnings_without_defaults() -> None:
+    snapshot = ConfigSnapshot.compile(config_module.Config(warnings={WarningID.SLOW_SCHEMA: False}))
+    assert not snapshot.is_warning_enabled(WarningID.SLOW_SCHEMA)
+    assert snapshot.is_warning_enabled(WarningID.UNKNOWN_COMMAND)
+
+
+def test_changed_fields_on_reload(tmp_path: Path) -> None:
+    path = tmp_path / "tony-config.json"
+    path.write_text(json.dumps({"port": 8001, "warnings": {"slowSchema": False}}), encoding="utf-8")
+    assert load_config_from_file(path) == {"port", "warnings"}
+
+    path.write_text(
+        json.dumps({"port": 8001, "warnings": {"slowSchema": False}, "logColorTheme": {"default": "#FFFFFF"}}),
+        encoding="utf-8",
+    )
+    assert load_config_from_file() == {"log_color_theme"}
+    assert load_config_from_file() == frozenset()
+
+
+def test_theme_caches_kept_if_unchanged(tmp_path: Path) -> None:
+    path = tmp_path / "tony-config.json"
+    path.write_text(json.dumps({"port": 8001}), encoding="utf-8")
+    load_config_from_file(path)
+    cached = {EditorThemeColor.DEFAULT: "#123456"}
+    config_module._editor_theme_colors = cached
+
+    path.write_text(json.dumps({"port": 8002}), encoding="utf-8")
+    load_config_from_file()
+    assert config_module._editor_theme_colors is cached
+
+    path.write_text(json.dumps({"port": 8002, "editorColorTheme": {"default": "#000000"}}), encoding="utf-8")
+    load_config_from_file()
+    assert config_module._editor_theme_colors is None
+
+
+def test_config_key() -> None:
+    assert config_key("max_in_flight_actions") == "maxInFlightActions"
+    assert config_key("port") == "port"
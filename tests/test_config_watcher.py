@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import os
+import sys
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from neuro_api_tony.config_watcher import ConfigWatcher
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator
+    from pathlib import Path
+
+
+@pytest.fixture(
+    params=[
+        False,
+        pytest.param(True, marks=pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux only")),
+    ],
+    ids=["polling", "inotify"],
+)
+def make_watcher(request: pytest.FixtureRequest) -> Generator[Callable[[Callable[[], Path | None]], ConfigWatcher]]:
+    """Create watchers that poll or use inotify, and close them afterwards."""
+    watchers: list[ConfigWatcher] = []
+
+    def make(path_getter: Callable[[], Path | None]) -> ConfigWatcher:
+        watcher = ConfigWatcher(path_getter, use_inotify=request.param)
+        watchers.append(watcher)
+        return watcher
+
+    yield make
+    for watcher in watchers:
+        watcher.close()
+
+
+def touch(path: Path, text: str, mtime_ns: int) -> None:
+    """Write a file and set its modification time, since writes may land in the same clock tick."""
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_detects_changes(tmp_path: Path, make_watcher: Callable[[Callable[[], Path | None]], ConfigWatcher]) -> None:
+    path = tmp_path / "tony-config.json"
+    touch(path, "{}", 1_000_000_000)
+    watcher = make_watcher(lambda: path)
+
+    assert not watcher.poll()
+    touch(path, '{"port": 8001}', 2_000_000_000)
+    assert watcher.poll()
+    assert not watcher.poll()
+
+
+def test_missing_file_is_not_a_change(
+    tmp_path: Path,
+    make_watcher: Callable[[Callable[[], Path | None]], ConfigWatcher],
+) -> None:
+    path = tmp_path / "tony-config.json"
+    touch(path, "{}", 1_000_000_000)
+    watcher = make_watcher(lambda: path)
+
+    path.unlink()
+    assert not watcher.poll()
+    touch(path, "{}", 1_000_000_000)
+    assert not watcher.poll()
+    touch(path, "{ }", 3_000_000_000)
+    assert watcher.poll()
+
+
+def test_other_file_is_not_a_change(
+    tmp_path: Path,
+    make_watcher: Callable[[Callable[[], Path | None]], ConfigWatcher],
+) -> None:
+    first = tmp_path / "tony-config.json"
+    second = tmp_path / ".tonyrc"
+    touch(first, "{}", 1_000_000_000)
+    touch(second, "{}", 2_000_000_000)
+    current = first
+    watcher = make_watcher(lambda: current)
+
+    current = second
+    assert not watcher.poll()
+    touch(second, "{ }", 3_000_000_000)
+    assert watcher.poll()
+
+
+def test_reset(tmp_path: Path, make_watcher: Callable[[Callable[[], Path | None]], ConfigWatcher]) -> None:
+    path = tmp_path / "tony-config.json"
+    touch(path, "{}", 1_000_000_000)
+    watcher = make_watcher(lambda: path)
+
+    touch(path, '{"port": 8001}', 2_000_000_000)
+    watcher.reset()
+    assert not watcher.poll()
+
+
+def test_no_file(make_watcher: Callable[[Callable[[], Path | None]], ConfigWatcher]) -> None:
+    assert not make_watcher(lambda: None).poll()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux only")
+def test_inotify_skips_untouched_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "tony-config.json"
+    touch(path, "{}", 1_000_000_000)
+    watcher = ConfigWatcher(lambda: path, use_inotify=True)
+    try:
+        assert watcher._inotify is not None
+        stats: list[object] = []
+        stat = os.stat
+
+        def counting_stat(*args: Any, **kwargs: Any) -> os.stat_result:
+            stats.append(args)
+            return stat(*args, **kwargs)
+
+        monkeypatch.setattr(os, "stat", counting_stat)
+        touch(tmp_path / "other.json", "{}", 2_000_000_000)
+        assert not watcher.poll()
+        assert stats == []
+        touch(path, "{ }", 3_000_000_000)
+        assert watcher.poll()
+    finally:
+        watcher.close()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from neuro_api_tony.config import DriverStrategy
+from neuro_api_tony.driver import ActionDriver
+from neuro_api_tony.model import NeuroAction
+
+if TYPE_CHECKING:
+    import random
+
+    from conftest import FakeClock
+
+ACTIONS = [
+    NeuroAction("jump", "Jump", None, 1, "Game 1"),
+    NeuroAction("walk", "Walk", None, 1, "Game 1"),
+    NeuroAction("shoot", "Shoot", None, 2, "Game 2"),
+]
+
+
+def test_round_robin(rng: random.Random) -> None:
+    driver = ActionDriver(DriverStrategy.ROUND_ROBIN, 0, rng=rng)
+    assert [driver.select(ACTIONS) for _ in range(4)] == [*ACTIONS, ACTIONS[0]]
+
+
+def test_client_filter(rng: random.Random) -> None:
+    driver = ActionDriver(DriverStrategy.UNIFORM, 0, client_id=2, rng=rng)
+    assert {driver.select(ACTIONS) for _ in range(20)} == {ACTIONS[2]}
+    assert ActionDriver(DriverStrategy.UNIFORM, 0, client_id=3, rng=rng).select(ACTIONS) is None
+
+
+def test_weighted(rng: random.Random) -> None:
+    driver = ActionDriver(DriverStrategy.WEIGHTED, 0, {"jump": 0, "walk": 0, "shoot": 5}, rng=rng)
+    assert {driver.select(ACTIONS) for _ in range(20)} == {ACTIONS[2]}
+    driver.weights["shoot"] = 0
+    assert driver.select(ACTIONS) is None
+
+
+def test_due_paces_rate(clock: FakeClock) -> None:
+    driver = ActionDriver(DriverStrategy.UNIFORM, 10, clock=clock)
+    assert driver.due() == 0
+    clock.now += 0.25
+    assert driver.due() == 2
+    clock.now += 0.1
+    assert driver.due() == 1
+
+    # Does not catch up on more than a second worth of actions
+    clock.now += 100
+    assert driver.due() == 10
+
+
+def test_due_without_rate(clock: FakeClock) -> None:
+    driver = ActionDriver(DriverStrategy.UNIFORM, 0, clock=clock)
+    clock.now += 10
+    assert driver.due() == 0
+
+
+def test_results(clock: FakeClock) -> None:
+    driver = ActionDriver(DriverStrategy.UNIFORM, 0, clock=clock)
+    driver.record_sent("action_0")
+    driver.record_sent("action_1")
+    clock.now += 0.1
+    assert driver.record_result("action_0", success=True)
+    assert driver.record_result("action_1", success=False)
+    assert not driver.record_result("action_2", success=True)
+    assert not driver.record_result(None, success=True)
+    assert driver.pending == 0
+    assert driver.summary().startswith("2 actions sent (20.00/s), 0 waiting for their result, 50.0% failed, latency ")
+
+
+def test_give_back(clock: FakeClock) -> None:
+    driver = ActionDriver(DriverStrategy.UNIFORM, 10, clock=clock)
+    clock.now += 0.5
+    assert driver.due() == 5
+    driver.give_back(3)
+    assert driver.due() == 3
+
+    # Not more than the burst is kept
+    driver.give_back(100)
+    assert driver.due() == 10
+
+
+def test_metrics_per_run(clock: FakeClock) -> None:
+    driver = ActionDriver(DriverStrategy.UNIFORM, 0, clock=clock)
+    driver.record_sent("action_0")
+    assert driver.record_result("action_0", success=False)
+
+    driver = ActionDriver(DriverStrategy.UNIFORM, 0, clock=clock)
+    assert driver.latency.count == 0
+    assert driver.results.misses == 0
+    assert driver.summary().endswith("latency no data")
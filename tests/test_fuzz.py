@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import jsonschema
+import pytest
+
+from neuro_api_tony.fuzz import FUZZ_NESTING_DEPTH, FUZZ_OVERSIZE_LENGTH, MUTATIONS, Fuzzer, load_corpus
+
+if TYPE_CHECKING:
+    import random
+    from pathlib import Path
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "maxLength": 20},
+        "count": {"type": "integer", "minimum": 0},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["name", "count", "tags"],
+}
+DATA = json.dumps({"name": "tony", "count": 3, "tags": ["a", "b"]})
+
+
+def test_mutations_are_invalid(rng: random.Random) -> None:
+    fuzzer = Fuzzer(None, rng=rng)
+    seen = set()
+    for _ in range(200):
+        mutation, data = fuzzer.mutate(SCHEMA, DATA)
+        seen.add(mutation)
+        if mutation == "malformedJson":
+            with pytest.raises(json.JSONDecodeError):
+                json.loads(data)
+        elif mutation == "deepNesting":
+            assert "[" * FUZZ_NESTING_DEPTH + "]" * FUZZ_NESTING_DEPTH in data
+        else:
+            assert not jsonschema.Draft7Validator(SCHEMA).is_valid(json.loads(data))
+            if mutation == "oversizeString":
+                assert "A" * FUZZ_OVERSIZE_LENGTH in data
+    assert seen == set(MUTATIONS)
+
+
+def test_missing_required_only_removes_required(rng: random.Random) -> None:
+    schema = {**SCHEMA, "required": ["name"]}
+    fuzzer = Fuzzer(None, rng=rng)
+    removed = [
+        json.loads(data)
+        for mutation, data in (fuzzer.mutate(schema, DATA) for _ in range(100))
+        if mutation == "missingRequired"
+    ]
+    assert removed
+    assert all(value == {"count": 3, "tags": ["a", "b"]} for value in removed)
+
+
+def test_missing_required_skipped_without_required(rng: random.Random) -> None:
+    schema = {key: value for key, value in SCHEMA.items() if key != "required"}
+    fuzzer = Fuzzer(None, rng=rng)
+    mutations = {fuzzer.mutate(schema, DATA)[0] for _ in range(200)}
+    assert mutations == set(MUTATIONS) - {"missingRequired"}
+
+
+def test_mutate_without_schema(rng: random.Random) -> None:
+    mutation, data = Fuzzer(None, rng=rng).mutate(None, None)
+    assert mutation == "unexpectedData"
+    json.loads(data)
+
+
+def test_result_correlation(rng: random.Random) -> None:
+    fuzzer = Fuzzer(None, rng=rng)
+    fuzzer.record_sent("action_0", 1, "jump", "typeViolation", "{}")
+    fuzzer.record_sent("action_1", 1, "jump", "typeViolation", "{}")
+    rejected = fuzzer.rejected.value
+    accepted = fuzzer.accepted.value
+
+    case = fuzzer.record_result("action_0", False)
+    assert case is not None
+    assert case.action == "jump"
+    assert fuzzer.record_result("action_1", True) is not None
+    assert fuzzer.record_result("action_0", False) is None
+    assert fuzzer.record_result(None, False) is None
+    assert fuzzer.rejected.value == rejected + 1
+    assert fuzzer.accepted.value == accepted + 1
+
+
+def test_hangs_and_crashes_are_recorded(tmp_path: Path, rng: random.Random) -> None:
+    corpus = tmp_path / "corpus.jsonl"
+    fuzzer = Fuzzer(corpus, rng=rng)
+    fuzzer.record_sent("action_0", 1, "jump", "typeViolation", '{"height": "high"}')
+    fuzzer.record_sent("action_1", 2, "walk", "malformedJson", '{"dist')
+    fuzzer.record_sent("action_2", 2, "walk", "oversizeString", '"AAAA"')
+    assert fuzzer.record_result("action_2", False) is not None
+
+    assert fuzzer.record_timeout("action_3") is None
+    case = fuzzer.record_timeout("action_0")
+    assert case is not None
+    assert case.action == "jump"
+    assert [case.action for case in fuzzer.on_disconnect(2)] == ["walk"]
+    assert fuzzer.on_disconnect(1) == []
+
+    assert load_corpus(corpus) == [
+        {"action": "jump", "mutation": "typeViolation", "outcome": "hang", "data": '{"height": "high"}'},
+        {"action": "walk", "mutation": "malformedJson", "outcome": "crash", "data": '{"dist'},
+    ]
+
+
+def test_corpus_write_error_reported(tmp_path: Path, rng: random.Random) -> None:
+    fuzzer = Fuzzer(tmp_path / "missing" / "corpus.jsonl", rng=rng)
+    errors: list[OSError] = []
+    fuzzer.on_corpus_error = errors.append
+    fuzzer.record_sent("action_0", 1, "jump", "typeViolation", "{}")
+
+    assert [case.action for case in fuzzer.on_disconnect(1)] == ["jump"]
+    assert len(errors) == 1
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET = 3.0
+"""Seconds importing the CLI module may take, generous enough for slow CI machines."""
+
+LAZY_MODULES = ("faker", "jsf", "json_source_map", "jsonschema", "requests", "semver", "wx.stc")
+"""Slow modules that are only needed after startup, and must not be imported before the window appears."""
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Import a module in a new interpreter and return the cumulative import time of every module in microseconds."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_startup_import_time() -> None:
+    times = import_times("neuro_api_tony.cli")
+
+    eager = sorted(module for module in times if module.split(".")[0] in LAZY_MODULES or module in LAZY_MODULES)
+    assert not eager, f"Imported at startup, should be imported on first use: {eager}"
+    assert times["neuro_api_tony.cli"] / 1_000_000 < IMPORT_TIME_BUDGET
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from neuro_api_tony.inflight import InFlightTable
+from neuro_api_tony.metrics import metrics
+
+if TYPE_CHECKING:
+    from conftest import FakeClock
+
+
+@pytest.fixture
+def table(clock: FakeClock) -> InFlightTable:
+    return InFlightTable(clock)
+
+
+def test_complete_measures_latency(table: InFlightTable, clock: FakeClock) -> None:
+    table.add(1, "tony_action_0", "jerald")
+    clock.now += 0.25
+    result = table.complete(1, "tony_action_0")
+    assert result is not None
+    action, latency = result
+    assert action.name == "jerald"
+    assert latency == pytest.approx(250)
+    assert len(table) == 0
+    assert metrics().histogram("action_latency.action.jerald", "ms").count >= 1
+    assert metrics().histogram("action_latency.client.1", "ms").count >= 1
+
+
+def test_complete_unknown_id(table: InFlightTable) -> None:
+    table.add(1, "tony_action_0", "jerald")
+    assert table.complete(1, "tony_action_1") is None
+    assert table.complete(2, "tony_action_0") is None
+    assert len(table) == 1
+
+
+def test_expire(table: InFlightTable, clock: FakeClock) -> None:
+    table.add(1, "a", "jerald", timeout=5)
+    table.add(1, "b", "jerald", timeout=10)
+    table.add(2, "c", "jerald")
+    assert table.next_deadline() == 105
+    assert table.expire() == []
+
+    clock.now += 6
+    assert [action.id_ for action in table.expire()] == ["a"]
+    assert table.expire() == []
+    assert table.next_deadline() == 110
+
+    # Late results are still matched
+    result = table.complete(1, "a")
+    assert result is not None
+    assert result[0].timed_out
+
+
+def test_count_and_remove_client(table: InFlightTable) -> None:
+    table.add(1, "a", "jerald")
+    table.add(1, "b", "jerald")
+    table.add(2, "a", "jerald")
+    assert table.count(1) == 2
+    assert table.count(2) == 1
+    table.remove_client(1)
+    assert table.count(1) == 0
+    assert len(table) == 1
+
+
+def test_remove_client_drops_latency_metric(table: InFlightTable) -> None:
+    table.add(7, "a", "jerald")
+    table.complete(7, "a")
+    assert "action_latency.client.7" in metrics().snapshot()
+    table.remove_client(7)
+    assert "action_latency.client.7" not in metrics().snapshot()
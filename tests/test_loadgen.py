@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import orjson
+import pytest
+import trio
+import trio.testing
+
+from neuro_api_tony.loadgen import LoadProfile, LoadReport, LoadStats, SimulatedGame, main, make_action_schema
+
+if TYPE_CHECKING:
+    from conftest import FakeTony
+
+
+def test_make_action_schema() -> None:
+    schema = make_action_schema(7)
+    assert schema["type"] == "object"
+    assert len(schema["properties"]) == 7
+    assert schema["required"] == [f"property_{index}" for index in range(7)]
+    assert make_action_schema(0)["properties"] == {}
+
+
+@pytest.mark.trio
+async def test_simulated_game(autojump_clock: trio.testing.MockClock, tony: FakeTony) -> None:
+    stats = LoadStats()
+    profile = LoadProfile(actions=2, schema_properties=3, context_rate=2, force_interval=5)
+    game = SimulatedGame("Load Test 0", profile, stats, clock=trio.current_time)
+
+    with trio.move_on_after(10):
+        await game.run(tony.send, tony.receive)
+
+    assert tony.commands[:2] == ["startup", "actions/register"]
+    assert tony.commands.count("context") == 20
+    assert tony.commands.count("actions/force") == 2
+    assert tony.commands.count("action/result") == 2
+    assert stats.actions_answered == 2
+    assert stats.sent == len(tony.commands)
+    assert stats.received == 3
+    assert stats.startup_latency.count == 1
+    assert stats.force_latency.count == 2
+
+
+@pytest.mark.trio
+async def test_unanswered_force_is_not_repeated(autojump_clock: trio.testing.MockClock) -> None:
+    commands: list[str] = []
+
+    async def send(data: str) -> None:
+        commands.append(orjson.loads(data)["command"])
+
+    profile = LoadProfile(actions=1, context_rate=0, force_interval=1)
+    game = SimulatedGame("Load Test 0", profile, LoadStats(), clock=trio.current_time)
+    with trio.move_on_after(10):
+        await game.run(send, trio.sleep_forever)
+
+    assert commands == ["startup", "actions/register", "actions/force"]
+
+
+def test_report_format() -> None:
+    stats = LoadStats()
+    stats.connected = 10
+    stats.sent = 1000
+    stats.received = 500
+    for latency in (1.0, 2.0, 3.0):
+        stats.startup_latency.observe(latency)
+
+    row = LoadReport(10, stats, 10.0).format()
+    assert row.split() == ["10", "10", "0", "100", "50", "2.0/3.0/3.0", "-"]
+    assert len(LoadReport.header()) == len(row)
+
+
+def test_main_rejects_invalid_client_counts() -> None:
+    with pytest.raises(SystemExit):
+        main(["--clients", "1,zero"])
+    with pytest.raises(SystemExit):
+        main(["--clients", "0"])
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import orjson
+import pytest
+import trio
+from neuro_api.command import Action, actions_register_command, context_command, startup_command
+from trio_websocket import ConnectionClosed
+
+from neuro_api_tony.api import NeuroAPI
+from neuro_api_tony.loopback import LOOPBACK_REMOTE, connect_loopback, open_loopback
+
+
+@pytest.mark.trio
+async def test_messages_pass_both_ways() -> None:
+    a, b = open_loopback()
+    await a.send_message("to b")
+    await b.send_message(b"to a")
+    assert await b.get_message() == "to b"
+    assert await a.get_message() == b"to a"
+    assert a.remote == LOOPBACK_REMOTE
+    assert a.CONNECTION_ID != b.CONNECTION_ID
+
+
+@pytest.mark.trio
+async def test_close_delivers_remaining_messages_then_raises() -> None:
+    a, b = open_loopback()
+    await a.send_message("last")
+    await a.aclose(1001, "going away")
+
+    assert await b.get_message() == "last"
+    with pytest.raises(ConnectionClosed):
+        await b.get_message()
+    with pytest.raises(ConnectionClosed):
+        await b.send_message("too late")
+    with pytest.raises(ConnectionClosed) as exc_info:
+        await a.send_message("closed")
+    assert exc_info.value.reason is not None
+    assert exc_info.value.reason.code == 1001
+
+
+@pytest.mark.trio
+async def test_client_attaches_to_api_without_sockets() -> None:
+    api = NeuroAPI(Mock())
+    api.on_startup = Mock()
+    api.on_context = Mock()
+    api.on_actions_register = Mock()
+    api.on_client_disconnect = Mock()
+
+    async with connect_loopback(api) as client:
+        await client.send_message(startup_command("Test Game"))
+        acknowledgement = orjson.loads(await client.get_message())
+        assert acknowledgement["command"] == "startup"
+        assert acknowledgement["data"]["session"]["sessionId"].startswith(LOOPBACK_REMOTE)
+
+        await client.send_message(context_command("Test Game", "Hello"))
+        await client.send_message(actions_register_command("Test Game", [Action("jump", "Jump.")]))
+        await trio.testing.wait_all_tasks_blocked()
+        assert api.clients_connected == 1
+
+    await trio.testing.wait_all_tasks_blocked()
+    assert api.clients_connected == 0
+    api.on_startup.assert_called_once()
+    assert api.on_context.call_args.args[1].message == "Hello"
+    assert [action.name for action in api.on_actions_register.call_args.args[1].actions] == ["jump"]
+    api.on_client_disconnect.assert_called_once()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from neuro_api_tony.metrics import Histogram, Meter, Metrics, Ratio
+
+
+def test_registry_returns_same_metric() -> None:
+    registry = Metrics()
+    counter = registry.counter("jerald")
+    counter.inc(2)
+    assert registry.counter("jerald") is counter
+    assert registry.snapshot() == {"jerald": "2"}
+
+
+def test_registry_type_mismatch() -> None:
+    registry = Metrics()
+    registry.counter("jerald")
+    with pytest.raises(TypeError, match=r"^Metric 'jerald' is a Counter, not a Gauge\.$"):
+        registry.gauge("jerald")
+
+
+def test_gauge_peak() -> None:
+    gauge = Metrics().gauge("depth")
+    gauge.set(5)
+    gauge.set(2)
+    assert gauge.format() == "2 (peak 5)"
+
+
+def test_ratio() -> None:
+    ratio = Ratio("hits")
+    assert ratio.ratio == 0.0
+    ratio.hit()
+    ratio.hit()
+    ratio.hit()
+    ratio.miss()
+    assert ratio.ratio == 0.75
+    assert ratio.format() == "75.0% (3/4)"
+
+
+def test_meter_rate(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    meter = Meter("refills", window=10)
+    meter.mark(5)
+    now += 1
+    meter.mark(5)
+    assert meter.count == 10
+    assert meter.rate() == 1.0
+
+    now += 9
+    assert meter.rate() == 0.5
+    now += 1
+    assert meter.rate() == 0.0
+    assert meter.format() == "10 (0.00/s)"
+
+
+def test_histogram_percentiles() -> None:
+    histogram = Histogram("latency", unit="ms")
+    assert histogram.percentile(50) is None
+    assert histogram.format() == "no data"
+    for value in range(1, 101):
+        histogram.observe(value)
+    assert histogram.percentile(50) == 50
+    assert histogram.percentile(95) == 95
+    assert histogram.percentile(100) == 100
+    assert histogram.format() == "p50 50.0ms, p95 95.0ms, p99 99.0ms (n=100)"
+
+
+def test_histogram_keeps_recent_values() -> None:
+    histogram = Histogram("latency", size=3)
+    for value in (100, 1, 2, 3):
+        histogram.observe(value)
+    assert histogram.percentile(100) == 3
+    assert histogram.count == 4
+
+
+def test_remove() -> None:
+    registry = Metrics()
+    registry.counter("jerald").inc()
+    registry.remove("jerald")
+    registry.remove("unknown")
+    assert registry.counter("jerald").value == 0
@@ -88,9 +88,24 @@ def test_has_action(model: TonyModel) -> None:
     )
     model.add_action(action)
     assert model.has_action("test_action")
+    assert model.has_action("test_action", client_id=0)
+    assert not model.has_action("test_action", client_id=1)
     assert not model.has_action("non_existent_action")
 
 
+def test_get_actions(model: TonyModel) -> None:
+    """Test getting actions by name and client_id."""
+    action1 = NeuroAction(name="action", description="", schema=None, client_id=0, game="game_0")
+    action2 = NeuroAction(name="action", description="", schema=None, client_id=1, game="game_1")
+    action3 = NeuroAction(name="other", description="", schema=None, client_id=1, game="game_1")
+    for action in (action1, action2, action3):
+        model.add_action(action)
+    assert model.get_actions() == [action1, action2, action3]
+    assert model.get_actions(name="action") == [action1, action2]
+    assert model.get_actions(client_id=1) == [action2, action3]
+    assert model.get_actions(name="other", client_id=0) == []
+
+
 def test_get_action_by_name(model: TonyModel) -> None:
     """Test getting an action by name."""
     action = NeuroAction(
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import orjson
+import pytest
+import trio
+from trio_websocket import ConnectionClosed
+
+from neuro_api_tony.replay import (
+    Replayer,
+    ReplaySide,
+    TraceMessage,
+    load_session,
+    main,
+    normalize,
+    replay_corpus,
+)
+from neuro_api_tony.trace import TraceWriter
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from conftest import FakeTony
+
+
+def message(t: float, inbound: bool, **data: object) -> TraceMessage:
+    """Return a recorded message with the given JSON content."""
+    return TraceMessage(t, inbound, orjson.dumps(data).decode("utf-8"))
+
+
+SESSION = [
+    message(0.0, True, command="startup", game="Test"),
+    message(0.1, False, command="startup", data={"session": {"sessionId": "recorded-session"}}),
+    message(1.0, True, command="actions/register", game="Test", data={"actions": [{"name": "jump"}]}),
+    message(1.5, True, command="actions/force", game="Test", data={"query": "Jump", "action_names": ["jump"]}),
+    message(2.0, False, command="action", data={"id": "recorded-id", "name": "jump"}),
+    message(5.0, True, command="action/result", game="Test", data={"id": "recorded-id", "success": True}),
+]
+
+
+def test_normalize_ignores_session_specific_ids() -> None:
+    assert normalize({"command": "action", "data": {"id": "a", "name": "jump"}}) == normalize(
+        {"command": "action", "data": {"id": "b", "name": "jump"}},
+    )
+    assert normalize({"command": "action", "data": {"id": "a", "name": "jump", "data": '{"x": 1}'}}) == normalize(
+        {"command": "action", "data": {"id": "b", "name": "jump", "data": '{"x": 2}'}},
+    )
+    assert normalize({"command": "x", "data": {"session": {"sessionId": "a", "ok": 1}}}) == {
+        "command": "x",
+        "data": {"session": {"ok": 1}},
+    }
+    assert normalize({"command": "action/result", "data": {"id": "a"}}) != normalize(
+        {"command": "action/result", "data": {"id": "b"}},
+    )
+
+
+def test_load_session_keeps_one_client(tmp_path: Path) -> None:
+    path = tmp_path / "trace.jsonl"
+    writer = TraceWriter(path)
+    writer.record(2, True, '{"command": "startup", "game": "A"}')
+    writer.record(3, True, '{"command": "startup", "game": "B"}')
+    writer.record(2, False, '{"command": "action"}')
+    writer.close()
+
+    first = load_session(path)
+    assert [(entry.inbound, entry.data) for entry in first] == [
+        (True, '{"command": "startup", "game": "A"}'),
+        (False, '{"command": "action"}'),
+    ]
+    assert [entry.data for entry in load_session(path, 3)] == ['{"command": "startup", "game": "B"}']
+
+
+def test_load_session_keeps_one_run(tmp_path: Path) -> None:
+    path = tmp_path / "trace.jsonl"
+    for game in ("A", "B"):
+        writer = TraceWriter(path)
+        writer.record(0, True, f'{{"command": "startup", "game": "{game}"}}')
+        writer.close()
+
+    assert [entry.data for entry in load_session(path)] == ['{"command": "startup", "game": "B"}']
+    assert [entry.data for entry in load_session(path, session=0)] == ['{"command": "startup", "game": "A"}']
+
+
+@pytest.mark.trio
+async def test_game_side_replay_maps_action_ids(tony: FakeTony) -> None:
+    report = await Replayer(SESSION, ReplaySide.GAME, speed=0).run(tony.send, tony.receive)
+
+    assert report.ok
+    assert (report.sent, report.received) == (4, 2)
+    assert tony.received[-1] == {
+        "command": "action/result",
+        "game": "Test",
+        "data": {"id": "live-1", "success": True},
+    }
+
+
+@pytest.mark.trio
+async def test_speed_scales_recorded_delays(autojump_clock: trio.testing.MockClock, tony: FakeTony) -> None:
+    start = trio.current_time()
+    report = await Replayer(SESSION, ReplaySide.GAME, speed=10, clock=trio.current_time).run(tony.send, tony.receive)
+
+    assert report.ok
+    assert trio.current_time() - start == pytest.approx(0.5)
+    assert report.duration == pytest.approx(0.5)
+
+
+@pytest.mark.trio
+async def test_missing_and_different_responses_are_reported(autojump_clock: trio.testing.MockClock) -> None:
+    session = [
+        message(0.0, False, command="action", data={"id": "a", "name": "jump"}),
+        message(0.0, True, command="action/result", game="Test", data={"id": "a", "success": True}),
+        message(0.0, True, command="context", game="Test", data={"message": "hi", "silent": True}),
+    ]
+    send_channel, receive_channel = trio.open_memory_channel[str](10)
+    sent: list[str | bytes] = []
+
+    async def send(data: str | bytes) -> None:
+        sent.append(data)
+        await send_channel.send(
+            orjson.dumps({"command": "action/result", "game": "Test", "data": {"id": "a", "success": False}}).decode(
+                "utf-8",
+            ),
+        )
+
+    report = await Replayer(session, ReplaySide.TONY, speed=0, timeout=1).run(send, receive_channel.receive)
+
+    assert sent == [session[0].data]
+    assert not report.ok
+    assert [(mismatch.position, mismatch.actual is None) for mismatch in report.mismatches] == [(1, False), (2, True)]
+
+
+@pytest.mark.trio
+async def test_corpus_outcomes(autojump_clock: trio.testing.MockClock) -> None:
+    entries = [
+        {"action": "jump", "mutation": "wrong_type", "data": "1"},
+        {"action": "jump", "mutation": "missing", "data": "{}"},
+        {"action": "jump", "mutation": "nested", "data": "[[[]]]"},
+    ]
+    to_replayer, from_game = trio.open_memory_channel[str](10)
+    await to_replayer.send(
+        orjson.dumps({"command": "actions/register", "data": {"actions": [{"name": "jump"}]}}).decode("utf-8"),
+    )
+    sent: list[dict[str, object]] = []
+
+    async def send(data: str | bytes) -> None:
+        action = orjson.loads(data)
+        sent.append(action)
+        if action["data"]["data"] == "1":
+            result = {"command": "action/result", "data": {"id": action["data"]["id"], "success": False}}
+            await to_replayer.send(orjson.dumps(result).decode("utf-8"))
+
+    results = await replay_corpus(entries, send, from_game.receive, result_timeout=1)
+
+    assert [result.outcome for result in results] == ["rejected", "hang", "hang"]
+    assert [action["data"] for action in sent] == [
+        {"id": f"corpus_{index}", "name": "jump", "data": entry["data"]} for index, entry in enumerate(entries)
+    ]
+
+
+@pytest.mark.trio
+async def test_corpus_skips_after_crash() -> None:
+    entries = [{"action": "jump", "mutation": "m", "data": "1"}] * 2
+
+    async def send(data: str | bytes) -> None:
+        raise ConnectionClosed(None)
+
+    async def receive() -> str:
+        raise ConnectionClosed(None)
+
+    results = await replay_corpus(entries, send, receive, result_timeout=1)
+
+    assert [result.outcome for result in results] == ["crash", "skipped"]
+
+
+def test_main_rejects_negative_speed(tmp_path: Path) -> None:
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "trace.jsonl"), "--speed", "-1"])
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from neuro_api_tony.retry import CircuitBreaker, CircuitState, RetryPolicy, backoff_delay
+
+if TYPE_CHECKING:
+    import random
+
+    from conftest import FakeClock
+
+
+@pytest.mark.parametrize(("attempt", "upper"), [(1, 0.5), (2, 1.0), (3, 2.0), (10, 5.0)])
+def test_backoff_delay(attempt: int, upper: float, rng: random.Random) -> None:
+    for _ in range(100):
+        delay = backoff_delay(attempt, 0.5, 5.0, rng)
+        assert upper / 2 <= delay <= upper
+
+
+def test_circuit_breaker(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(threshold=3, cooldown=10, clock=clock)
+    assert not breaker.record_failure(1)
+    assert not breaker.record_failure(1)
+    assert breaker.record_failure(1)
+    assert breaker.state(1) == CircuitState.OPEN
+    assert not breaker.allow(1)
+    assert breaker.allow(2)
+
+    clock.now += 10
+    assert breaker.state(1) == CircuitState.HALF_OPEN
+    assert breaker.allow(1)
+
+    # Failing again while half-open opens the circuit again right away
+    assert breaker.record_failure(1)
+    assert breaker.state(1) == CircuitState.OPEN
+
+    breaker.record_success(1)
+    assert breaker.state(1) == CircuitState.CLOSED
+
+
+def test_retry_policy_max_attempts(rng: random.Random) -> None:
+    policy = RetryPolicy(3, 0.5, 5.0, CircuitBreaker(100, 10), rng)
+    assert policy.on_failure(1, 1) is not None
+    assert policy.on_failure(1, 2) is not None
+    assert policy.on_failure(1, 3) is None
+    assert policy.exhausted.value >= 1
+
+
+def test_retry_policy_unlimited_attempts(rng: random.Random) -> None:
+    policy = RetryPolicy(0, 0.5, 5.0, CircuitBreaker(100, 10), rng)
+    assert policy.on_failure(1, 50) is not None
+
+
+def test_retry_policy_circuit_breaker(rng: random.Random, clock: FakeClock) -> None:
+    policy = RetryPolicy(0, 0.5, 5.0, CircuitBreaker(2, 10, clock), rng)
+    assert policy.on_failure(1, 1) is not None
+    assert policy.on_failure(1, 2) is None
+    assert policy.on_failure(2, 1) is not None
+
+    clock.now += 10
+    policy.on_success(1, 3)
+    assert policy.on_failure(1, 1) is not None
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import jsonschema
+import pytest
+
+from neuro_api_tony.samples import (
+    FALLBACK_MAX_DEPTH,
+    SAMPLE_TIME_BUDGET,
+    SampleGenerator,
+    SampleGeneratorCache,
+    SamplePool,
+    generate_fallback,
+    schema_key,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Mapping
+
+    from neuro_api_tony.samples import SchemaCost
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "enum": ["jerald", "randy"]},
+        "count": {"type": "integer", "minimum": 1, "maximum": 10},
+    },
+    "required": ["name", "count"],
+}
+
+
+def test_schema_key_ignores_key_order() -> None:
+    reordered = {"required": ["name", "count"], "properties": SCHEMA["properties"], "type": "object"}
+    assert schema_key(SCHEMA) == schema_key(reordered)
+    assert schema_key(SCHEMA) != schema_key({"type": "object"})
+
+
+def test_generator_reused() -> None:
+    cache = SampleGeneratorCache()
+    generator = cache.get(SCHEMA)
+    assert cache.get(dict(SCHEMA)) is generator
+    assert len(cache) == 1
+
+
+def test_generate_valid() -> None:
+    cache = SampleGeneratorCache()
+    for _ in range(10):
+        jsonschema.validate(cache.generate(SCHEMA), SCHEMA)
+
+
+def test_least_recently_used_evicted() -> None:
+    cache = SampleGeneratorCache(maxsize=2)
+    first = cache.get({"type": "string"})
+    second = cache.get({"type": "integer"})
+    assert cache.get({"type": "string"}) is first  # Now most recently used
+    cache.get({"type": "boolean"})
+
+    assert len(cache) == 2
+    assert cache.get({"type": "string"}) is first
+    assert cache.get({"type": "integer"}) is not second
+
+
+def wait_for_refill(pool: SamplePool, size: int) -> None:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with pool._condition:
+            pools = list(pool._pools.values())
+        if pools and all(len(p.samples) == size for p in pools):
+            return
+        time.sleep(0.01)
+    raise AssertionError("Sample pool was not refilled in time")
+
+
+def test_pool_hit_after_prepare() -> None:
+    pool = SamplePool(size=2)
+    try:
+        pool.prepare(SCHEMA)
+        wait_for_refill(pool, 2)
+        hits = pool.hits.hits
+
+        sample = pool.take(SCHEMA)
+        jsonschema.validate(json.loads(sample), SCHEMA)
+        assert pool.hits.hits == hits + 1
+        wait_for_refill(pool, 2)
+    finally:
+        pool.close()
+
+
+def test_pool_miss_uses_fallback_and_prepares() -> None:
+    pool = SamplePool(size=1)
+    try:
+        misses = pool.hits.misses
+        sample = json.loads(pool.take(SCHEMA))
+        assert sample == generate_fallback(SCHEMA)
+        jsonschema.validate(sample, SCHEMA)
+        assert pool.hits.misses == misses + 1
+        wait_for_refill(pool, 1)
+    finally:
+        pool.close()
+
+
+def test_pool_steers_refills() -> None:
+    pool = SamplePool(size=1)
+    pool.steer = lambda schema, sample: {**sample, "name": "randy"}  # type: ignore[dict-item]
+    try:
+        pool.prepare(SCHEMA)
+        wait_for_refill(pool, 1)
+        assert json.loads(pool.take(SCHEMA))["name"] == "randy"
+    finally:
+        pool.close()
+
+
+def test_pool_refill_error_keeps_thread_running(monkeypatch: pytest.MonkeyPatch) -> None:
+    broken = {"type": "string", "title": "broken"}
+    generate = SampleGenerator.generate
+
+    def generate_or_fail(self: SampleGenerator, schema: Mapping[str, object]) -> object:
+        if schema == broken:
+            raise RuntimeError("jerald")
+        return generate(self, schema)
+
+    monkeypatch.setattr(SampleGenerator, "generate", generate_or_fail)
+    errors: list[Exception] = []
+    pool = SamplePool(size=1)
+    pool.on_refill_error = lambda schema, exc: errors.append(exc)
+    try:
+        pool.prepare(broken)
+        pool.prepare(SCHEMA)
+        deadline = time.monotonic() + 5
+        while not (errors and pool._pools[schema_key(SCHEMA)].samples):
+            assert time.monotonic() < deadline, "Sample pool was not refilled in time"
+            time.sleep(0.01)
+        assert [str(exc) for exc in errors] == ["jerald"]
+        assert pool._thread is not None
+        assert pool._thread.is_alive()
+    finally:
+        pool.close()
+
+
+def test_pool_closed() -> None:
+    pool = SamplePool()
+    pool.prepare(SCHEMA)
+    pool.close()
+    jsonschema.validate(json.loads(pool.take(SCHEMA)), SCHEMA)
+
+
+@pytest.mark.parametrize(
+    "schema",
+    [
+        SCHEMA,
+        {"type": "string", "minLength": 10, "maxLength": 12},
+        {"type": "string", "format": "email"},
+        {"type": "integer", "exclusiveMinimum": 3},
+        {"type": "number", "maximum": -1.5},
+        {"type": ["null", "boolean"]},
+        {"const": "jerald"},
+        {"anyOf": [{"type": "integer"}, {"type": "string"}]},
+        {"allOf": [{"type": "object", "properties": {"a": {"type": "integer"}}}, {"required": ["a"]}]},
+        {"type": "array", "items": {"type": "string", "enum": ["x"]}, "minItems": 3},
+        {"properties": {"nested": {"properties": {"value": {"type": "boolean"}}, "required": ["value"]}}},
+    ],
+)
+def test_fallback_valid(schema: dict[str, object]) -> None:
+    jsonschema.validate(generate_fallback(schema), schema)
+
+
+def test_fallback_self_reference() -> None:
+    schema = {
+        "$defs": {
+            "node": {
+                "type": "object",
+                "properties": {"child": {"$ref": "#/$defs/node"}, "name": {"type": "string"}},
+                "required": ["name"],
+            },
+        },
+        "$ref": "#/$defs/node",
+    }
+    sample = generate_fallback(schema)
+    jsonschema.validate(sample, schema)
+
+    depth = 0
+    while isinstance(sample, dict) and "child" in sample:
+        sample = sample["child"]
+        depth += 1
+    assert depth == FALLBACK_MAX_DEPTH
+
+
+def test_fallback_deep_nesting() -> None:
+    schema: dict[str, object] = {"type": "string"}
+    for _ in range(5000):
+        schema = {"type": "array", "items": schema, "minItems": 1}
+    sample = generate_fallback(schema)
+    for _ in range(5000):
+        assert isinstance(sample, list)
+        sample = sample[0]
+    assert sample == "sample"
+
+
+@pytest.fixture
+def generator() -> Generator[SampleGenerator, None, None]:
+    """Create a sample generator with a running worker process."""
+    sample_generator = SampleGenerator()
+    sample_generator.start()
+    assert sample_generator._workers[threading.get_ident()].ready.wait(30)
+    yield sample_generator
+    sample_generator.close()
+
+
+def test_generator_records_cost(generator: SampleGenerator) -> None:
+    jsonschema.validate(generator.generate(SCHEMA), SCHEMA)
+    cost = generator.cost(SCHEMA)
+    assert cost is not None
+    assert cost.samples == 1
+    assert not cost.use_fallback
+
+
+def test_generator_timeout_uses_fallback(generator: SampleGenerator) -> None:
+    slow: list[SchemaCost] = []
+    generator.on_slow_schema = lambda schema, cost: slow.append(cost)
+    generator.budget = 0
+
+    sample = generator.generate(SCHEMA)
+    assert sample == generate_fallback(SCHEMA)
+    cost = generator.cost(SCHEMA)
+    assert cost is not None
+    assert cost.timeouts == 1
+    assert cost.use_fallback
+    assert slow == [cost]
+
+    # Later samples use the fallback right away and are not reported again
+    generator.budget = SAMPLE_TIME_BUDGET
+    assert generator.generate(SCHEMA) == sample
+    assert cost.timeouts == 1
+    assert slow == [cost]
+
+
+def test_generator_worker_per_thread(generator: SampleGenerator) -> None:
+    (main_worker,) = generator._workers.values()
+    samples: list[object] = []
+    thread = threading.Thread(target=lambda: samples.append(generator.generate(SCHEMA)))
+    thread.start()
+    thread.join(30)
+
+    jsonschema.validate(samples[0], SCHEMA)
+    assert len(generator._workers) == 2
+    assert generator._workers[threading.get_ident()] is main_worker
+
+
+def test_generator_timeout_replaces_only_own_worker(generator: SampleGenerator) -> None:
+    thread = threading.Thread(target=generator.start)
+    thread.start()
+    thread.join()
+    other_worker = next(
+        worker for thread_id, worker in generator._workers.items() if thread_id != threading.get_ident()
+    )
+    main_worker = generator._workers[threading.get_ident()]
+
+    generator.budget = 0
+    generator.generate(SCHEMA)
+    assert generator._workers[threading.get_ident()] is not main_worker
+    assert other_worker in generator._workers.values()
+
+
+def test_generator_failure_uses_fallback(generator: SampleGenerator) -> None:
+    schema = {"type": "jerald"}
+    assert generator.generate(schema) is None
+    cost = generator.cost(schema)
+    assert cost is not None
+    assert cost.failures == 1
+    assert cost.error is not None
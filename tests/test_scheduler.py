@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import pytest
+from neuro_api.command import ForcePriority
+
+from neuro_api_tony.scheduler import ForceScheduler
+
+if TYPE_CHECKING:
+    from neuro_api_tony.api import ActionsForceCommand
+
+
+class FakeForce(NamedTuple):
+    """Stand-in for ActionsForceCommand, which needs wx to import."""
+
+    query: str
+    priority: ForcePriority
+
+
+def force(query: str, priority: ForcePriority = ForcePriority.LOW) -> ActionsForceCommand:
+    """Create a forced action command."""
+    return FakeForce(query, priority)  # type: ignore[return-value]
+
+
+@pytest.fixture
+def scheduler() -> ForceScheduler:
+    return ForceScheduler(concurrency=1, clock=lambda: 0.0)
+
+
+def test_priority_then_arrival(scheduler: ForceScheduler) -> None:
+    scheduler.submit(1, force("a"))
+    scheduler.submit(2, force("b", ForcePriority.HIGH))
+    scheduler.submit(3, force("c"))
+    scheduler.submit(4, force("d", ForcePriority.CRITICAL))
+    assert [request.cmd.query for request in scheduler.waiting()] == ["d", "b", "a", "c"]
+
+    order = []
+    while started := scheduler.start_ready():
+        assert len(started) == 1
+        order.append(started[0].cmd.query)
+        scheduler.finish(started[0].client_id)
+    assert order == ["d", "b", "a", "c"]
+
+
+def test_one_active_per_client() -> None:
+    scheduler = ForceScheduler(concurrency=2, clock=lambda: 0.0)
+    scheduler.submit(1, force("a"))
+    scheduler.submit(1, force("b"))
+    scheduler.submit(2, force("c"))
+    assert [request.cmd.query for request in scheduler.start_ready()] == ["a", "c"]
+    assert scheduler.start_ready() == []
+
+    # A second force from the same client is kept, not overwritten
+    active = scheduler.finish(1)
+    assert active is not None
+    assert active.cmd.query == "a"
+    assert [request.cmd.query for request in scheduler.start_ready()] == ["b"]
+
+
+def test_active_requests() -> None:
+    scheduler = ForceScheduler(concurrency=2, clock=lambda: 0.0)
+    scheduler.submit(1, force("a"))
+    scheduler.submit(2, force("b"))
+    scheduler.submit(3, force("c"))
+    scheduler.start_ready()
+    assert [request.cmd.query for request in scheduler.active_requests()] == ["a", "b"]
+    scheduler.finish(1)
+    assert [request.cmd.query for request in scheduler.active_requests()] == ["b"]
+
+
+def test_retry_state_kept(scheduler: ForceScheduler) -> None:
+    scheduler.submit(1, force("a"))
+    (request,) = scheduler.start_ready()
+    request.attempts += 1
+    scheduler.submit(2, force("b", ForcePriority.CRITICAL))
+    assert scheduler.start_ready() == []
+    assert scheduler.active(1) is request
+    assert request.attempts == 1
+
+
+def test_remove_client(scheduler: ForceScheduler) -> None:
+    scheduler.submit(1, force("a"))
+    scheduler.submit(1, force("b"))
+    scheduler.submit(2, force("c"))
+    scheduler.start_ready()
+    scheduler.remove_client(1)
+    assert scheduler.active(1) is None
+    assert [request.cmd.query for request in scheduler.start_ready()] == ["c"]
+    assert len(scheduler) == 0
+    assert scheduler.depth.value == 0
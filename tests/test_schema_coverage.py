@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from neuro_api_tony.schema_coverage import ActionCoverage, SchemaCoverage, coverage_targets
+
+if TYPE_CHECKING:
+    import random
+
+SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "color": {"enum": ["red", "green"]},
+        "count": {"type": "integer", "minimum": 1, "exclusiveMaximum": 10},
+        "loud": {"type": "boolean"},
+        "tags": {"type": "array", "items": {"type": "string", "maxLength": 3}, "maxItems": 2},
+        "target": {"anyOf": [{"type": "string"}, {"$ref": "#/$defs/point"}]},
+    },
+    "required": ["color", "count"],
+    "$defs": {"point": {"type": "object", "properties": {"x": {"type": "number"}}, "required": ["x"]}},
+}
+
+
+def test_coverage_targets() -> None:
+    labels = {target.label for target in coverage_targets(SCHEMA)}
+    assert labels == {
+        '$.color enum "red"',
+        '$.color enum "green"',
+        "$.count minimum 1",
+        "$.count exclusiveMaximum 9",
+        "$ has loud",
+        "$ lacks loud",
+        "$.loud true",
+        "$.loud false",
+        "$ has tags",
+        "$ lacks tags",
+        "$.tags minItems 0",
+        "$.tags maxItems 2",
+        "$.tags[] maxLength 3",
+        "$ has target",
+        "$ lacks target",
+        "$.target anyOf[0]",
+        "$.target anyOf[1]",
+    }
+
+
+def test_self_reference_is_finite() -> None:
+    schema = {
+        "$ref": "#/$defs/node",
+        "$defs": {"node": {"type": "object", "properties": {"child": {"$ref": "#/$defs/node"}}}},
+    }
+    assert {target.label for target in coverage_targets(schema)} == {"$ has child", "$ lacks child"}
+
+
+def test_record(rng: random.Random) -> None:
+    coverage = ActionCoverage("jerald", SCHEMA, rng)
+    assert coverage.record({"color": "red", "count": 1, "tags": ["abc", "d"], "target": {"x": 1}}) == 8
+    assert coverage.covered == {
+        '$.color enum "red"',
+        "$.count minimum 1",
+        "$ lacks loud",
+        "$ has tags",
+        "$.tags maxItems 2",
+        "$.tags[] maxLength 3",
+        "$ has target",
+        "$.target anyOf[1]",
+    }
+    assert coverage.record({"color": "red", "count": 1}) == 2
+    assert coverage.format() == "58.8% (10/17)"
+    assert coverage.metric.hits == 10
+    assert coverage.metric.misses == 7
+
+
+def test_steer_reaches_full_coverage(rng: random.Random) -> None:
+    coverage = ActionCoverage("jerald", SCHEMA, rng)
+    sample = {"color": "red", "count": 5}
+    for _ in range(20):
+        steered = coverage.steer(sample)
+        assert coverage._validator.is_valid(steered)
+        coverage.record(steered)
+    assert coverage.uncovered() == []
+
+
+def test_steer_keeps_sample_valid(rng: random.Random) -> None:
+    schema = {"type": "string", "minLength": 2, "pattern": "^x+$"}
+    coverage = ActionCoverage("jerald", schema, rng)
+    assert coverage.steer("xxx") == "xx"
+
+
+def test_registry_resets_on_schema_change() -> None:
+    registry = SchemaCoverage()
+    coverage = registry.get("jerald", SCHEMA)
+    assert registry.get("jerald", dict(SCHEMA)) is coverage
+    assert registry.get("jerald", {"type": "boolean"}) is not coverage
+    assert registry.report() == {"jerald": "0.0% (0/2)"}
+
+
+def test_registry_steers_by_schema(rng: random.Random) -> None:
+    registry = SchemaCoverage()
+    assert registry.steer(SCHEMA, {"color": "red"}) == {"color": "red"}
+    registry.get("jerald", SCHEMA).rng = rng
+    steered = registry.steer(SCHEMA, {"color": "red", "count": 5})
+    assert steered != {"color": "red", "count": 5}
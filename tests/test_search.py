@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import pytest
+
+from neuro_api_tony.search import LogRecord, LogSearchIndex, tokenize
+
+
+@pytest.fixture
+def index() -> LogSearchIndex:
+    """Create an index with a few messages."""
+    log_index = LogSearchIndex()
+    log_index.add("System", 0, "Tony is running.", level="Info")
+    log_index.add("Commands", 0, "actions/register: jerald", client_id=1)
+    log_index.add("Context", 0, "Action result: success", client_id=1)
+    log_index.add("Context", 1, "Result of the action was\na success", client_id=2)
+    log_index.add("System", 1, "Action jerald does not exist.", level="Warning")
+    return log_index
+
+
+def test_tokenize() -> None:
+    assert tokenize("Action/Result: OK, jerald_2!") == ["action", "result", "ok", "jerald_2"]
+
+
+def test_word_search(index: LogSearchIndex) -> None:
+    results = index.search("jerald")
+    assert [(r.tab, r.line) for r in results] == [("System", 1), ("Commands", 0)]
+
+
+def test_all_words_must_match(index: LogSearchIndex) -> None:
+    results = index.search("ACTION success")
+    assert [r.text for r in results] == ["Result of the action was\na success", "Action result: success"]
+    assert index.search("action missing") == []
+
+
+def test_phrase_search(index: LogSearchIndex) -> None:
+    results = index.search('"action result"')
+    assert results == [LogRecord("Context", 0, "Action result: success", 1, None)]
+
+
+def test_filters(index: LogSearchIndex) -> None:
+    assert [r.line for r in index.search("success", client_id=2)] == [1]
+    assert [r.tab for r in index.search("jerald", tab="Commands")] == ["Commands"]
+    assert [r.level for r in index.search("jerald", level="Warning")] == ["Warning"]
+    assert index.search("jerald", tab="Raw") == []
+    assert index.search("jerald", level="Critical") == []
+
+
+def test_limit_most_recent_first() -> None:
+    log_index = LogSearchIndex()
+    for i in range(10):
+        log_index.add("Raw", i, f"message {i}")
+    assert [r.line for r in log_index.search("message", limit=3)] == [9, 8, 7]
+
+
+def test_empty_query(index: LogSearchIndex) -> None:
+    assert index.search("") == []
+    assert index.search('""') == []
+
+
+def test_clear(index: LogSearchIndex) -> None:
+    index.clear()
+    assert len(index) == 0
+    assert index.search("jerald") == []
+
+    index.add("System", 0, "jerald")
+    assert index.search("jerald") == [LogRecord("System", 0, "jerald", None, None)]
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING
+
+import trio
+
+from neuro_api_tony.stalls import LoopLagMonitor, SchedulingInstrument, SlowCallback, StallDetector, callable_name
+from neuro_api_tony.ui_queue import UIUpdateQueue
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from conftest import FakeClock
+
+
+def make_detector(clock: FakeClock, threshold: float = 0.1) -> tuple[StallDetector, list[SlowCallback]]:
+    detector = StallDetector(threshold, clock)
+    reports: list[SlowCallback] = []
+    detector.on_slow_callback = reports.append
+    return detector, reports
+
+
+def test_callable_name(clock: FakeClock) -> None:
+    assert callable_name(make_detector) == f"{__name__}.make_detector"
+    assert callable_name(functools.partial(functools.partial(make_detector), clock)) == callable_name(
+        make_detector,
+    )
+    assert callable_name(clock.__call__) == f"{type(clock).__module__}.FakeClock.__call__"
+
+
+def test_fast_callbacks_are_not_reported(clock: FakeClock) -> None:
+    detector, reports = make_detector(clock)
+    detector.begin("fast")
+    clock.now += 0.05
+    detector.end()
+    assert reports == []
+
+
+def test_only_innermost_slow_callback_is_reported(clock: FakeClock) -> None:
+    detector, reports = make_detector(clock)
+    detector.begin("batch")
+    detector.begin("slow handler")
+    clock.now += 0.5
+    detector.end()
+    detector.begin("fast handler")
+    detector.end()
+    detector.end()
+
+    assert [(report.name, report.duration) for report in reports] == [("slow handler", 0.5)]
+    assert reports[0].stack is None
+
+
+def test_outer_callback_is_reported_if_its_own_code_is_slow(clock: FakeClock) -> None:
+    detector, reports = make_detector(clock)
+    detector.begin("batch")
+    detector.begin("fast handler")
+    detector.end()
+    clock.now += 0.2
+    detector.end()
+    assert [report.name for report in reports] == ["batch"]
+
+
+def test_heartbeat_excludes_time_the_event_loop_ran(clock: FakeClock) -> None:
+    detector, reports = make_detector(clock)
+    detector.begin("modal dialog")
+    for _ in range(100):
+        clock.now += 0.05
+        detector.heartbeat()
+    clock.now += 0.05
+    detector.end()
+    assert reports == []
+
+
+def test_zero_threshold_disables_reports(clock: FakeClock) -> None:
+    detector, reports = make_detector(clock, threshold=0)
+    detector.begin("slow")
+    clock.now += 10
+    detector.sample()
+    detector.end()
+    assert reports == []
+
+
+def test_sample_captures_stack_of_blocking_callback(clock: FakeClock) -> None:
+    detector, reports = make_detector(clock)
+    detector.begin("slow")
+    detector.sample()
+    clock.now += 0.2
+    detector.sample()
+    detector.end()
+
+    assert len(reports) == 1
+    assert reports[0].stack is not None
+    assert "test_sample_captures_stack_of_blocking_callback" in reports[0].stack
+
+
+def test_background_thread_stops() -> None:
+    detector = StallDetector(0.01)
+    detector.start()
+    detector.close()
+    assert detector._thread is not None
+    assert not detector._thread.is_alive()
+
+
+def test_scheduling_instrument_reports_slow_task_steps(clock: FakeClock) -> None:
+    detector, reports = make_detector(clock)
+    instrument = SchedulingInstrument(detector, clock)
+    steps = instrument.step_duration.count
+    delays = instrument.scheduling_delay.count
+
+    async def handler() -> None:
+        await trio.lowlevel.checkpoint()
+        clock.now += 0.3
+
+    async def main() -> None:
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(handler, name="slow handler")
+
+    trio.run(main, instruments=[instrument])
+
+    assert [report.name for report in reports] == ["Trio task slow handler"]
+    assert instrument.step_duration.count > steps
+    assert instrument.scheduling_delay.count > delays
+    assert not instrument._scheduled_at
+
+
+def test_ui_queue_reports_slow_function(clock: FakeClock) -> None:
+    detector, reports = make_detector(clock)
+    scheduled: list[Callable[[], None]] = []
+    queue = UIUpdateQueue(scheduled.append)
+    queue.detector = detector
+
+    def slow_update() -> None:
+        clock.now += 0.2
+
+    queue.call_soon_threadsafe(lambda: None)
+    queue.call_soon_threadsafe(slow_update)
+    scheduled.pop()()
+
+    assert [report.name for report in reports] == [callable_name(slow_update)]
+
+
+def test_loop_lag_monitor(clock: FakeClock) -> None:
+    detector, _reports = make_detector(clock)
+    monitor = LoopLagMonitor(detector, 50, clock)
+    count = monitor.lag.count
+    monitor.tick()
+    clock.now += 0.25
+    monitor.tick()
+
+    assert monitor.lag.count == count + 1
+    assert monitor.lag.percentile(100) is not None
+    assert detector._alive_at == clock.now
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import orjson
+import pytest
+
+from neuro_api_tony import trace
+from neuro_api_tony.trace import TraceWriter, read_trace
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from conftest import FakeClock
+
+
+def test_records_round_trip(tmp_path: Path, clock: FakeClock) -> None:
+    path = tmp_path / "trace.jsonl"
+    writer = TraceWriter(path, clock)
+    writer.record(1, True, '{"command": "startup", "game": "Test"}')
+    clock.now = 100.5
+    writer.record(1, False, b'{"command": "action"}')
+    writer.record(2, True, b"\xff\x00")
+    writer.close()
+
+    assert orjson.loads(path.read_bytes().splitlines()[0])["trace"] == 1
+    assert list(read_trace(path)) == [
+        {"t": 0.0, "client": 1, "dir": "in", "data": '{"command": "startup", "game": "Test"}', "session": 0},
+        {"t": 0.5, "client": 1, "dir": "out", "data": '{"command": "action"}', "session": 0},
+        {"t": 0.5, "client": 2, "dir": "in", "data": b"\xff\x00", "session": 0},
+    ]
+
+
+def test_many_records_are_written_in_order(tmp_path: Path) -> None:
+    path = tmp_path / "trace.jsonl"
+    writer = TraceWriter(path)
+    dropped = writer.dropped.value
+    for i in range(5000):
+        writer.record(i % 3, i % 2 == 0, f'{{"i": {i}}}')
+    writer.close()
+
+    assert [orjson.loads(entry["data"])["i"] for entry in read_trace(path)] == list(range(5000))
+    assert writer.dropped.value == dropped
+
+
+def test_appends_and_drops_after_close(tmp_path: Path) -> None:
+    path = tmp_path / "trace.jsonl"
+    TraceWriter(path).close()
+    writer = TraceWriter(path)
+    writer.record(1, True, "{}")
+    writer.record(1, False, "{}")
+    writer.close()
+    dropped = writer.dropped.value
+    writer.record(1, True, "{}")
+
+    assert [entry["session"] for entry in read_trace(path)] == [1, 1]
+    assert writer.dropped.value == dropped + 1
+
+
+def test_write_error_stops_recording(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(record: object) -> bytes:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(trace, "_encode_record", fail)
+    writer = TraceWriter(tmp_path / "trace.jsonl")
+    errors: list[Exception] = []
+    writer.on_error = errors.append
+    writer.record(1, True, "{}")
+    writer._thread.join(5)
+    dropped = writer.dropped.value
+    writer.record(1, True, "{}")
+    writer.close()
+
+    assert [str(error) for error in errors] == ["disk full"]
+    assert writer.dropped.value == dropped + 1
+
+
+def test_unwritable_path_raises(tmp_path: Path) -> None:
+    with pytest.raises(OSError, match="missing"):
+        TraceWriter(tmp_path / "missing" / "trace.jsonl")
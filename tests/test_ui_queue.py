@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from unittest.mock import Mock, call
+
+import pytest
+
+from neuro_api_tony.model import NeuroAction
+from neuro_api_tony.ui_queue import UIUpdateQueue
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+@pytest.fixture
+def scheduled() -> list[Callable[[], None]]:
+    """List of callbacks passed to the schedule function."""
+    return []
+
+
+@pytest.fixture
+def queue(scheduled: list[Callable[[], None]]) -> UIUpdateQueue:
+    """Create a UIUpdateQueue with a mock target."""
+    ui_queue = UIUpdateQueue(scheduled.append)
+    ui_queue.target = Mock()
+    return ui_queue
+
+
+def make_action(name: str, client_id: int = 0) -> NeuroAction:
+    return NeuroAction(name, f"{name} action", None, client_id, "test_game")
+
+
+def run_scheduled(scheduled: list[Callable[[], None]]) -> None:
+    while scheduled:
+        scheduled.pop(0)()
+
+
+def test_single_drain_per_batch(queue: UIUpdateQueue, scheduled: list[Callable[[], None]]) -> None:
+    """Test that many updates only schedule one drain."""
+    for i in range(100):
+        queue.add_action(make_action(f"action_{i}"))
+    assert len(scheduled) == 1
+    assert len(queue) == 100
+
+    run_scheduled(scheduled)
+    assert len(queue) == 0
+    assert queue.target.add_action.call_count == 100  # type: ignore[union-attr]
+    assert queue.depth.peak >= 100
+
+
+def test_add_then_remove_coalesced(queue: UIUpdateQueue, scheduled: list[Callable[[], None]]) -> None:
+    """Test that removing an action drops its pending addition."""
+    keep = make_action("keep")
+    queue.add_action(make_action("drop"))
+    queue.add_action(keep)
+    queue.remove_actions(name="drop")
+    run_scheduled(scheduled)
+
+    target = queue.target
+    assert isinstance(target, Mock)
+    assert target.add_action.call_args_list == [call(keep)]
+    target.remove_actions.assert_called_once_with(name="drop", client_id=None)
+
+
+def test_remove_by_client_id(queue: UIUpdateQueue, scheduled: list[Callable[[], None]]) -> None:
+    """Test that removing by client id only drops that client's additions."""
+    other = make_action("jerald", client_id=1)
+    queue.add_action(make_action("jerald", client_id=0))
+    queue.add_action(other)
+    queue.remove_actions(client_id=0)
+    run_scheduled(scheduled)
+
+    target = queue.target
+    assert isinstance(target, Mock)
+    assert target.add_action.call_args_list == [call(other)]
+
+
+def test_duplicate_remove_coalesced(queue: UIUpdateQueue, scheduled: list[Callable[[], None]]) -> None:
+    """Test that repeating the same removal only removes once."""
+    queue.remove_actions(name="jerald")
+    queue.remove_actions(name="jerald")
+    run_scheduled(scheduled)
+
+    target = queue.target
+    assert isinstance(target, Mock)
+    target.remove_actions.assert_called_once_with(name="jerald", client_id=None)
+
+
+def test_only_last_action_result(queue: UIUpdateQueue, scheduled: list[Callable[[], None]]) -> None:
+    """Test that only the most recent pending action result is delivered."""
+    queue.action_result(False, "nope")
+    queue.action_result(True, "yes")
+    run_scheduled(scheduled)
+
+    target = queue.target
+    assert isinstance(target, Mock)
+    target.on_action_result.assert_called_once_with(True, "yes")
+
+
+def test_calls_keep_order(queue: UIUpdateQueue, scheduled: list[Callable[[], None]]) -> None:
+    """Test that generic calls and action updates are applied in order."""
+    order: list[str] = []
+    target = queue.target
+    assert isinstance(target, Mock)
+    target.add_action.side_effect = lambda action: order.append(action.name)
+
+    queue.call_soon_threadsafe(lambda: order.append("first"))
+    queue.add_action(make_action("second"))
+    queue.call_soon_threadsafe(lambda: order.append("third"))
+    run_scheduled(scheduled)
+
+    assert order == ["first", "second", "third"]
+
+
+def test_updates_queued_during_drain(queue: UIUpdateQueue, scheduled: list[Callable[[], None]]) -> None:
+    """Test that updates queued while draining go into the next batch."""
+    ran: list[int] = []
+
+    def requeue() -> None:
+        ran.append(1)
+        queue.call_soon_threadsafe(lambda: ran.append(2))
+
+    queue.call_soon_threadsafe(requeue)
+    scheduled.pop(0)()
+    assert ran == [1]
+    assert len(scheduled) == 1
+
+    run_scheduled(scheduled)
+    assert ran == [1, 2]
+
+
+def test_exception_keeps_rest_of_batch(queue: UIUpdateQueue, scheduled: list[Callable[[], None]]) -> None:
+    """Test that an exception in one update does not lose the following updates."""
+    ran: list[str] = []
+
+    def fail() -> None:
+        raise ValueError("jerald")
+
+    queue.call_soon_threadsafe(fail)
+    queue.call_soon_threadsafe(lambda: ran.append("after"))
+
+    with pytest.raises(ValueError, match=r"^jerald$"):
+        scheduled.pop(0)()
+
+    assert len(queue) == 1
+    run_scheduled(scheduled)
+    assert ran == ["after"]
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import requests
+
+from neuro_api_tony.constants import VERSION
+from neuro_api_tony.update_check import UPDATE_CHECK_TTL, check_for_updates, read_cached_version
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def fail() -> str:
+    """Fail like requests does without internet."""
+    raise requests.ConnectionError("no internet")
+
+
+def test_update_available_is_cached(tmp_path: Path) -> None:
+    cache = tmp_path / "tony" / "update-check.json"
+    calls: list[None] = []
+
+    def fetch() -> str:
+        calls.append(None)
+        return "999.0.0"
+
+    message = check_for_updates(cache, fetch, lambda: 1000.0)
+    assert message is not None
+    assert "999.0.0" in message
+    assert read_cached_version(cache, 1000.0) == "999.0.0"
+
+    # Within the TTL the cache is used, also without internet
+    assert check_for_updates(cache, fail, lambda: 1000.0 + UPDATE_CHECK_TTL - 1) == message
+    assert len(calls) == 1
+
+
+def test_latest_version(tmp_path: Path) -> None:
+    assert check_for_updates(tmp_path / "update-check.json", lambda: VERSION, lambda: 0.0) is None
+
+
+def test_expired_cache_is_refreshed(tmp_path: Path) -> None:
+    cache = tmp_path / "update-check.json"
+    cache.write_text(json.dumps({"checkedAt": 0.0, "latestVersion": "999.0.0"}), encoding="utf-8")
+
+    assert check_for_updates(cache, lambda: VERSION, lambda: UPDATE_CHECK_TTL) is None
+    assert read_cached_version(cache, UPDATE_CHECK_TTL) == VERSION
+
+
+def test_offline(tmp_path: Path) -> None:
+    cache = tmp_path / "update-check.json"
+    message = check_for_updates(cache, fail, lambda: 0.0)
+    assert message is not None
+    assert "internet connection" in message
+    assert not cache.exists()
+
+
+def test_broken_cache(tmp_path: Path) -> None:
+    cache = tmp_path / "update-check.json"
+    cache.write_text("{", encoding="utf-8")
+    assert read_cached_version(cache, 0.0) is None
+    cache.write_text(json.dumps({"checkedAt": 10.0, "latestVersion": "1.0.0"}), encoding="utf-8")
+    assert read_cached_version(cache, 0.0) is None